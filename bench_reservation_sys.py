@@ -0,0 +1,434 @@
+"""
+Mediciones de rendimiento del Sistema de Reservas de Hoteles.
+
+Uso:
+    ``python bench_reservation_sys.py run --sizes 10000 100000 -o base.json``
+    ``python bench_reservation_sys.py compare base.json nuevo.json``
+    ``python bench_reservation_sys.py memory --records 100000``
+    ``python bench_reservation_sys.py stress --workers 8 --bookings 200``
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from reservation_booking import BookingEngine
+from reservation_sys import (
+    Customer, Hotel, Reservation, ReservationStore, ReservationTable
+)
+from reservation_snapshot import SnapshotReader, write_snapshot
+
+_STORE_FILES = ("hotels.json", "customers.json", "reservations.json",
+                "journal.jsonl")
+
+
+class _PlainReservation:
+    """Reserva sin ``__slots__`` (representación original), usada como
+    referencia en la medición de memoria."""
+
+    def __init__(self, reservation_id, customer_id, hotel_id,
+                 check_in=None, check_out=None):
+        self.reservation_id = reservation_id
+        self.customer_id = customer_id
+        self.hotel_id = hotel_id
+        self.check_in = check_in
+        self.check_out = check_out
+
+
+def _reservation_rows(records, hotels=100, customers=1000):
+    """Genera tuplas (reservation_id, customer_id, hotel_id) sintéticas."""
+    for number in range(records):
+        yield (f"R{number}", f"C{number % customers}", f"H{number % hotels}")
+
+
+def _measure(build, records):
+    """Devuelve los bytes por registro asignados por ``build``."""
+    tracemalloc.start()
+    try:
+        snapshot = tracemalloc.take_snapshot()
+        data = build(_reservation_rows(records))
+        allocated = sum(
+            stat.size_diff
+            for stat in tracemalloc.take_snapshot().compare_to(
+                snapshot, "filename"
+            )
+        )
+    finally:
+        tracemalloc.stop()
+    del data
+    return allocated / records
+
+
+def measure_bytes_per_record(records=100_000):
+    """Mide los bytes por reserva de cada representación en memoria."""
+    return {
+        "plain_objects": _measure(
+            lambda rows: [_PlainReservation(*row) for row in rows], records
+        ),
+        "slots_objects": _measure(
+            lambda rows: [Reservation(*row) for row in rows], records
+        ),
+        "columnar_table": _measure(
+            lambda rows: ReservationTable(Reservation(*row) for row in rows),
+            records,
+        ),
+    }
+
+
+def _stress_worker(directory, worker, bookings):
+    """Reserva ``bookings`` habitaciones en el hotel propio del trabajador."""
+    files = [os.path.join(directory, name) for name in _STORE_FILES]
+    store = ReservationStore.open(*files)
+    engine = BookingEngine(store, os.path.join(directory, "bookings.lock"))
+    for number in range(bookings):
+        engine.reserve(f"R{worker}-{number}", "C1", f"H{worker}")
+    engine.close()
+    store.close()
+
+
+def stress_booking(workers, bookings, processes=True):
+    """Reserva en paralelo, un hotel por trabajador, y devuelve
+    ``(reservas por segundo, reservas totales, sobreventas)``."""
+    with tempfile.TemporaryDirectory() as directory:
+        files = [os.path.join(directory, name) for name in _STORE_FILES]
+        ReservationStore(
+            hotels=[Hotel(f"H{n}", f"Hotel {n}", "New York", bookings)
+                    for n in range(workers)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        ).save(*files[:3])
+        if processes:
+            runners = [
+                multiprocessing.Process(target=_stress_worker,
+                                        args=(directory, n, bookings))
+                for n in range(workers)
+            ]
+        else:
+            runners = [
+                threading.Thread(target=_stress_worker,
+                                 args=(directory, n, bookings))
+                for n in range(workers)
+            ]
+        start = time.perf_counter()
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join()
+        elapsed = time.perf_counter() - start
+        store = ReservationStore.open(*files)
+        total = len(store.reservations)
+        overbooked = sum(
+            1 for hotel in store.hotel_list() if hotel.rooms_available < 0
+        )
+        store.close()
+    return total / elapsed, total, overbooked
+
+
+def generate_hotels(count, locations=50):
+    """Genera ``count`` hoteles sintéticos."""
+    return [
+        Hotel(f"H{n}", f"Hotel {n}", f"City {n % locations}", 100)
+        for n in range(count)
+    ]
+
+
+def generate_customers(count):
+    """Genera ``count`` clientes sintéticos."""
+    return [
+        Customer(f"C{n}", f"Customer {n}", f"customer{n}@example.com")
+        for n in range(count)
+    ]
+
+
+def generate_reservations(count, hotels, customers, seed=0):
+    """Genera ``count`` reservas sintéticas repartidas al azar entre
+    ``hotels`` hoteles y ``customers`` clientes."""
+    generator = random.Random(seed)
+    return [
+        Reservation(f"R{n}", f"C{generator.randrange(customers)}",
+                    f"H{generator.randrange(hotels)}")
+        for n in range(count)
+    ]
+
+
+def summarize(latencies, peak_bytes=None):
+    """Resume latencias (segundos) en percentiles, rendimiento y memoria."""
+    ordered = sorted(latencies)
+
+    def percentile(fraction):
+        index = max(0, min(len(ordered) - 1,
+                           int(round(fraction * len(ordered))) - 1))
+        return ordered[index]
+
+    total = sum(ordered)
+    return {
+        "operations": len(ordered),
+        "p50_ms": percentile(0.50) * 1000,
+        "p95_ms": percentile(0.95) * 1000,
+        "p99_ms": percentile(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_s": len(ordered) / total if total else float("inf"),
+        "peak_bytes": peak_bytes,
+    }
+
+
+@contextmanager
+def _working_directory(directory):
+    """Cambia temporalmente de directorio (los métodos estáticos escriben
+    en los archivos por defecto del directorio actual)."""
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _timed(operation, repeat):
+    """Ejecuta ``operation(i)`` ``repeat`` veces y devuelve las latencias."""
+    latencies = []
+    for number in range(repeat):
+        start = time.perf_counter()
+        operation(number)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _scenarios(size, repeat, lookups):
+    """Devuelve ``{nombre: (preparación, operación, repeticiones)}``.
+
+    La preparación construye los datos (no se mide) y devuelve el estado
+    que recibe la operación."""
+    hotels = max(size // 100, 1)
+    customers = max(size // 10, 1)
+    ids = random.Random(1)
+
+    def reservations_state():
+        return generate_reservations(size, hotels, customers)
+
+    def store_state():
+        # Repositorio con archivos: cada cancelación se confirma en una
+        # transacción, así que también se mide la escritura de los cambios.
+        ReservationStore(generate_hotels(hotels),
+                         generate_customers(customers),
+                         reservations_state()).save()
+        return ReservationStore.load()
+
+    def hotels_file():
+        Hotel.save_hotels(generate_hotels(size), "hotels.json")
+        return "hotels.json"
+
+    def list_cancel_state():
+        return reservations_state(), generate_hotels(hotels)
+
+    def snapshot_file():
+        write_snapshot("snapshot.bin", generate_hotels(size))
+        return "snapshot.bin"
+
+    def cancel_in_store(state, n):
+        with state.transaction() as txn:
+            txn.cancel_reservation(f"R{n}")
+
+    def open_snapshot(filename):
+        with SnapshotReader(filename) as snapshot:
+            return snapshot.find_hotel(f"H{ids.randrange(size)}")
+
+    return {
+        "load_hotels": (
+            hotels_file, lambda state, n: Hotel.load_hotels(state), repeat
+        ),
+        "open_snapshot_find_hotel": (
+            snapshot_file, lambda state, n: open_snapshot(state), repeat
+        ),
+        "save_reservations": (
+            reservations_state,
+            lambda state, n: Reservation.save_reservations(state), repeat
+        ),
+        "find_customer_list": (
+            lambda: generate_customers(size),
+            lambda state, n: Customer.find_customer(
+                f"C{ids.randrange(size)}", state
+            ),
+            repeat,
+        ),
+        "find_customer_store": (
+            lambda: ReservationStore(customers=generate_customers(size)),
+            lambda state, n: Customer.find_customer(
+                f"C{ids.randrange(size)}", state
+            ),
+            lookups,
+        ),
+        "cancel_reservation_list": (
+            list_cancel_state,
+            lambda state, n: Reservation.cancel_reservation(
+                f"R{n}", state[0], state[1]
+            ),
+            min(repeat, size),
+        ),
+        "cancel_reservation_store": (
+            store_state, cancel_in_store,
+            min(lookups, size),
+        ),
+    }
+
+
+def run_benchmarks(sizes, repeat=100, lookups=1000, memory=True,
+                   scenarios=None):
+    """Ejecuta los escenarios para cada tamaño y devuelve los resultados.
+
+    ``repeat`` es la cantidad de muestras de los escenarios sobre listas y
+    archivos; con menos de 100 el p99 (y con menos de 20 el p95) es
+    simplemente el máximo.
+
+    Con ``memory`` una operación de cada escenario se repite bajo
+    ``tracemalloc`` para medir la memoria máxima que asigna, sin contar los
+    datos preparados (la latencia se mide sin ``tracemalloc``)."""
+    results = {
+        "metadata": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "lookups": lookups,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory, \
+                _working_directory(directory):
+            for name, (prepare, operation, count) in \
+                    _scenarios(size, repeat, lookups).items():
+                if scenarios and name not in scenarios:
+                    continue
+                state = prepare()
+                latencies = _timed(
+                    lambda n, operation=operation, state=state:
+                    operation(state, n),
+                    count,
+                )
+                peak = None
+                if memory:
+                    state = prepare()
+                    tracemalloc.start()
+                    try:
+                        operation(state, 0)
+                        peak = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                results["results"][f"{name}[{size}]"] = summarize(
+                    latencies, peak
+                )
+    return results
+
+
+def _git_commit():
+    """Devuelve el commit actual, o ``None`` fuera de un repositorio."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True,
+            capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, candidate, threshold=0.10, metric="p50_ms"):
+    """Compara dos resultados de ``run_benchmarks``.
+
+    Devuelve una lista ``(escenario, antes, después, cambio relativo)`` y
+    la lista de escenarios cuya ``metric`` empeoró más que
+    ``threshold``."""
+    rows, regressions = [], []
+    for name, after in candidate["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or not before[metric]:
+            continue
+        change = (after[metric] - before[metric]) / before[metric]
+        rows.append((name, before[metric], after[metric], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _print_results(results):
+    """Muestra una tabla legible de los resultados."""
+    print(f"{'escenario':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'ops/s':>12}{'pico MB':>10}")
+    for name, stats in results["results"].items():
+        peak = stats["peak_bytes"]
+        peak = f"{peak / 2 ** 20:10.1f}" if peak is not None else f"{'-':>10}"
+        print(f"{name:<36}{stats['p50_ms']:10.3f}{stats['p95_ms']:10.3f}"
+              f"{stats['p99_ms']:10.3f}{stats['ops_per_s']:12.1f}{peak}")
+
+
+def main():
+    """Ejecuta la medición indicada en la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="benchmark", required=True)
+    run = commands.add_parser("run", help="latencia, rendimiento y memoria")
+    run.add_argument("--sizes", type=int, nargs="+",
+                     default=[10_000, 100_000])
+    run.add_argument("--repeat", type=int, default=100)
+    run.add_argument("--lookups", type=int, default=1000)
+    run.add_argument("--scenario", action="append")
+    run.add_argument("--no-memory", action="store_true")
+    run.add_argument("-o", "--output")
+    diff = commands.add_parser("compare", help="detecta regresiones")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument("--threshold", type=float, default=0.10)
+    diff.add_argument("--metric", default="p50_ms")
+    memory = commands.add_parser("memory", help="bytes por reserva")
+    memory.add_argument("--records", type=int, default=100_000)
+    stress = commands.add_parser("stress", help="reservas concurrentes")
+    stress.add_argument("--workers", type=int, default=8)
+    stress.add_argument("--bookings", type=int, default=200)
+    stress.add_argument("--threads", action="store_true",
+                        help="usar hilos en lugar de procesos")
+    args = parser.parse_args()
+    if args.benchmark == "run":
+        results = run_benchmarks(args.sizes, args.repeat, args.lookups,
+                                 not args.no_memory, args.scenario)
+        _print_results(results)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=4)
+    elif args.benchmark == "compare":
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.candidate, encoding="utf-8") as file:
+            candidate = json.load(file)
+        rows, regressions = compare(baseline, candidate, args.threshold,
+                                    args.metric)
+        for name, before, after, change in rows:
+            flag = "  REGRESIÓN" if name in regressions else ""
+            print(f"{name:<36}{before:12.3f}{after:12.3f}{change:+9.1%}{flag}")
+        sys.exit(1 if regressions else 0)
+    elif args.benchmark == "memory":
+        results = measure_bytes_per_record(args.records)
+        for name, size in results.items():
+            print(f"{name:>16}: {size:8.1f} bytes/registro")
+    else:
+        workers = 1
+        while workers <= args.workers:
+            rate, total, overbooked = stress_booking(
+                workers, args.bookings, processes=not args.threads
+            )
+            print(f"{workers:>3} hoteles: {rate:10.1f} reservas/s "
+                  f"({total} reservas, {overbooked} hoteles sobrevendidos)")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
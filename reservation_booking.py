@@ -0,0 +1,232 @@
+"""
+Reservas concurrentes del Sistema de Reservas de Hoteles.
+
+``BookingEngine`` reserva y cancela sobre un ``ReservationStore`` con un
+candado por hotel, de modo que varios hilos reservan en hoteles distintos
+en paralelo sin sobrevender ninguno. Con un archivo de bloqueo
+(``FileLock``) también coordina varios procesos que comparten los mismos
+archivos:
+
+    from reservation_booking import BookingEngine
+    engine = BookingEngine(store, "bookings.lock")
+    engine.reserve("R1", "C1", "H1")
+"""
+
+import threading
+import zlib
+from contextlib import contextmanager
+
+from reservation_metrics import instrumented
+from reservation_sys import Hotel, Reservation
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo consultivo entre procesos
+    fcntl = None
+
+
+class FileLock:
+    """Bloqueo consultivo entre procesos sobre un archivo.
+
+    Cada clave (por ejemplo un ``hotel_id``) se asigna a uno de ``slots``
+    bytes del archivo y solo ese byte se bloquea con ``fcntl.lockf``, de
+    modo que los procesos solo se esperan entre sí cuando trabajan sobre el
+    mismo hotel (o sobre hoteles que comparten byte). ``acquire_all``
+    bloquea el archivo completo, es decir, todas las claves. En plataformas
+    sin ``fcntl`` solo se aplica el bloqueo entre hilos."""
+
+    def __init__(self, filename, slots=4096):
+        self.filename = filename
+        self.slots = slots
+        self._file = None
+        self._state = threading.Condition()
+        self._holders = 0
+        self._exclusive = False
+        self._slot_locks = {}
+
+    def slot(self, key):
+        """Devuelve el byte del archivo asignado a ``key``."""
+        return zlib.crc32(key.encode("utf-8")) % self.slots
+
+    @contextmanager
+    def acquire(self, key):
+        """Mantiene el bloqueo de ``key`` mientras dura el bloque ``with``.
+
+        Los bloqueos de ``fcntl`` pertenecen al proceso, así que cada byte
+        se protege además con un candado entre hilos."""
+        slot = self.slot(key)
+        with self._state:
+            self._state.wait_for(lambda: not self._exclusive)
+            self._holders += 1
+            slot_lock = self._slot_locks.setdefault(slot, threading.Lock())
+            self._open()
+        try:
+            with slot_lock:
+                if fcntl is None:
+                    yield
+                    return
+                fileno = self._file.fileno()
+                fcntl.lockf(fileno, fcntl.LOCK_EX, 1, slot)
+                try:
+                    yield
+                finally:
+                    fcntl.lockf(fileno, fcntl.LOCK_UN, 1, slot)
+        finally:
+            with self._state:
+                self._holders -= 1
+                self._state.notify_all()
+
+    @contextmanager
+    def acquire_all(self):
+        """Mantiene bloqueadas todas las claves mientras dura el bloque
+        ``with``; espera a que los demás hilos suelten las suyas."""
+        with self._state:
+            self._state.wait_for(
+                lambda: not self._exclusive and not self._holders
+            )
+            self._exclusive = True
+            self._open()
+        try:
+            if fcntl is None:
+                yield
+                return
+            fileno = self._file.fileno()
+            # Longitud 0: desde el inicio hasta el final del archivo y más
+            # allá, así que abarca los bytes de todas las claves.
+            fcntl.lockf(fileno, fcntl.LOCK_EX, 0, 0)
+            try:
+                yield
+            finally:
+                fcntl.lockf(fileno, fcntl.LOCK_UN, 0, 0)
+        finally:
+            with self._state:
+                self._exclusive = False
+                self._state.notify_all()
+
+    def close(self):
+        """Cierra el archivo de bloqueo."""
+        with self._state:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        """Abre el archivo de bloqueo si hace falta (con ``_state``)."""
+        if self._file is None and fcntl is not None:
+            # pylint: disable=consider-using-with
+            self._file = open(self.filename, "ab")
+
+
+class BookingEngine:
+    """Motor de reservas que actualiza inventario y reservas a la vez.
+
+    Cada hotel tiene su propio candado, de modo que varios hilos pueden
+    reservar en hoteles distintos en paralelo sin sobrevender ninguno. Con
+    ``lock_file`` se añade un bloqueo consultivo entre procesos y, antes de
+    decidir, se incorporan los cambios escritos por otros procesos. Si el
+    repositorio usa registro de cambios el bloqueo es por hotel; en modo
+    instantánea cada escritura reescribe los archivos completos, así que el
+    bloqueo abarca todos los hoteles y los archivos se recargan."""
+
+    def __init__(self, store, lock_file=None):
+        self.store = store
+        self.file_lock = FileLock(lock_file) if lock_file else None
+        self._hotel_locks = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hotel_lock(self, hotel_id):
+        """Bloquea un hotel (entre hilos y, si aplica, entre procesos).
+
+        Con ``lock_file`` en modo instantánea lanza ``ValueError`` si el
+        repositorio tiene un ``WriteBackCache``: sus cambios pendientes no
+        son visibles para los demás procesos."""
+        with self._guard:
+            lock = self._hotel_locks.setdefault(hotel_id, threading.Lock())
+        with lock:
+            if self.file_lock is None:
+                yield
+                return
+            store = self.store
+            if store.log is not None:
+                acquire = self.file_lock.acquire(hotel_id)
+            elif store.write_back is not None:
+                raise ValueError("El bloqueo entre procesos no admite "
+                                 "un WriteBackCache.")
+            else:
+                acquire = self.file_lock.acquire_all()
+            with acquire:
+                store.refresh()
+                yield
+
+    @instrumented("BookingEngine.reserve")
+    def reserve(self, reservation_id, customer_id, hotel_id,
+                check_in=None, check_out=None):
+        """Reserva una habitación y descuenta la disponibilidad del hotel.
+
+        Con ``check_in`` y ``check_out`` la disponibilidad se comprueba por
+        noche en el inventario del hotel y ``rooms_available`` se toma como
+        capacidad, sin modificarlo. Devuelve la reserva creada, o ``None``
+        si el hotel no tiene habitaciones. Lanza ``ValueError`` si el hotel
+        o el cliente no existen o si el ID de reserva ya está en uso."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        reservation = Reservation(reservation_id, customer_id, hotel_id,
+                                  check_in, check_out)
+        store = self.store
+        with self.hotel_lock(hotel_id):
+            hotel = store.get_hotel(hotel_id)
+            if hotel is None:
+                raise ValueError(f"No existe hotel con ID {hotel_id}.")
+            if store.get_customer(customer_id) is None:
+                raise ValueError(f"No existe cliente con ID {customer_id}.")
+            if store.get_reservation(reservation_id) is not None:
+                raise ValueError(f"La reserva {reservation_id} ya existe.")
+            # El candado del hotel no protege el ID de reserva (otro hilo
+            # puede usarlo en otro hotel): ``create_reservation`` lo vuelve
+            # a comprobar al confirmar, bajo el candado del repositorio.
+            if check_in is not None:
+                if store.rooms_free(hotel_id, check_in, check_out) <= 0:
+                    return None
+                with store.transaction() as txn:
+                    txn.create_reservation(reservation)
+                return reservation
+            if hotel.rooms_available <= 0:
+                return None
+            # Se confirma una copia del hotel: si la transacción falla, el
+            # hotel del repositorio no cambia.
+            updated = Hotel(**hotel.to_dict())
+            updated.rooms_available -= 1
+            with store.transaction() as txn:
+                txn.put_hotel(updated)
+                txn.create_reservation(reservation)
+            return reservation
+
+    @instrumented("BookingEngine.cancel")
+    def cancel(self, reservation_id):
+        """Cancela una reserva y devuelve la habitación al hotel.
+
+        Devuelve la reserva cancelada, o ``None`` si la reserva o su hotel
+        no existen."""
+        store = self.store
+        if self.file_lock is not None:
+            store.refresh()
+        reservation = store.get_reservation(reservation_id)
+        if reservation is None:
+            return None
+        with self.hotel_lock(reservation.hotel_id):
+            current = store.get_reservation(reservation_id)
+            if current is None:
+                return None
+            if current.hotel_id != reservation.hotel_id:
+                # Otro proceso la reasignó antes de obtener el bloqueo.
+                return self.cancel(reservation_id)
+            if store.get_hotel(current.hotel_id) is None:
+                return None
+            with store.transaction() as txn:
+                txn.cancel_reservation(reservation_id)
+            return current
+
+    def close(self):
+        """Libera el archivo de bloqueo, si existe."""
+        if self.file_lock is not None:
+            self.file_lock.close()
@@ -0,0 +1,275 @@
+"""
+Importación y exportación masiva del Sistema de Reservas de Hoteles.
+
+Permite cargar hoteles, clientes y reservas desde archivos CSV o JSON lines
+validando los registros por lotes (opcionalmente en varios procesos) y
+reportando los errores por fila, y escribirlos de vuelta en una sola pasada.
+
+Uso:
+    ``python reservation_bulk.py import hotels socio.csv``
+    ``python reservation_bulk.py export reservations reservas.jsonl``
+"""
+
+import argparse
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+from reservation_sys import (
+    ENTITY_CLASSES, Reservation, ReservationStore, atomic_open
+)
+
+ENTITY_FIELDS = {
+    "hotel": ("hotel_id", "name", "location", "rooms_available"),
+    "customer": ("customer_id", "name", "email"),
+    "reservation": ("reservation_id", "customer_id", "hotel_id",
+                    "check_in", "check_out"),
+}
+
+
+class ImportResult:
+    """Resultado de una importación: entidades importadas y errores.
+
+    ``errors`` es una lista de tuplas ``(línea, mensaje)`` con el número de
+    línea del archivo de origen."""
+
+    def __init__(self):
+        self.imported = []
+        self.errors = []
+
+    @property
+    def ok(self):
+        """Indica si no hubo errores."""
+        return not self.errors
+
+
+def detect_format(filename, fmt=None):
+    """Devuelve ``"csv"`` o ``"jsonl"`` según ``fmt`` o la extensión."""
+    if fmt is None:
+        fmt = "csv" if filename.lower().endswith(".csv") else "jsonl"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Formato no soportado: {fmt}")
+    return fmt
+
+
+def validate_record(entity, data):
+    """Valida y normaliza un registro crudo (``dict`` o línea JSON).
+
+    Devuelve el diccionario normalizado o lanza ``ValueError`` con la
+    descripción del problema."""
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("El registro debe ser un objeto.")
+    if None in data:
+        # ``csv.DictReader`` guarda bajo ``None`` las columnas sobrantes.
+        raise ValueError("La fila tiene más columnas que el encabezado.")
+    fields = ENTITY_FIELDS[entity]
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    record = {}
+    for field in fields:
+        value = data.get(field)
+        if value == "":
+            value = None
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None and field not in ("check_in", "check_out"):
+            raise ValueError(f"Falta el campo {field}.")
+        if value is not None and field != "rooms_available" and \
+                not isinstance(value, str):
+            raise ValueError(f"El campo {field} debe ser texto.")
+        record[field] = value
+    if entity == "hotel":
+        try:
+            record["rooms_available"] = int(record["rooms_available"])
+        except (TypeError, ValueError) as e:
+            raise ValueError("rooms_available debe ser un entero.") from e
+        if record["rooms_available"] < 0:
+            raise ValueError("rooms_available no puede ser negativo.")
+    elif entity == "customer":
+        if "@" not in str(record["email"]):
+            raise ValueError(f"Correo inválido: {record['email']}")
+    else:
+        # Reservation valida las fechas al construirse.
+        Reservation(**record)
+        if record["check_in"] is None:
+            del record["check_in"], record["check_out"]
+    return record
+
+
+def _validate_batch(entity, rows):
+    """Valida un lote de ``(línea, registro)``; devuelve ``(válidos,
+    errores)``. Es una función de módulo para poder usarse en procesos."""
+    valid, errors = [], []
+    for line, data in rows:
+        try:
+            valid.append((line, validate_record(entity, data)))
+        except (ValueError, TypeError) as e:
+            errors.append((line, str(e)))
+    return valid, errors
+
+
+def _read_rows(filename, fmt):
+    """Genera ``(línea, registro crudo)`` del archivo de origen."""
+    with open(filename, "r", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield number, line
+
+
+def _batches(rows, batch_size):
+    """Agrupa un iterable en listas de ``batch_size`` elementos."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_entities(entity, filename, store, fmt=None, batch_size=1000,
+                    processes=None):
+    """Importa entidades de ``filename`` al ``store`` en una sola
+    transacción y devuelve un ``ImportResult``.
+
+    Los registros se validan por lotes de ``batch_size``; con
+    ``processes`` mayor que 1 los lotes se validan en un
+    ``ProcessPoolExecutor``. Las filas inválidas, los IDs repetidos en el
+    archivo o ya existentes en ``store`` y las reservas que apuntan a
+    hoteles o clientes inexistentes se reportan en ``errors`` sin detener
+    la importación del resto; nunca se reemplaza una entidad existente."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    fmt = detect_format(filename, fmt)
+    batches = _batches(_read_rows(filename, fmt), batch_size)
+    if processes and processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            outcomes = list(executor.map(
+                _validate_batch, repeat(entity), batches
+            ))
+    else:
+        outcomes = (_validate_batch(entity, batch) for batch in batches)
+    result = ImportResult()
+    model, key = ENTITY_CLASSES[entity], ENTITY_FIELDS[entity][0]
+    seen = set()
+    for valid, errors in outcomes:
+        result.errors.extend(errors)
+        for line, record in valid:
+            problem = _reference_problem(entity, record, store, seen, key)
+            if problem:
+                result.errors.append((line, problem))
+                continue
+            seen.add(record[key])
+            result.imported.append(model(**record))
+    result.errors.sort()
+    with store.transaction() as txn:
+        create = getattr(txn, f"create_{entity}")
+        for instance in result.imported:
+            create(instance)
+    return result
+
+
+def _reference_problem(entity, record, store, seen, key):
+    """Devuelve el error de unicidad o de referencia de un registro."""
+    if record[key] in seen:
+        return f"ID repetido en el archivo: {record[key]}"
+    if getattr(store, f"get_{entity}")(record[key]) is not None:
+        return f"Ya existe {entity} con ID {record[key]}."
+    if entity == "reservation":
+        if store.get_hotel(record["hotel_id"]) is None:
+            return f"No existe hotel con ID {record['hotel_id']}."
+        if store.get_customer(record["customer_id"]) is None:
+            return f"No existe cliente con ID {record['customer_id']}."
+    return None
+
+
+def import_hotels(filename, store, **options):
+    """Importa hoteles (ver ``import_entities``)."""
+    return import_entities("hotel", filename, store, **options)
+
+
+def import_customers(filename, store, **options):
+    """Importa clientes (ver ``import_entities``)."""
+    return import_entities("customer", filename, store, **options)
+
+
+def import_reservations(filename, store, **options):
+    """Importa reservas (ver ``import_entities``)."""
+    return import_entities("reservation", filename, store, **options)
+
+
+def export_entities(entity, entities, filename, fmt=None):
+    """Escribe ``entities`` (cualquier iterable, por ejemplo
+    ``Hotel.iter_hotels()``) en ``filename`` en una sola pasada.
+
+    Se escribe un archivo temporal que se renombra al terminar, así que el
+    destino nunca queda a medias. Devuelve la cantidad de registros."""
+    fmt = detect_format(filename, fmt)
+    fields = ENTITY_FIELDS[entity]
+    count = 0
+    with atomic_open(filename, encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=fields, restval="")
+            writer.writeheader()
+            for instance in entities:
+                writer.writerow(instance.to_dict())
+                count += 1
+        else:
+            for instance in entities:
+                file.write(json.dumps(instance.to_dict()) + "\n")
+                count += 1
+    return count
+
+
+def export_hotels(hotels, filename, fmt=None):
+    """Exporta hoteles (ver ``export_entities``)."""
+    return export_entities("hotel", hotels, filename, fmt)
+
+
+def export_customers(customers, filename, fmt=None):
+    """Exporta clientes (ver ``export_entities``)."""
+    return export_entities("customer", customers, filename, fmt)
+
+
+def export_reservations(reservations, filename, fmt=None):
+    """Exporta reservas (ver ``export_entities``)."""
+    return export_entities("reservation", reservations, filename, fmt)
+
+
+def main():
+    """Importa o exporta sobre los archivos JSON por defecto."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("entity",
+                        choices=["hotels", "customers", "reservations"])
+    parser.add_argument("filename")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+    entity = args.entity[:-1]
+    store = ReservationStore.load()
+    if args.action == "export":
+        entities = getattr(store, f"{entity}_list")()
+        count = export_entities(entity, entities, args.filename, args.format)
+        print(f"{count} registros exportados a {args.filename}.")
+        return
+    result = import_entities(entity, args.filename, store, fmt=args.format,
+                             processes=args.processes)
+    for line, message in result.errors:
+        print(f"Línea {line}: {message}")
+    print(f"{len(result.imported)} registros importados, "
+          f"{len(result.errors)} errores.")
+
+
+if __name__ == "__main__":
+    main()
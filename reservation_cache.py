@@ -0,0 +1,161 @@
+"""
+Escritura diferida del Sistema de Reservas de Hoteles.
+
+``WriteBackCache`` se conecta a un ``ReservationStore`` en modo instantánea
+y acumula sus cambios en memoria; los escribe juntos, con un cambio por ID,
+al llamar a ``flush``, al cumplirse un intervalo o un tamaño máximo, o al
+cerrarse:
+
+    from reservation_cache import WriteBackCache
+    with WriteBackCache(store, flush_interval=1.0):
+        store.modify_hotel("H1", rooms_available=4)
+"""
+
+import threading
+
+from reservation_metrics import instrumented
+from reservation_sys import ENTITY_CLASSES, changes_from_records
+
+_ENTITIES = {model: entity for entity, model in ENTITY_CLASSES.items()}
+
+
+class WriteBackCache:
+    """Unidad de trabajo que difiere la escritura de un repositorio.
+
+    Mientras está conectada, los cambios del ``ReservationStore`` (altas,
+    modificaciones, bajas, cancelaciones y transacciones) solo marcan los
+    IDs afectados como sucios o eliminados; varios cambios sobre el mismo ID
+    se combinan en una sola escritura con su estado final. ``flush`` envía
+    esos cambios al backend con ``persist_changes`` (JSON reescribe solo los
+    archivos afectados; SQLite escribe solo las filas). Se vacía de forma
+    explícita, cada ``flush_interval`` segundos o al llegar a ``max_dirty``
+    IDs pendientes, y al cerrarse."""
+
+    def __init__(self, store, flush_interval=None, max_dirty=None):
+        if store.log is not None:
+            raise ValueError("El repositorio usa registro de cambios.")
+        if store.write_back is not None:
+            raise ValueError("El repositorio ya tiene un WriteBackCache.")
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = {}
+        self._deleted = {}
+        store.write_back = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def pending(self):
+        """Cantidad de IDs con cambios sin escribir."""
+        with self._lock:
+            return sum(map(len, self._dirty.values())) + \
+                sum(map(len, self._deleted.values()))
+
+    def mark_dirty(self, instance):
+        """Marca como modificado un hotel, cliente o reserva cambiado
+        directamente (por ejemplo con ``Hotel.modify_hotel``) y actualiza
+        los índices del repositorio."""
+        entity = _ENTITIES[type(instance)]
+        getattr(self.store, f"add_{entity}")(instance)
+
+    def track(self, records):
+        """Marca los IDs afectados por registros del ``ReservationLog``."""
+        with self._lock:
+            for entity, (upserts, deletes) in \
+                    changes_from_records(records).items():
+                dirty = self._dirty.setdefault(entity, set())
+                deleted = self._deleted.setdefault(entity, set())
+                dirty.difference_update(deletes)
+                deleted.update(deletes)
+                deleted.difference_update(upserts)
+                dirty.update(upserts)
+        if self.max_dirty and self.pending >= self.max_dirty:
+            self.flush()
+        elif self.flush_interval is not None:
+            self._schedule()
+
+    @instrumented("WriteBackCache.flush")
+    def flush(self):
+        """Escribe los cambios pendientes; devuelve cuántos IDs escribió.
+
+        Si el backend falla, los cambios siguen pendientes y se relanza la
+        excepción."""
+        store = self.store
+        with store._lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                deleted, self._deleted = self._deleted, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            changes = {}
+            for entity in set(dirty) | set(deleted):
+                entities = getattr(store, f"{entity}s")
+                upserts = {
+                    key: entities[key].to_dict()
+                    for key in dirty.get(entity, ()) if key in entities
+                }
+                deletes = deleted.get(entity, set()) | {
+                    key for key in dirty.get(entity, ())
+                    if key not in entities
+                }
+                if upserts or deletes:
+                    changes[entity] = (upserts, deletes)
+            try:
+                store.persist_changes(changes)
+            except BaseException:
+                self._restore(dirty, deleted)
+                raise
+        self.flushes += 1
+        return sum(len(upserts) + len(deletes)
+                   for upserts, deletes in changes.values())
+
+    def close(self):
+        """Escribe los cambios pendientes y desconecta el repositorio."""
+        self.flush()
+        if self.store.write_back is self:
+            self.store.write_back = None
+
+    def _restore(self, dirty, deleted):
+        """Devuelve a pendientes los IDs de un ``flush`` fallido, salvo
+        los que cambiaron mientras tanto."""
+        with self._lock:
+            for entity in set(dirty) | set(deleted):
+                newer = self._dirty.get(entity, set()) | \
+                    self._deleted.get(entity, set())
+                self._dirty.setdefault(entity, set()).update(
+                    dirty.get(entity, set()) - newer
+                )
+                self._deleted.setdefault(entity, set()).update(
+                    deleted.get(entity, set()) - newer
+                )
+        if self.flush_interval is not None:
+            self._schedule()
+
+    def _schedule(self):
+        """Programa un ``flush`` diferido si no hay uno pendiente."""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.flush_interval,
+                                          self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        """Ejecuta el ``flush`` programado por el temporizador."""
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except (OSError, ValueError) as e:
+            print(f"Error al escribir los cambios pendientes: {e}")
@@ -0,0 +1,221 @@
+"""
+Flujo de cambios (change feed) del Sistema de Reservas de Hoteles.
+
+``ChangeFeed`` se suscribe a un ``ReservationStore`` y publica cada alta,
+modificación, baja o cancelación de hoteles, clientes y reservas como un
+evento con número de secuencia creciente:
+
+    {"seq": 7, "op": "cancel", "entity": "reservation", "id": "R1",
+     "data": null, "previous": {"reservation_id": "R1", ...},
+     "hotel": {"hotel_id": "H1", ...}}
+
+Los consumidores leen en orden con un cursor (``feed.cursor()``), reciben
+los eventos en una ``queue.Queue`` (``feed.subscribe()``) o, desde otro
+proceso, siguen el archivo JSON lines del flujo con ``FileCursor``.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+
+class ChangeFeed:
+    """Flujo ordenado de los cambios de un ``ReservationStore``.
+
+    Conserva en memoria los últimos ``capacity`` eventos (todos si es
+    ``None``). Con ``filename`` además anexa cada evento a un archivo JSON
+    lines; al reabrirlo la secuencia continúa donde quedó."""
+
+    def __init__(self, store, filename=None, capacity=None):
+        self.store = store
+        self.filename = filename
+        self.capacity = capacity
+        self._events = []
+        self._first = 1
+        self._sequence = 0
+        self._queues = []
+        self._file = None
+        self._changed = threading.Condition()
+        if filename is not None:
+            self._sequence = _repair(filename)
+            self._first = self._sequence + 1
+            # pylint: disable=consider-using-with
+            self._file = open(filename, "a", encoding="utf-8")
+        store.subscribe(self._on_change)
+
+    @property
+    def sequence(self):
+        """Número de secuencia del último evento publicado."""
+        return self._sequence
+
+    def read(self, after=0, limit=None):
+        """Devuelve los eventos con secuencia mayor que ``after``.
+
+        Lanza ``ValueError`` si parte de ellos ya salió de memoria y el
+        flujo no tiene archivo del que leerlos."""
+        with self._changed:
+            if after + 1 >= self._first:
+                start = after + 1 - self._first
+                end = None if limit is None else start + limit
+                return self._events[start:end]
+            if self.filename is None:
+                raise ValueError(
+                    f"Los eventos posteriores a {after} ya no están "
+                    f"disponibles."
+                )
+            self._file.flush()
+        return FileCursor(self.filename, after).poll(limit)
+
+    def cursor(self, after=0):
+        """Crea un ``FeedCursor`` que lee desde la secuencia ``after``."""
+        return FeedCursor(self, after)
+
+    def wait(self, after, timeout=None):
+        """Espera hasta que haya eventos posteriores a ``after``; devuelve
+        ``True`` si los hay."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._sequence > after, timeout
+            )
+
+    def subscribe(self, maxsize=0):
+        """Devuelve una ``queue.Queue`` que recibirá cada nuevo evento.
+
+        Si la cola tiene ``maxsize`` y está llena, el evento se descarta
+        para ese suscriptor, que puede recuperarlo con ``read`` a partir
+        del último ``seq`` recibido."""
+        subscriber = queue.Queue(maxsize)
+        with self._changed:
+            self._queues.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Deja de enviar eventos a una cola de ``subscribe``."""
+        with self._changed:
+            if subscriber in self._queues:
+                self._queues.remove(subscriber)
+
+    def close(self):
+        """Deja de seguir el repositorio y cierra el archivo."""
+        self.store.unsubscribe(self._on_change)
+        with self._changed:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _on_change(self, record, previous):
+        """Publica un cambio del repositorio como evento."""
+        op = record["op"]
+        event = {"seq": None, "time": time.time(), "op": op,
+                 "entity": record.get("entity")}
+        if op == "put":
+            data = record["data"]
+            event.update(id=data[f"{record['entity']}_id"], data=data)
+        elif op != "reload":
+            event.update(id=record["id"], data=None)
+        if op != "reload":
+            event["previous"] = None if previous is None \
+                else previous.to_dict()
+        if op == "cancel":
+            event["hotel"] = record["hotel"]
+        with self._changed:
+            self._sequence += 1
+            event["seq"] = self._sequence
+            self._events.append(event)
+            if self.capacity is not None and \
+                    len(self._events) >= 2 * self.capacity:
+                drop = len(self._events) - self.capacity
+                del self._events[:drop]
+                self._first += drop
+            if self._file is not None:
+                self._file.write(json.dumps(event) + "\n")
+                self._file.flush()
+            for subscriber in self._queues:
+                try:
+                    subscriber.put_nowait(event)
+                except queue.Full:
+                    pass
+            self._changed.notify_all()
+
+
+class FeedCursor:
+    """Cursor de lectura de un ``ChangeFeed``; ``position`` es la
+    secuencia del último evento leído."""
+
+    def __init__(self, feed, after=0):
+        self.feed = feed
+        self.position = after
+
+    def poll(self, limit=None, timeout=None):
+        """Devuelve los eventos nuevos y avanza el cursor.
+
+        Con ``timeout`` espera hasta ese tiempo a que llegue alguno."""
+        if timeout is not None:
+            self.feed.wait(self.position, timeout)
+        events = self.feed.read(self.position, limit)
+        if events:
+            self.position = events[-1]["seq"]
+        return events
+
+
+class FileCursor:
+    """Cursor sobre el archivo de un ``ChangeFeed``, para seguir los
+    cambios desde otro proceso sin cargar los datos.
+
+    Cada ``poll`` lee solo las líneas completas agregadas desde la lectura
+    anterior."""
+
+    def __init__(self, filename, after=0):
+        self.filename = filename
+        self.position = after
+        self._offset = 0
+
+    def poll(self, limit=None):
+        """Devuelve los eventos nuevos (hasta ``limit``) y avanza."""
+        if not os.path.exists(self.filename):
+            return []
+        events = []
+        with open(self.filename, "rb") as file:
+            file.seek(self._offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                event = json.loads(line)
+                if event["seq"] > self.position:
+                    if limit is not None and len(events) >= limit:
+                        break
+                    events.append(event)
+                    self.position = event["seq"]
+                self._offset += len(line)
+        return events
+
+
+def _repair(filename):
+    """Descarta una última línea incompleta del archivo y devuelve la
+    secuencia de su último evento (0 si no hay).
+
+    Solo se lee el final del archivo."""
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, "rb+") as file:
+        size = file.seek(0, os.SEEK_END)
+        chunk = 4096
+        while True:
+            start = max(size - chunk, 0)
+            file.seek(start)
+            data = file.read()
+            end = data.rfind(b"\n") + 1
+            lines = data[:end].splitlines()
+            # Si no se leyó desde el inicio, la primera línea puede estar
+            # cortada: hace falta al menos otra completa.
+            if start == 0 or len(lines) >= 2:
+                break
+            chunk *= 2
+        if start + end != size:
+            file.truncate(start + end)
+    for line in reversed(lines):
+        if line.strip():
+            return json.loads(line)["seq"]
+    return 0
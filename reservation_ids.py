@@ -0,0 +1,78 @@
+"""
+Generación de IDs únicos del Sistema de Reservas de Hoteles.
+
+``IdGenerator`` entrega IDs crecientes que no se repiten entre hilos ni
+entre procesos que comparten el mismo archivo contador:
+
+    from reservation_ids import IdGenerator
+    generator = IdGenerator("reservations.counter", prefix="R")
+    store.create_reservation(Reservation(generator.next_id(), "C1", "H1"))
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo consultivo entre procesos
+    fcntl = None
+
+
+class IdGenerator:
+    """Generador de IDs únicos y crecientes, seguro entre hilos y procesos.
+
+    El siguiente número libre se guarda en ``filename``. Cada generador
+    reserva bloques de ``block_size`` números con el archivo bloqueado
+    (``fcntl.lockf``) y los entrega desde memoria, así que solo accede al
+    archivo una vez por bloque. Los IDs son ``prefix`` seguido del número,
+    empezando como mínimo en ``start``. Los números que queden sin usar en
+    un bloque se pierden, pero nunca se repiten."""
+
+    def __init__(self, filename, prefix="", block_size=100, start=1):
+        self.filename = filename
+        self.prefix = prefix
+        self.block_size = block_size
+        self.start = start
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        """Devuelve un ID nuevo."""
+        return self.take(1)[0]
+
+    def take(self, count):
+        """Devuelve ``count`` IDs nuevos y consecutivos dentro de cada
+        bloque, reservando de una vez lo que falte para inserciones
+        masivas."""
+        ids = []
+        with self._lock:
+            while len(ids) < count:
+                if self._next >= self._end:
+                    self._next, self._end = self._allocate(
+                        max(self.block_size, count - len(ids))
+                    )
+                last = min(self._end, self._next + count - len(ids))
+                ids.extend(f"{self.prefix}{number}"
+                           for number in range(self._next, last))
+                self._next = last
+        return ids
+
+    def _allocate(self, size):
+        """Reserva ``size`` números en el archivo; devuelve el rango."""
+        descriptor = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(descriptor, fcntl.LOCK_EX)
+            text = os.read(descriptor, 64).strip()
+            first = max(int(text), self.start) if text else self.start
+            data = str(first + size).encode("ascii")
+            # El contador solo crece: se sobrescribe antes de recortar para
+            # que el archivo nunca quede vacío.
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            os.write(descriptor, data)
+            os.ftruncate(descriptor, len(data))
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+        return first, first + size
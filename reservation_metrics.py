@@ -0,0 +1,223 @@
+"""
+Instrumentación del Sistema de Reservas de Hoteles.
+
+Las operaciones públicas de ``reservation_sys`` se decoran con
+``instrumented``; mientras ``METRICS`` está deshabilitado (por defecto) el
+costo es una comprobación de un atributo. Los accesos O(1) por registro
+(``get_*``, ``add_*``/``remove_*`` del repositorio, ``ReservationTable``,
+``RoomInventory`` y ``HotelSearchIndex``) no se decoran: incluso esa
+comprobación multiplicaría su tiempo. Al habilitarlo se acumulan
+contadores, histogramas de tiempos y bytes leídos y escritos, que pueden
+exportarse como diccionario o en formato de texto de Prometheus:
+
+    from reservation_metrics import METRICS
+    METRICS.enable()
+    ...
+    print(METRICS.prometheus())
+
+``METRICS.capture(operación)`` perfila con ``cProfile`` o ``tracemalloc``
+solo la siguiente llamada a esa operación.
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+# Límites superiores (segundos) de los buckets del histograma de tiempos.
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Capture:
+    """Perfil de una sola llamada solicitado con ``Metrics.capture``.
+
+    Tras la llamada, ``report`` contiene el texto de ``pstats`` (modo
+    ``"cprofile"``) o las líneas con más memoria asignada (modo
+    ``"tracemalloc"``) y ``done`` pasa a ``True``."""
+
+    def __init__(self, operation, mode="cprofile", limit=20):
+        if mode not in ("cprofile", "tracemalloc"):
+            raise ValueError(f"Modo de captura desconocido: {mode}")
+        self.operation = operation
+        self.mode = mode
+        self.limit = limit
+        self.report = None
+        self.done = False
+
+    def run(self, func, args, kwargs):
+        """Ejecuta ``func`` bajo el perfilador y guarda el reporte."""
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output) \
+                    .sort_stats("cumulative").print_stats(self.limit)
+                self._finish(output.getvalue())
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            peak = tracemalloc.get_traced_memory()[1]
+            if not already_tracing:
+                tracemalloc.stop()
+            lines = [f"pico: {peak} bytes"]
+            lines.extend(str(stat) for stat in stats[:self.limit])
+            self._finish("\n".join(lines))
+
+    def _finish(self, report):
+        self.report = report
+        self.done = True
+
+
+class Metrics:
+    """Registro de métricas de las operaciones (deshabilitado por defecto)."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._captures = {}
+        self.reset()
+
+    def enable(self):
+        """Habilita la recolección de métricas."""
+        self.enabled = True
+
+    def disable(self):
+        """Deshabilita la recolección (las métricas acumuladas se conservan)."""
+        self.enabled = False
+
+    def reset(self):
+        """Descarta las métricas acumuladas."""
+        with self._lock:
+            self._calls = {}
+            self._errors = {}
+            self._histograms = {}
+            self._bytes = {"read": {}, "written": {}}
+
+    def observe(self, operation, seconds, failed=False):
+        """Registra una llamada a ``operation`` que tardó ``seconds``."""
+        with self._lock:
+            self._calls[operation] = self._calls.get(operation, 0) + 1
+            if failed:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = {
+                    "buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0,
+                }
+            histogram["buckets"][bisect_left(BUCKETS, seconds)] += 1
+            histogram["sum"] += seconds
+
+    def add_bytes(self, direction, target, count):
+        """Suma ``count`` bytes leídos (``"read"``) o escritos
+        (``"written"``) sobre ``target`` (por ejemplo ``"json"``)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            totals = self._bytes[direction]
+            totals[target] = totals.get(target, 0) + count
+
+    def capture(self, operation, mode="cprofile", limit=20):
+        """Perfila la siguiente llamada a ``operation`` y devuelve el
+        ``Capture`` donde quedará el reporte."""
+        capture = Capture(operation, mode, limit)
+        with self._lock:
+            self._captures[operation] = capture
+        return capture
+
+    def call(self, operation, func, args, kwargs):
+        """Ejecuta ``func`` midiendo su duración (y perfilándola si hay una
+        captura pendiente para ``operation``)."""
+        capture = None
+        if self._captures:
+            with self._lock:
+                capture = self._captures.pop(operation, None)
+        start = time.perf_counter()
+        failed = True
+        try:
+            if capture is not None:
+                result = capture.run(func, args, kwargs)
+            else:
+                result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self.observe(operation, time.perf_counter() - start, failed)
+
+    def snapshot(self):
+        """Devuelve una copia de las métricas acumuladas."""
+        with self._lock:
+            return {
+                "operations": {
+                    operation: {
+                        "calls": self._calls[operation],
+                        "errors": self._errors.get(operation, 0),
+                        "seconds_total": histogram["sum"],
+                        "buckets": dict(zip(
+                            [*map(str, BUCKETS), "+Inf"],
+                            histogram["buckets"],
+                        )),
+                    }
+                    for operation, histogram in self._histograms.items()
+                },
+                "bytes_read": dict(self._bytes["read"]),
+                "bytes_written": dict(self._bytes["written"]),
+            }
+
+    def prometheus(self, prefix="reservation_sys"):
+        """Exporta las métricas en el formato de texto de Prometheus."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_operation_seconds histogram",
+        ]
+        for operation, stats in sorted(snapshot["operations"].items()):
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                lines.append(
+                    f'{prefix}_operation_seconds_bucket{{operation='
+                    f'"{operation}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{prefix}_operation_seconds_sum{{operation='
+                         f'"{operation}"}} {stats["seconds_total"]}')
+            lines.append(f'{prefix}_operation_seconds_count{{operation='
+                         f'"{operation}"}} {stats["calls"]}')
+        lines.append(f"# TYPE {prefix}_operation_errors_total counter")
+        for operation, stats in sorted(snapshot["operations"].items()):
+            lines.append(f'{prefix}_operation_errors_total{{operation='
+                         f'"{operation}"}} {stats["errors"]}')
+        for direction in ("read", "written"):
+            lines.append(f"# TYPE {prefix}_bytes_{direction}_total counter")
+            for target, count in sorted(
+                    snapshot[f"bytes_{direction}"].items()):
+                lines.append(f'{prefix}_bytes_{direction}_total{{target='
+                             f'"{target}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def instrumented(operation):
+    """Decora una función para medirla con ``METRICS`` como
+    ``operation``; deshabilitado, solo añade una comprobación."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            return METRICS.call(operation, func, args, kwargs)
+        return wrapper
+
+    return decorator
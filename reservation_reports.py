@@ -0,0 +1,202 @@
+"""
+Reportes del Sistema de Reservas de Hoteles.
+
+``ReportViews`` mantiene vistas materializadas sobre un ``ReservationStore``
+(reservas y noches por hotel, reservas por cliente y por ubicación) que se
+actualizan con cada cambio hecho por la API existente, de modo que leer un
+contador es O(1):
+
+    from reservation_reports import ReportViews
+    views = ReportViews(store)
+    views.occupancy("H1")
+    views.top_locations(5)
+
+``rebuild`` recalcula las vistas desde los datos y ``verify`` las compara
+con un recálculo completo.
+
+Uso: ``python reservation_reports.py`` imprime un resumen de los archivos
+JSON actuales.
+"""
+
+import heapq
+import threading
+from datetime import date
+
+from reservation_sys import Reservation, ReservationStore
+
+
+def _nights(reservation):
+    """Noches de una reserva con fechas (0 si no tiene)."""
+    if reservation.check_in is None:
+        return 0
+    return max((date.fromisoformat(reservation.check_out)
+                - date.fromisoformat(reservation.check_in)).days, 0)
+
+
+def _add(counter, key, delta):
+    """Suma ``delta`` a un contador y borra la clave si queda en cero."""
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class ReportViews:
+    """Vistas agregadas de un ``ReservationStore`` mantenidas en línea.
+
+    Se suscribe al repositorio con ``subscribe``; cada alta, baja o
+    cancelación ajusta solo los contadores afectados. ``close`` cancela la
+    suscripción."""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self.rebuild()
+        store.subscribe(self._on_change)
+
+    def close(self):
+        """Deja de seguir los cambios del repositorio."""
+        self.store.unsubscribe(self._on_change)
+
+    def rebuild(self):
+        """Recalcula todas las vistas recorriendo los datos."""
+        views = self._compute(self.store)
+        with self._lock:
+            (self.reservations_by_hotel, self.nights_by_hotel,
+             self.reservations_by_customer, self.reservations_by_location,
+             self._locations) = views
+
+    def verify(self):
+        """Compara las vistas con un recálculo completo.
+
+        Devuelve una lista de ``(vista, clave, mantenido, recalculado)``
+        con las diferencias; vacía si las vistas son correctas."""
+        names = ("reservations_by_hotel", "nights_by_hotel",
+                 "reservations_by_customer", "reservations_by_location")
+        differences = []
+        with self._lock:
+            for name, fresh in zip(names, self._compute(self.store)):
+                current = getattr(self, name)
+                for key in sorted(set(current) | set(fresh), key=str):
+                    if current.get(key, 0) != fresh.get(key, 0):
+                        differences.append((name, key, current.get(key, 0),
+                                            fresh.get(key, 0)))
+        return differences
+
+    def occupancy(self, hotel_id):
+        """Devuelve la ocupación de un hotel, o ``None`` si no existe.
+
+        ``rate`` es la fracción de habitaciones ocupadas por reservas sin
+        fechas (``rooms_available`` ya las descuenta)."""
+        hotel = self.store.get_hotel(hotel_id)
+        if hotel is None:
+            return None
+        reservations = self.reservations_by_hotel.get(hotel_id, 0)
+        undated = len(self.store.reservations_by_hotel.get(hotel_id, ())) \
+            - len(self.store.inventory.get(hotel_id, ()))
+        capacity = undated + hotel.rooms_available
+        return {
+            "hotel_id": hotel_id,
+            "reservations": reservations,
+            "nights": self.nights_by_hotel.get(hotel_id, 0),
+            "rooms_available": hotel.rooms_available,
+            "rate": undated / capacity if capacity else 0.0,
+        }
+
+    def occupancy_report(self):
+        """Devuelve la ocupación de todos los hoteles."""
+        return [self.occupancy(hotel_id) for hotel_id in self.store.hotels]
+
+    def customer_reservations(self, customer_id):
+        """Devuelve cuántas reservas tiene un cliente."""
+        return self.reservations_by_customer.get(customer_id, 0)
+
+    def top_customers(self, limit=10):
+        """Devuelve ``(customer_id, reservas)`` de los clientes con más
+        reservas."""
+        with self._lock:
+            return heapq.nlargest(limit,
+                                  self.reservations_by_customer.items(),
+                                  key=lambda item: item[1])
+
+    def top_locations(self, limit=10):
+        """Devuelve ``(ubicación, reservas)`` de las ubicaciones con más
+        reservas."""
+        with self._lock:
+            return heapq.nlargest(limit,
+                                  self.reservations_by_location.items(),
+                                  key=lambda item: item[1])
+
+    @staticmethod
+    def _compute(store):
+        """Calcula las vistas desde cero: ``(por hotel, noches por hotel,
+        por cliente, por ubicación, ubicación de cada hotel)``."""
+        by_hotel, nights, by_customer, by_location = {}, {}, {}, {}
+        locations = {hotel_id: hotel.location
+                     for hotel_id, hotel in store.hotels.items()}
+        for reservation in store.reservations.values():
+            _add(by_hotel, reservation.hotel_id, 1)
+            _add(nights, reservation.hotel_id, _nights(reservation))
+            _add(by_customer, reservation.customer_id, 1)
+            location = locations.get(reservation.hotel_id)
+            if location is not None:
+                _add(by_location, location, 1)
+        return by_hotel, nights, by_customer, by_location, locations
+
+    def _on_change(self, record, previous):
+        """Ajusta los contadores afectados por un cambio del repositorio."""
+        op, entity = record["op"], record.get("entity")
+        if op == "reload":
+            self.rebuild()
+            return
+        with self._lock:
+            if entity == "reservation":
+                if previous is not None:
+                    self._count(previous, -1)
+                if op == "put":
+                    self._count(Reservation(**record["data"]), 1)
+            elif entity == "hotel":
+                hotel_id = record["data"]["hotel_id"] if op == "put" \
+                    else record["id"]
+                location = record["data"]["location"] if op == "put" \
+                    else None
+                self._move_hotel(hotel_id, location)
+
+    def _count(self, reservation, delta):
+        """Suma o resta una reserva en las vistas."""
+        _add(self.reservations_by_hotel, reservation.hotel_id, delta)
+        _add(self.nights_by_hotel, reservation.hotel_id,
+             delta * _nights(reservation))
+        _add(self.reservations_by_customer, reservation.customer_id, delta)
+        location = self._locations.get(reservation.hotel_id)
+        if location is not None:
+            _add(self.reservations_by_location, location, delta)
+
+    def _move_hotel(self, hotel_id, location):
+        """Cambia la ubicación de un hotel (``None`` si se eliminó) y
+        traslada sus reservas entre ubicaciones."""
+        previous = self._locations.pop(hotel_id, None)
+        if location is not None:
+            self._locations[hotel_id] = location
+        if previous == location:
+            return
+        count = self.reservations_by_hotel.get(hotel_id, 0)
+        if previous is not None:
+            _add(self.reservations_by_location, previous, -count)
+        if location is not None:
+            _add(self.reservations_by_location, location, count)
+
+
+def main():
+    """Imprime un resumen de ocupación de los archivos JSON actuales."""
+    views = ReportViews(ReservationStore.load())
+    for row in views.occupancy_report():
+        print(f"{row['hotel_id']}: {row['reservations']} reservas, "
+              f"{row['nights']} noches, ocupación {row['rate']:.0%}")
+    for location, count in views.top_locations(5):
+        print(f"{location}: {count} reservas")
+
+
+if __name__ == "__main__":
+    main()
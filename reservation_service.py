@@ -0,0 +1,270 @@
+"""
+Servicio asyncio del Sistema de Reservas de Hoteles.
+
+Mantiene hoteles, clientes y reservas en memoria y atiende peticiones JSON,
+una por línea, sobre TCP o un socket Unix. Cada petición es un objeto con
+``op``, un ``id`` opcional que se devuelve en la respuesta y los argumentos
+de la operación:
+
+    {"id": 1, "op": "reserve", "reservation_id": "R1",
+     "customer_id": "C1", "hotel_id": "H1"}
+    {"id": 1, "ok": true, "result": {"reservation_id": "R1", ...}}
+
+Las reservas y cancelaciones que llegan juntas se agrupan en lotes que se
+escriben con un solo ``flush`` fuera del ciclo de eventos; cada petición se
+responde cuando su lote ya está guardado. Si el lote no se puede guardar,
+sus cambios se deshacen también en memoria y todas sus peticiones reciben
+el error.
+
+Uso:
+    ``python reservation_service.py --port 8765``
+    ``python reservation_service.py --unix /tmp/reservations.sock``
+"""
+
+import argparse
+import asyncio
+import json
+
+from reservation_booking import BookingEngine
+from reservation_cache import WriteBackCache
+from reservation_sys import ReservationStore
+
+
+def _as_dict(instance):
+    """Convierte una entidad (o ``None``) en diccionario."""
+    return None if instance is None else instance.to_dict()
+
+
+# Operaciones de solo lectura: se resuelven en memoria sin esperar lotes.
+_READS = {
+    "get_hotel": lambda store, hotel_id: _as_dict(store.get_hotel(hotel_id)),
+    "get_customer": lambda store, customer_id: _as_dict(
+        store.get_customer(customer_id)
+    ),
+    "get_reservation": lambda store, reservation_id: _as_dict(
+        store.get_reservation(reservation_id)
+    ),
+    "find_hotels": lambda store, location=None, prefix="", limit=None: [
+        hotel.to_dict()
+        for hotel in store.find_hotels(location, prefix, limit)
+    ],
+    "available_hotels": lambda store, check_in, check_out, location=None: [
+        hotel.to_dict()
+        for hotel in store.available_hotels(check_in, check_out, location)
+    ],
+}
+
+_WRITES = ("reserve", "cancel")
+
+
+class ReservationService:
+    """Servicio de reservas con los datos residentes en memoria.
+
+    ``store`` debe estar en modo instantánea (``ReservationStore.load``):
+    el servicio le conecta un ``WriteBackCache`` y, por cada lote de hasta
+    ``max_batch`` reservas y cancelaciones reunidas durante
+    ``batch_window`` segundos, ejecuta un solo ``flush`` con
+    ``asyncio.to_thread``. Un lote que falla al guardarse se deshace en
+    memoria, de modo que los datos residentes siempre coinciden con lo
+    confirmado en disco."""
+
+    def __init__(self, store, batch_window=0.002, max_batch=256):
+        self.store = store
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.cache = WriteBackCache(store)
+        self.engine = BookingEngine(store)
+        self._queue = None
+        self._batcher = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Comienza a escuchar en ``host``/``port`` o, con ``path``, en un
+        socket Unix. Devuelve el ``asyncio.Server``."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host,
+                                                      port)
+        return self._server
+
+    async def close(self):
+        """Deja de aceptar conexiones, termina los lotes pendientes y
+        escribe los cambios que queden."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            await self._queue.put(None)
+            await self._batcher
+            self._batcher = None
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None and not item[2].done():
+                    item[2].set_exception(
+                        ValueError("El servicio se está deteniendo.")
+                    )
+            self._queue = None
+        await asyncio.to_thread(self.cache.close)
+
+    async def handle_request(self, message):
+        """Atiende una petición ya decodificada y devuelve la respuesta."""
+        response = {"id": message.get("id")} if isinstance(message, dict) \
+            else {"id": None}
+        try:
+            if not isinstance(message, dict):
+                raise ValueError("La petición debe ser un objeto.")
+            params = {key: value for key, value in message.items()
+                      if key not in ("id", "op")}
+            op = message.get("op")
+            if op in _READS:
+                result = _READS[op](self.store, **params)
+            elif op in _WRITES:
+                if self._queue is None:
+                    raise ValueError("El servicio no está iniciado.")
+                future = asyncio.get_running_loop().create_future()
+                await self._queue.put((op, params, future))
+                result = await future
+            else:
+                raise ValueError(f"Operación desconocida: {op}")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            response.update(ok=False, error=str(e))
+        else:
+            response.update(ok=True, result=result)
+        return response
+
+    async def _handle(self, reader, writer):
+        """Atiende una conexión: una petición y una respuesta por línea."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    response = {"id": None, "ok": False,
+                                "error": f"JSON inválido: {e}"}
+                else:
+                    response = await self.handle_request(message)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _run_batches(self):
+        """Reúne reservas y cancelaciones en lotes y los guarda juntos.
+
+        Un error inesperado en un lote se entrega a sus peticiones sin
+        detener el procesamiento de los siguientes."""
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._commit(batch)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _commit(self, batch):
+        """Aplica un lote en memoria, lo guarda con un solo ``flush`` y
+        responde a cada petición.
+
+        Si el ``flush`` falla, el estado en memoria de las entidades que
+        tocó el lote se restaura y ninguna petición se confirma."""
+        state = {}
+        outcomes = []
+        for op, params, future in batch:
+            try:
+                self.store.capture_state(self._targets(op, params), state)
+                outcomes.append((future, self._execute(op, params), None))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                outcomes.append((future, None, e))
+        try:
+            await asyncio.to_thread(self.cache.flush)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Se deshacen los cambios en memoria (y se avisa a los
+            # suscriptores, que ya los recibieron); los IDs que quedan
+            # pendientes en la caché ya coinciden con el disco.
+            self.store.restore_state(state, notify=True)
+            error = OSError(f"Error al guardar: {e}")
+            outcomes = [(future, None, failure or error)
+                        for future, _, failure in outcomes]
+        self.batches += 1
+        for future, result, failure in outcomes:
+            if future.cancelled():
+                continue
+            if failure is not None:
+                future.set_exception(failure)
+            else:
+                future.set_result(result)
+
+    def _targets(self, op, params):
+        """Devuelve las entidades ``(entidad, ID)`` que puede modificar una
+        reserva o cancelación."""
+        reservation_id = params.get("reservation_id")
+        if op == "reserve":
+            hotel_id = params.get("hotel_id")
+        else:
+            reservation = self.store.get_reservation(reservation_id)
+            hotel_id = None if reservation is None else reservation.hotel_id
+        return [("reservation", reservation_id)] + \
+            ([] if hotel_id is None else [("hotel", hotel_id)])
+
+    def _execute(self, op, params):
+        """Ejecuta una reserva o cancelación en memoria."""
+        if op == "reserve":
+            return _as_dict(self.engine.reserve(**params))
+        return _as_dict(self.engine.cancel(**params))
+
+
+async def serve(host="127.0.0.1", port=8765, path=None,
+                hotels_file="hotels.json", customers_file="customers.json",
+                reservations_file="reservations.json"):
+    """Carga los archivos y atiende peticiones hasta ser cancelado."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    store = await asyncio.to_thread(ReservationStore.load, hotels_file,
+                                    customers_file, reservations_file)
+    service = ReservationService(store)
+    server = await service.start(host, port, path)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    """Ejecuta el servicio desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="ruta de un socket Unix")
+    parser.add_argument("--hotels", default="hotels.json")
+    parser.add_argument("--customers", default="customers.json")
+    parser.add_argument("--reservations", default="reservations.json")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.hotels,
+                          args.customers, args.reservations))
+    except KeyboardInterrupt:
+        print("Servicio detenido.")
+
+
+if __name__ == "__main__":
+    main()
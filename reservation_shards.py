@@ -0,0 +1,263 @@
+"""
+Almacenamiento particionado (shards) del Sistema de Reservas de Hoteles.
+
+Reparte las reservas, y opcionalmente los hoteles, en ``N`` directorios
+según ``crc32(hotel_id) % N``; los clientes quedan en un solo archivo. Como
+backend, enruta ``load_reservations``, ``save_reservations`` y
+``cancel_reservation`` a los archivos de cada shard, de modo que un cambio
+solo reescribe los archivos del shard afectado:
+
+    from reservation_sys import set_backend
+    from reservation_shards import ShardedBackend
+    set_backend(ShardedBackend("datos", shards=8))
+
+Con ``map_shards`` cada shard se procesa en un proceso distinto sin
+contención, porque ningún par de procesos escribe los mismos archivos (por
+eso requiere que los hoteles también estén particionados).
+
+Uso para particionar o unir los archivos JSON actuales:
+    ``python reservation_shards.py split datos --shards 8``
+    ``python reservation_shards.py merge datos``
+"""
+
+import argparse
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from reservation_sys import (
+    COMMIT_JOURNAL, DEFAULT_FILES, JsonBackend, StorageBackend, atomic_write,
+    recover_files, set_backend
+)
+
+LAYOUT_FILE = "shards.json"
+
+
+def shard_of(hotel_id, shards):
+    """Devuelve el shard (de ``0`` a ``shards - 1``) de un ``hotel_id``."""
+    return zlib.crc32(str(hotel_id).encode("utf-8")) % shards
+
+
+class ShardedBackend(StorageBackend):
+    """``StorageBackend`` que particiona los datos por ``hotel_id``.
+
+    La cantidad de shards y si los hoteles también se particionan se
+    guardan en ``shards.json`` dentro de ``directory``; al reabrir basta con
+    el directorio. ``apply`` agrupa los cambios por shard y confirma cada
+    grupo con ``commit_files`` en el directorio del shard, así que es
+    atómico por shard. El argumento ``name`` de la interfaz se ignora."""
+
+    def __init__(self, directory, shards=None, shard_hotels=True):
+        self.directory = directory
+        layout_file = os.path.join(directory, LAYOUT_FILE)
+        if os.path.exists(layout_file):
+            with open(layout_file, "r", encoding="utf-8") as file:
+                layout = json.load(file)
+            if shards is not None and shards != layout["shards"]:
+                raise ValueError(
+                    f"{directory} tiene {layout['shards']} shards, no {shards}."
+                )
+        else:
+            if not shards or shards < 1:
+                raise ValueError("Indique una cantidad de shards positiva.")
+            layout = {"shards": shards, "shard_hotels": shard_hotels}
+            for shard in range(shards):
+                os.makedirs(self._shard_directory(shard), exist_ok=True)
+            atomic_write(layout_file, json.dumps(layout))
+        self.shards = layout["shards"]
+        self.shard_hotels = layout["shard_hotels"]
+        self._json = JsonBackend()
+        # Shard conocido de cada ID, para enrutar las bajas (que solo
+        # traen el ID) sin recorrer todos los shards.
+        self._locations = {"hotel": {}, "reservation": {}}
+
+    def shard_of(self, hotel_id):
+        """Devuelve el shard de un ``hotel_id``."""
+        return shard_of(hotel_id, self.shards)
+
+    def shard_files(self, shard):
+        """Devuelve ``(hoteles, clientes, reservas)`` de un shard, para
+        abrirlo como un ``ReservationStore`` independiente."""
+        return tuple(self._path(entity, shard) for entity in DEFAULT_FILES)
+
+    def load(self, entity, name=None):
+        """Devuelve las entidades de todos los shards."""
+        if not self._sharded(entity):
+            return self._json.load(entity, self._path(entity))
+        entities = []
+        locations = self._locations[entity]
+        for shard in range(self.shards):
+            loaded = self._json.load(entity, self._path(entity, shard))
+            for instance in loaded:
+                locations[getattr(instance, f"{entity}_id")] = shard
+            entities.extend(loaded)
+        return entities
+
+    def save(self, entity, entities, name=None):
+        """Reemplaza la colección completa, repartida por shard."""
+        if not self._sharded(entity):
+            self._json.save(entity, entities, self._path(entity))
+            return
+        partitions = [[] for _ in range(self.shards)]
+        locations = self._locations[entity] = {}
+        for instance in entities:
+            shard = self.shard_of(instance.hotel_id)
+            partitions[shard].append(instance)
+            locations[getattr(instance, f"{entity}_id")] = shard
+        for shard, partition in enumerate(partitions):
+            self._json.save(entity, partition, self._path(entity, shard))
+
+    def apply(self, changes, store=None):
+        """Aplica los cambios reescribiendo solo los shards afectados."""
+        groups = {}
+        for entity, (_, upserts, deletes) in changes.items():
+            if upserts is None:
+                # Reescritura completa desde el estado en memoria.
+                self.save(entity, getattr(store, f"{entity}_list")())
+                continue
+            for shard, shard_upserts, shard_deletes in \
+                    self._route(entity, upserts, deletes or ()):
+                groups.setdefault(shard, {})[entity] = (
+                    self._path(entity, shard), shard_upserts, shard_deletes
+                )
+        for group in groups.values():
+            self._json.apply(group)
+
+    def recover(self, name=None):
+        """Completa los ``commit_files`` pendientes de todos los shards."""
+        recover_files(os.path.join(self.directory, COMMIT_JOURNAL))
+        for shard in range(self.shards):
+            recover_files(os.path.join(self._shard_directory(shard),
+                                       COMMIT_JOURNAL))
+
+    def _route(self, entity, upserts, deletes):
+        """Reparte altas y bajas de una entidad en
+        ``(shard, upserts, deletes)``; ``shard`` es ``None`` si la entidad
+        no se particiona."""
+        if not self._sharded(entity):
+            return [(None, upserts, set(deletes))]
+        locations = self._locations[entity]
+        routed = {}
+
+        def bucket(shard):
+            return routed.setdefault(shard, ({}, set()))
+
+        for identifier, data in upserts.items():
+            shard = self.shard_of(data["hotel_id"])
+            previous = locations.get(identifier)
+            if previous is not None and previous != shard:
+                bucket(previous)[1].add(identifier)
+            bucket(shard)[0][identifier] = data
+            locations[identifier] = shard
+        for identifier in deletes:
+            shard = locations.pop(identifier, None)
+            shards = range(self.shards) if shard is None else (shard,)
+            for candidate in shards:
+                bucket(candidate)[1].add(identifier)
+        return [(shard, shard_upserts, shard_deletes)
+                for shard, (shard_upserts, shard_deletes) in routed.items()]
+
+    def _sharded(self, entity):
+        """Indica si ``entity`` se reparte por shard."""
+        return entity == "reservation" or (entity == "hotel"
+                                           and self.shard_hotels)
+
+    def _shard_directory(self, shard):
+        """Directorio de un shard."""
+        return os.path.join(self.directory, f"shard-{shard:03d}")
+
+    def _path(self, entity, shard=None):
+        """Ruta del archivo de ``entity`` (en el shard si se reparte)."""
+        if shard is None or not self._sharded(entity):
+            return os.path.join(self.directory, DEFAULT_FILES[entity])
+        return os.path.join(self._shard_directory(shard),
+                            DEFAULT_FILES[entity])
+
+
+def map_shards(func, directory, processes=None):
+    """Ejecuta ``func(hoteles, clientes, reservas)`` con los archivos de
+    cada shard en un ``ProcessPoolExecutor`` y devuelve los resultados en
+    orden de shard.
+
+    ``func`` debe ser una función de módulo. Cada proceso puede abrir su
+    shard con ``ReservationStore.load`` y escribirlo sin bloquear a los
+    demás; el archivo de clientes es común y debe tratarse como de solo
+    lectura. Lanza ``ValueError`` si los hoteles no se particionan: todos
+    los procesos compartirían el mismo archivo de hoteles y una
+    cancelación pisaría los cambios de otra."""
+    backend = ShardedBackend(directory)
+    if not backend.shard_hotels:
+        raise ValueError(
+            f"{directory} no particiona los hoteles; map_shards no puede "
+            f"escribirlos en paralelo."
+        )
+    files = [backend.shard_files(shard) for shard in range(backend.shards)]
+    # Dentro de cada proceso los archivos del shard se leen como JSON
+    # simple, aunque el proceso padre tenga configurado este backend.
+    with ProcessPoolExecutor(processes, initializer=set_backend,
+                             initargs=(JsonBackend(),)) as executor:
+        return list(executor.map(func, *zip(*files)))
+
+
+def split_json(directory, shards, hotels_file="hotels.json",
+               customers_file="customers.json",
+               reservations_file="reservations.json", shard_hotels=True):
+    """Particiona los archivos JSON actuales en ``directory``.
+
+    Devuelve la cantidad de registros copiados por entidad."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source = JsonBackend()
+    target = ShardedBackend(directory, shards, shard_hotels)
+    counts = {}
+    for entity, filename in (("hotel", hotels_file),
+                             ("customer", customers_file),
+                             ("reservation", reservations_file)):
+        entities = source.load(entity, filename)
+        target.save(entity, entities)
+        counts[entity] = len(entities)
+    return counts
+
+
+def merge_json(directory, hotels_file="hotels.json",
+               customers_file="customers.json",
+               reservations_file="reservations.json"):
+    """Une los shards de ``directory`` en los archivos JSON de siempre.
+
+    Devuelve la cantidad de registros copiados por entidad."""
+    source = ShardedBackend(directory)
+    target = JsonBackend()
+    counts = {}
+    for entity, filename in (("hotel", hotels_file),
+                             ("customer", customers_file),
+                             ("reservation", reservations_file)):
+        entities = source.load(entity)
+        target.save(entity, entities, filename)
+        counts[entity] = len(entities)
+    return counts
+
+
+def main():
+    """Particiona o une los archivos desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["split", "merge"])
+    parser.add_argument("directory")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--hotels", default="hotels.json")
+    parser.add_argument("--customers", default="customers.json")
+    parser.add_argument("--reservations", default="reservations.json")
+    parser.add_argument("--no-shard-hotels", action="store_true")
+    args = parser.parse_args()
+    if args.command == "split":
+        counts = split_json(args.directory, args.shards, args.hotels,
+                            args.customers, args.reservations,
+                            not args.no_shard_hotels)
+    else:
+        counts = merge_json(args.directory, args.hotels, args.customers,
+                            args.reservations)
+    for entity, count in counts.items():
+        print(f"{entity}: {count} registros copiados.")
+
+
+if __name__ == "__main__":
+    main()
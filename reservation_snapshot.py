@@ -0,0 +1,286 @@
+"""
+Instantánea binaria del Sistema de Reservas de Hoteles.
+
+Guarda hoteles, clientes y reservas en un solo archivo con registros de
+ancho fijo, una tabla de cadenas (cada texto repetido se guarda una vez) y,
+por entidad, un índice ordenado por ID con el número de cada registro. El
+archivo se lee con ``mmap``: abrirlo no deserializa nada y cada
+``find_*`` decodifica solo el registro encontrado:
+
+    from reservation_snapshot import SnapshotReader
+    with SnapshotReader("snapshot.bin") as snapshot:
+        hotel = snapshot.find_hotel("H1")
+
+Uso para convertir desde y hacia los archivos JSON:
+    ``python reservation_snapshot.py to-binary snapshot.bin``
+    ``python reservation_snapshot.py to-json snapshot.bin``
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from datetime import date
+
+from reservation_sys import (
+    ENTITY_CLASSES, JsonBackend, ReservationStore, atomic_open
+)
+
+MAGIC = b"RSNP"
+VERSION = 1
+
+ENTITIES = ("hotel", "customer", "reservation")
+
+# Campos de cada entidad: ``s`` cadena (desplazamiento y longitud en la
+# tabla de cadenas), ``i`` entero y ``d`` fecha ISO como ordinal (0 = None).
+_FIELDS = {
+    "hotel": (("hotel_id", "s"), ("name", "s"), ("location", "s"),
+              ("rooms_available", "i")),
+    "customer": (("customer_id", "s"), ("name", "s"), ("email", "s")),
+    "reservation": (("reservation_id", "s"), ("customer_id", "s"),
+                    ("hotel_id", "s"), ("check_in", "d"),
+                    ("check_out", "d")),
+}
+
+_CODES = {"s": "II", "i": "q", "d": "i"}
+
+_RECORDS = {
+    entity: struct.Struct(
+        "<" + "".join(_CODES[kind] for _, kind in fields)
+    )
+    for entity, fields in _FIELDS.items()
+}
+
+# Encabezado: firma, versión, por entidad (registros, desplazamiento de los
+# registros, desplazamiento del índice) y desplazamiento de las cadenas.
+_HEADER = struct.Struct("<4sI" + "QQQ" * len(ENTITIES) + "Q")
+
+_INDEX = struct.Struct("<I")
+
+
+class SnapshotError(ValueError):
+    """El archivo no es una instantánea válida."""
+
+
+class _StringTable:
+    """Tabla de cadenas UTF-8 sin repetidos."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._refs = {}
+
+    def add(self, text):
+        """Devuelve ``(desplazamiento, longitud)`` de ``text``."""
+        ref = self._refs.get(text)
+        if ref is None:
+            encoded = str(text).encode("utf-8")
+            ref = self._refs[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return ref
+
+
+def write_snapshot(filename, hotels=(), customers=(), reservations=()):
+    """Escribe una instantánea binaria con las entidades indicadas.
+
+    Si un ID se repite se conserva la última entidad. El archivo se escribe
+    en un temporal que se renombra al terminar. Devuelve la cantidad de
+    registros por entidad."""
+    strings = _StringTable()
+    sections = []
+    for entity, entities in zip(ENTITIES, (hotels, customers, reservations)):
+        key = f"{entity}_id"
+        unique = {getattr(instance, key): instance for instance in entities}
+        records = bytearray()
+        for instance in unique.values():
+            values = []
+            for name, kind in _FIELDS[entity]:
+                value = getattr(instance, name)
+                if kind == "s":
+                    values.extend(strings.add(value))
+                elif kind == "d":
+                    values.append(
+                        date.fromisoformat(value).toordinal() if value else 0
+                    )
+                else:
+                    values.append(value)
+            records += _RECORDS[entity].pack(*values)
+        keys = [str(identifier).encode("utf-8") for identifier in unique]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        index = struct.pack(f"<{len(order)}I", *order)
+        sections.append((len(unique), records, index))
+    header = []
+    offset = _HEADER.size
+    for count, records, index in sections:
+        header.extend((count, offset, offset + len(records)))
+        offset += len(records) + len(index)
+    with atomic_open(filename, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, *header, offset))
+        for _, records, index in sections:
+            file.write(records)
+            file.write(index)
+        file.write(strings.data)
+    return {entity: section[0] for entity, section in zip(ENTITIES, sections)}
+
+
+class SnapshotReader:
+    """Lector de una instantánea binaria sobre ``mmap``.
+
+    Las búsquedas por ID son binarias sobre el índice ordenado (O(log n))
+    y solo decodifican el registro encontrado; las iteraciones devuelven
+    las entidades en el orden en que se escribieron."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size:
+                raise SnapshotError(f"{filename} no es una instantánea.")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        values = _HEADER.unpack_from(self._map)
+        if values[0] != MAGIC or values[1] != VERSION:
+            self._map.close()
+            raise SnapshotError(f"{filename} no es una instantánea "
+                                f"compatible.")
+        self._sections = {
+            entity: values[2 + 3 * position:5 + 3 * position]
+            for position, entity in enumerate(ENTITIES)
+        }
+        self._strings = values[-1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def count(self, entity):
+        """Devuelve la cantidad de registros de ``entity``."""
+        return self._sections[entity][0]
+
+    def find(self, entity, identifier):
+        """Busca una entidad por su ID; devuelve ``None`` si no existe."""
+        count, records, index = self._sections[entity]
+        layout = _RECORDS[entity]
+        key = str(identifier).encode("utf-8")
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            number = _INDEX.unpack_from(
+                self._map, index + middle * _INDEX.size
+            )[0]
+            position = records + number * layout.size
+            offset, length = struct.unpack_from("<II", self._map, position)
+            start = self._strings + offset
+            current = self._map[start:start + length]
+            if current == key:
+                return self._decode(entity, position)
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def find_hotel(self, hotel_id):
+        """Busca un hotel por su ID."""
+        return self.find("hotel", hotel_id)
+
+    def find_customer(self, customer_id):
+        """Busca un cliente por su ID."""
+        return self.find("customer", customer_id)
+
+    def find_reservation(self, reservation_id):
+        """Busca una reserva por su ID."""
+        return self.find("reservation", reservation_id)
+
+    def iter_entities(self, entity):
+        """Genera las entidades de ``entity`` en orden de escritura."""
+        count, records, _ = self._sections[entity]
+        size = _RECORDS[entity].size
+        for number in range(count):
+            yield self._decode(entity, records + number * size)
+
+    def iter_hotels(self):
+        """Genera los hoteles."""
+        return self.iter_entities("hotel")
+
+    def iter_customers(self):
+        """Genera los clientes."""
+        return self.iter_entities("customer")
+
+    def iter_reservations(self):
+        """Genera las reservas."""
+        return self.iter_entities("reservation")
+
+    def to_store(self):
+        """Carga la instantánea completa en un ``ReservationStore``."""
+        return ReservationStore(self.iter_hotels(), self.iter_customers(),
+                                self.iter_reservations())
+
+    def close(self):
+        """Libera el mapeo del archivo."""
+        self._map.close()
+
+    def _decode(self, entity, position):
+        """Construye la entidad del registro en ``position``."""
+        values = iter(_RECORDS[entity].unpack_from(self._map, position))
+        data = {}
+        for name, kind in _FIELDS[entity]:
+            value = next(values)
+            if kind == "s":
+                start = self._strings + value
+                value = self._map[start:start + next(values)].decode("utf-8")
+            elif kind == "d":
+                value = date.fromordinal(value).isoformat() if value else None
+            data[name] = value
+        return ENTITY_CLASSES[entity](**data)
+
+
+def json_to_snapshot(filename, hotels_file="hotels.json",
+                     customers_file="customers.json",
+                     reservations_file="reservations.json"):
+    """Convierte los archivos JSON en una instantánea binaria y devuelve la
+    cantidad de registros por entidad."""
+    source = JsonBackend()
+    return write_snapshot(
+        filename,
+        source.load("hotel", hotels_file),
+        source.load("customer", customers_file),
+        source.load("reservation", reservations_file),
+    )
+
+
+def snapshot_to_json(filename, hotels_file="hotels.json",
+                     customers_file="customers.json",
+                     reservations_file="reservations.json"):
+    """Escribe el contenido de una instantánea binaria en los archivos JSON
+    y devuelve la cantidad de registros por entidad."""
+    target = JsonBackend()
+    counts = {}
+    with SnapshotReader(filename) as snapshot:
+        for entity, name in zip(ENTITIES, (hotels_file, customers_file,
+                                           reservations_file)):
+            target.save(entity, snapshot.iter_entities(entity), name)
+            counts[entity] = snapshot.count(entity)
+    return counts
+
+
+def main():
+    """Ejecuta la conversión desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["to-binary", "to-json"])
+    parser.add_argument("snapshot")
+    parser.add_argument("--hotels", default="hotels.json")
+    parser.add_argument("--customers", default="customers.json")
+    parser.add_argument("--reservations", default="reservations.json")
+    args = parser.parse_args()
+    convert = json_to_snapshot if args.command == "to-binary" \
+        else snapshot_to_json
+    counts = convert(args.snapshot, args.hotels, args.customers,
+                     args.reservations)
+    for entity, count in counts.items():
+        print(f"{entity}: {count} registros convertidos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Backend SQLite del Sistema de Reservas de Hoteles.
+
+Guarda hoteles, clientes y reservas en tablas indexadas de una base SQLite
+(modo WAL) detrás de la misma API de ``Hotel``, ``Customer``,
+``Reservation`` y ``ReservationStore``:
+
+    from reservation_sys import set_backend
+    from reservation_sqlite import SQLiteBackend
+    set_backend(SQLiteBackend("reservations.db"))
+
+Uso para migrar los archivos JSON actuales:
+    ``python reservation_sqlite.py migrate reservations.db``
+"""
+
+import argparse
+import sqlite3
+import threading
+
+from reservation_sys import (
+    Customer, Hotel, JsonBackend, Reservation, StorageBackend
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    hotel_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    location TEXT NOT NULL,
+    rooms_available INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hotels_location ON hotels (location);
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    reservation_id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    hotel_id TEXT NOT NULL,
+    check_in TEXT,
+    check_out TEXT
+);
+CREATE INDEX IF NOT EXISTS reservations_hotel ON reservations (hotel_id);
+CREATE INDEX IF NOT EXISTS reservations_customer
+    ON reservations (customer_id);
+"""
+
+# Tabla, columnas y modelo de cada entidad; la primera columna es la clave.
+_TABLES = {
+    "hotel": ("hotels", ("hotel_id", "name", "location", "rooms_available"),
+              Hotel),
+    "customer": ("customers", ("customer_id", "name", "email"), Customer),
+    "reservation": ("reservations", ("reservation_id", "customer_id",
+                                     "hotel_id", "check_in", "check_out"),
+                    Reservation),
+}
+
+
+def _statements(table, columns):
+    """Construye las sentencias (constantes, por lo que ``sqlite3`` las
+    reutiliza ya preparadas) de una tabla."""
+    key = columns[0]
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{column} = excluded.{column}"
+                        for column in columns[1:])
+    names = ", ".join(columns)
+    return {
+        "select": f"SELECT {names} FROM {table} ORDER BY rowid",
+        "get": f"SELECT {names} FROM {table} WHERE {key} = ?",
+        "upsert": (f"INSERT INTO {table} ({names}) VALUES ({placeholders}) "
+                   f"ON CONFLICT ({key}) DO UPDATE SET {updates}"),
+        "delete": f"DELETE FROM {table} WHERE {key} = ?",
+        "clear": f"DELETE FROM {table}",
+    }
+
+
+_SQL = {entity: _statements(table, columns)
+        for entity, (table, columns, _) in _TABLES.items()}
+
+
+class SQLiteBackend(StorageBackend):
+    """``StorageBackend`` sobre ``sqlite3`` con tablas indexadas y WAL.
+
+    El argumento ``name`` de la interfaz (el nombre de archivo JSON) se
+    ignora: cada entidad vive en su tabla. Los cambios incrementales de
+    ``apply`` se escriben como ``UPSERT``/``DELETE`` por fila dentro de una
+    sola transacción, por lo que su costo es proporcional al cambio."""
+
+    def __init__(self, database="reservations.db"):
+        self.database = database
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def load(self, entity, name=None):
+        """Devuelve las entidades de la tabla en orden de inserción."""
+        model = _TABLES[entity][2]
+        with self._lock:
+            rows = self._connection.execute(_SQL[entity]["select"]).fetchall()
+        return [model(*row) for row in rows]
+
+    def get(self, entity, identifier):
+        """Busca una entidad por su ID usando la clave primaria."""
+        with self._lock:
+            row = self._connection.execute(
+                _SQL[entity]["get"], (identifier,)
+            ).fetchone()
+        return None if row is None else _TABLES[entity][2](*row)
+
+    def save(self, entity, entities, name=None):
+        """Reemplaza la tabla completa por ``entities``."""
+        with self._lock, self._connection:
+            self._connection.execute(_SQL[entity]["clear"])
+            self._connection.executemany(
+                _SQL[entity]["upsert"],
+                (_row(entity, instance.to_dict()) for instance in entities),
+            )
+
+    def apply(self, changes, store=None):
+        """Aplica los cambios de todas las entidades en una transacción."""
+        with self._lock, self._connection:
+            for entity, (_, upserts, deletes) in changes.items():
+                sql = _SQL[entity]
+                if upserts is None:
+                    # Reescritura completa desde el estado en memoria.
+                    self._connection.execute(sql["clear"])
+                    rows = [instance.to_dict() for instance in
+                            getattr(store, f"{entity}_list")()]
+                else:
+                    rows = upserts.values()
+                self._connection.executemany(
+                    sql["delete"], ((key,) for key in deletes or ())
+                )
+                self._connection.executemany(
+                    sql["upsert"], (_row(entity, data) for data in rows)
+                )
+
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._connection.close()
+
+
+def _row(entity, data):
+    """Convierte el diccionario de una entidad en una fila de su tabla."""
+    return tuple(data.get(column) for column in _TABLES[entity][1])
+
+
+def migrate_json(database, hotels_file="hotels.json",
+                 customers_file="customers.json",
+                 reservations_file="reservations.json"):
+    """Copia los archivos JSON actuales a una base SQLite.
+
+    Devuelve la cantidad de registros copiados por entidad."""
+    source = JsonBackend()
+    target = SQLiteBackend(database)
+    counts = {}
+    try:
+        for entity, filename in (("hotel", hotels_file),
+                                 ("customer", customers_file),
+                                 ("reservation", reservations_file)):
+            entities = source.load(entity, filename)
+            target.save(entity, entities)
+            counts[entity] = len(entities)
+    finally:
+        target.close()
+    return counts
+
+
+def main():
+    """Ejecuta la migración desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("database")
+    parser.add_argument("--hotels", default="hotels.json")
+    parser.add_argument("--customers", default="customers.json")
+    parser.add_argument("--reservations", default="reservations.json")
+    args = parser.parse_args()
+    counts = migrate_json(args.database, args.hotels, args.customers,
+                          args.reservations)
+    for entity, count in counts.items():
+        print(f"{entity}: {count} registros migrados.")
+
+
+if __name__ == "__main__":
+    main()
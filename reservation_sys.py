@@ -3,15 +3,362 @@ Módulo de Sistema de Reservas de Hoteles.
 
 Este módulo permite gestionar hoteles, clientes y reservas con persistencia
 de datos en archivos JSON.
+
+Las operaciones públicas están instrumentadas con ``reservation_metrics``
+(deshabilitado por defecto).
 """
 
 import json
 import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+from contextlib import contextmanager, suppress
+from datetime import date
+
+from reservation_metrics import METRICS, instrumented
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo consultivo entre procesos
+    fcntl = None
+
+COMMIT_JOURNAL = "commit.journal"
+
+
+@contextmanager
+def atomic_open(filename, mode="w", **kwargs):
+    """Abre un archivo temporal que reemplaza a ``filename`` al salir del
+    bloque ``with`` sin errores.
+
+    El temporal está en el mismo directorio, se sincroniza con ``fsync`` y
+    se renombra sobre el destino, de modo que un lector nunca ve un archivo
+    a medio escribir. Lleva el proceso y el hilo en el nombre para que
+    escrituras simultáneas no lo compartan; si el bloque falla se borra.
+    ``mode`` y ``kwargs`` se pasan a ``open``."""
+    temp_name = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_name, mode, **kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, filename)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(temp_name)
+        raise
+
+
+@instrumented("atomic_write")
+def atomic_write(filename, text):
+    """Escribe ``text`` en ``filename`` de forma atómica (ver
+    ``atomic_open``)."""
+    with atomic_open(filename, encoding="utf-8") as file:
+        file.write(text)
+    if METRICS.enabled:
+        METRICS.add_bytes("written", "json", len(text.encode("utf-8")))
+
+
+_COMMIT_GUARD = threading.Lock()
+
+
+@contextmanager
+def _commit_lock(journal_file):
+    """Excluye a otros hilos y procesos de las confirmaciones que usan
+    ``journal_file`` mientras dura el bloque ``with``.
+
+    Se bloquea con ``fcntl.flock`` el archivo ``<diario>.lock``; sin
+    ``fcntl`` solo se excluye a los hilos del proceso."""
+    if fcntl is None:
+        with _COMMIT_GUARD:
+            yield
+        return
+    with open(f"{journal_file}.lock", "ab") as file:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+@instrumented("commit_files")
+def commit_files(payloads, journal_file=None):
+    """Escribe varios archivos como una sola unidad atómica.
+
+    ``payloads`` relaciona nombre de archivo con su contenido. Primero se
+    escribe (atómicamente) un diario con todos los contenidos; ese es el
+    punto de confirmación. Después se reemplaza cada archivo y se borra el
+    diario. Si el proceso se interrumpe, ``recover_files`` completa la
+    operación a partir del diario. Las confirmaciones con el mismo diario
+    se ejecutan de una en una, también entre procesos."""
+    payloads = {os.path.abspath(name): text for name, text in payloads.items()}
+    if journal_file is None:
+        first = next(iter(payloads))
+        journal_file = os.path.join(os.path.dirname(first), COMMIT_JOURNAL)
+    with _commit_lock(journal_file):
+        atomic_write(journal_file, json.dumps(payloads))
+        _replay_journal(journal_file)
+
+
+@instrumented("recover_files")
+def recover_files(journal_file=COMMIT_JOURNAL):
+    """Completa una confirmación pendiente de ``commit_files``.
+
+    Devuelve ``True`` si había un diario pendiente y se aplicó. Espera a
+    que termine cualquier confirmación en curso, así que nunca aplica el
+    diario de otro proceso a medio escribir los archivos."""
+    if not os.path.exists(journal_file):
+        return False
+    with _commit_lock(journal_file):
+        return _replay_journal(journal_file)
+
+
+def _replay_journal(journal_file):
+    """Reemplaza los archivos del diario y lo borra; requiere tener el
+    bloqueo de ``_commit_lock``."""
+    if not os.path.exists(journal_file):
+        return False
+    with open(journal_file, "r", encoding="utf-8") as file:
+        payloads = json.load(file)
+    for name, text in payloads.items():
+        atomic_write(name, text)
+    os.remove(journal_file)
+    return True
+
+
+def iter_json_records(filename, chunk_size=65536):
+    """Genera uno a uno los objetos de un archivo JSON sin cargarlo entero.
+
+    Acepta el formato de lista (``[{...}, {...}]``) de los archivos de
+    datos y el formato JSON lines (un objeto por línea). Si el archivo no
+    existe no genera nada; un contenido inválido provoca ``ValueError``."""
+    if not os.path.exists(filename):
+        return
+    if METRICS.enabled:
+        METRICS.add_bytes("read", "json", os.path.getsize(filename))
+    decoder = json.JSONDecoder()
+    with open(filename, "r", encoding="utf-8") as file:
+        buffer = file.read(chunk_size)
+        start = len(buffer) - len(buffer.lstrip())
+        while start == len(buffer):
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            buffer, start = chunk, len(chunk) - len(chunk.lstrip())
+        if buffer[start] != "[":
+            yield from _iter_json_lines(buffer[start:], file, decoder)
+            return
+        position, eof, expect_comma = start + 1, False, False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position == len(buffer):
+                if eof:
+                    raise ValueError(f"Lista JSON sin cerrar en {filename}.")
+                buffer, position = buffer[position:], 0
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if buffer[position] == "]":
+                return
+            if expect_comma:
+                if buffer[position] != ",":
+                    raise ValueError(f"Se esperaba ',' en {filename}.")
+                position += 1
+                expect_comma = False
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                complete = eof or end < len(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                # El registro puede continuar en el siguiente bloque.
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield record
+            position, expect_comma = end, True
+
+
+def _iter_json_lines(head, file, decoder):
+    """Genera los objetos de un archivo JSON lines ya abierto."""
+    pending = head
+    while True:
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield decoder.decode(line)
+        chunk = file.read(65536)
+        if not chunk:
+            break
+        pending += chunk
+    if pending.strip():
+        yield decoder.decode(pending)
+
+
+def _iter_entities(model, filename, where, match):
+    """Genera instancias de ``model`` filtradas mientras se leen.
+
+    ``match`` compara campos sobre el diccionario crudo, antes de crear el
+    objeto; ``where`` recibe el objeto ya creado."""
+    for data in iter_json_records(filename):
+        if not isinstance(data, dict):
+            raise ValueError(f"Registro inválido en {filename}: {data!r}")
+        if any(data.get(key) != value for key, value in match.items()):
+            continue
+        entity = model(**data)
+        if where is None or where(entity):
+            yield entity
+
+
+@instrumented("serialize_json")
+def _dumps_entities(entities):
+    """Serializa una colección de entidades al formato JSON de archivo."""
+    return json.dumps([entity.to_dict() for entity in entities], indent=4)
+
+
+class StorageBackend(ABC):
+    """Interfaz de persistencia de hoteles, clientes y reservas.
+
+    ``entity`` es ``"hotel"``, ``"customer"`` o ``"reservation"`` y ``name``
+    identifica la colección (en ``JsonBackend``, el nombre del archivo).
+    Los métodos estáticos ``save_*``/``load_*`` y el ``ReservationStore``
+    usan el backend configurado con ``set_backend``."""
+
+    @abstractmethod
+    def load(self, entity, name):
+        """Devuelve la lista de entidades guardadas."""
+
+    @abstractmethod
+    def save(self, entity, entities, name):
+        """Reemplaza la colección completa por ``entities``."""
+
+    @abstractmethod
+    def apply(self, changes, store=None):
+        """Aplica atómicamente cambios sobre varias colecciones.
+
+        ``changes`` relaciona cada entidad con ``(name, upserts, deletes)``,
+        donde ``upserts`` relaciona ID con diccionario y ``deletes`` es un
+        conjunto de IDs; ``upserts`` en ``None`` pide reescribir la
+        colección completa. ``store``, si se indica, es el estado completo
+        ya actualizado en memoria."""
+
+    def recover(self, name):
+        """Completa operaciones interrumpidas antes de leer ``name``."""
+
+
+class JsonBackend(StorageBackend):
+    """Backend por defecto: un archivo JSON (lista) por colección."""
+
+    _LABELS = {"hotel": "hoteles", "customer": "clientes",
+               "reservation": "reservas"}
+
+    @instrumented("JsonBackend.load")
+    def load(self, entity, name):
+        """Carga una colección desde un archivo
+        JSON con manejo de errores."""
+        if not os.path.exists(name):
+            return []
+        if METRICS.enabled:
+            METRICS.add_bytes("read", "json", os.path.getsize(name))
+        label = self._LABELS[entity]
+        try:
+            with open(name, "r", encoding="utf-8") as file:
+                data = json.load(file)
+                if not isinstance(data, list):
+                    raise ValueError(
+                        f"El contenido del JSON debe ser una lista de {label}."
+                        )
+                model = ENTITY_CLASSES[entity]
+                return [model(**item) for item in data]
+        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
+            print(f"Error al cargar {label} desde {name}: {e}")
+            return []
+
+    @instrumented("JsonBackend.save")
+    def save(self, entity, entities, name):
+        """Guarda la colección en un archivo JSON de forma atómica."""
+        atomic_write(name, _dumps_entities(entities))
+
+    @instrumented("JsonBackend.apply")
+    def apply(self, changes, store=None):
+        """Reescribe los archivos afectados juntos con ``commit_files``."""
+        payloads = {}
+        for entity, (name, upserts, deletes) in changes.items():
+            if store is not None:
+                entities = getattr(store, f"{entity}_list")()
+            else:
+                entities = _patch(self.load(entity, name), entity,
+                                  upserts or {}, deletes or ())
+            payloads[name] = _dumps_entities(entities)
+        if payloads:
+            commit_files(payloads)
+
+    def recover(self, name):
+        """Completa un ``commit_files`` pendiente en el directorio."""
+        recover_files(os.path.join(
+            os.path.dirname(os.path.abspath(name)), COMMIT_JOURNAL
+        ))
+
+
+_BACKEND = [JsonBackend()]
+
+
+def get_backend():
+    """Devuelve el ``StorageBackend`` configurado."""
+    return _BACKEND[0]
+
+
+def set_backend(backend):
+    """Configura el ``StorageBackend`` global y devuelve el anterior."""
+    previous, _BACKEND[0] = _BACKEND[0], backend
+    return previous
+
+
+def _patch(entities, entity, upserts, deletes):
+    """Aplica altas/modificaciones y bajas a una lista de entidades."""
+    key = f"{entity}_id"
+    model = ENTITY_CLASSES[entity]
+    pending = dict(upserts)
+    result = []
+    for instance in entities:
+        identifier = getattr(instance, key)
+        if identifier in deletes:
+            continue
+        if identifier in pending:
+            instance = model(**pending.pop(identifier))
+        result.append(instance)
+    result.extend(model(**data) for data in pending.values())
+    return result
+
+
+# Archivo JSON por defecto de cada entidad.
+DEFAULT_FILES = {"hotel": "hotels.json", "customer": "customers.json",
+                 "reservation": "reservations.json"}
+
+
+def _save_default_files(store, entities):
+    """Guarda juntas las colecciones ``entities`` de un repositorio sin
+    archivos propios (ni instantánea, ni registro, ni ``WriteBackCache``)
+    en los archivos por defecto, como hace la API de listas."""
+    if store.snapshot_files is None and store.log is None \
+            and store.write_back is None:
+        get_backend().apply({
+            entity: (DEFAULT_FILES[entity], None, None)
+            for entity in entities
+        }, store)
 
 
 class Hotel:
     """Clase que representa un hotel."""
 
+    __slots__ = ("hotel_id", "name", "location", "rooms_available")
+
     def __init__(self, hotel_id, name, location, rooms_available):
         self.hotel_id = hotel_id
         self.name = name
@@ -28,49 +375,69 @@ class Hotel:
         }
 
     @staticmethod
+    @instrumented("Hotel.save_hotels")
     def save_hotels(hotels, filename="hotels.json"):
-        """Guarda los datos de hoteles en un archivo JSON."""
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(
-                [hotel.to_dict() for hotel in hotels],
-                file,
-                indent=4
-            )
+        """Guarda los datos de hoteles en un archivo JSON.
+
+        La escritura es atómica (archivo temporal y renombrado). Si se
+        configuró otro backend con ``set_backend``, se guarda en él."""
+        get_backend().save("hotel", hotels, filename)
 
     @staticmethod
+    @instrumented("Hotel.load_hotels")
     def load_hotels(filename="hotels.json"):
         """Carga los datos de hoteles desde un archivo
         JSON con manejo de errores."""
-        if not os.path.exists(filename):
-            return []
-        try:
-            with open(filename, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                if not isinstance(data, list):
-                    raise ValueError(
-                        "El contenido del JSON debe ser una lista de hoteles."
-                        )
-                return [Hotel(**hotel) for hotel in data]
-        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
-            print(f"Error al cargar hoteles desde {filename}: {e}")
-            return []
+        return get_backend().load("hotel", filename)
 
     @staticmethod
+    def iter_hotels(filename="hotels.json", where=None, **match):
+        """Genera los hoteles del archivo uno a uno (lista JSON o JSON
+        lines), filtrando por campos exactos (``match``) o con ``where``."""
+        return _iter_entities(Hotel, filename, where, match)
+
+    @staticmethod
+    @instrumented("Hotel.find_hotel")
     def find_hotel(hotel_id, hotels):
-        """Busca un hotel por su ID."""
+        """Busca un hotel por su ID.
+
+        Acepta una lista o un ``ReservationStore``; con el repositorio la
+        búsqueda es O(1)."""
+        if isinstance(hotels, ReservationStore):
+            return hotels.get_hotel(hotel_id)
         return next(
             (hotel for hotel in hotels if hotel.hotel_id == hotel_id), None
         )
 
     @staticmethod
-    def delete_hotel(hotel_id, hotels):
-        """Elimina un hotel de la lista."""
+    @instrumented("Hotel.delete_hotel")
+    def delete_hotel(hotel_id, hotels, cascade=False):
+        """Elimina un hotel de la lista o del repositorio.
+
+        Con un repositorio se respetan sus reservas (ver
+        ``ReservationStore.delete_hotels``): sin ``cascade`` lanza
+        ``ValueError`` si el hotel tiene reservas; con ``cascade`` también
+        las elimina. Un repositorio sin archivos propios se guarda en los
+        archivos por defecto de hoteles y, si hubo cascada, de reservas."""
+        if isinstance(hotels, ReservationStore):
+            removed = []
+            if hotels.get_hotel(hotel_id) is not None:
+                removed = hotels.delete_hotels([hotel_id], cascade)
+            _save_default_files(
+                hotels, ["hotel"] + (["reservation"] if removed else [])
+            )
+            return hotels
         updated_hotels = [hotel for hotel in hotels if hotel.hotel_id != hotel_id]
         Hotel.save_hotels(updated_hotels)
         return updated_hotels
 
+    @instrumented("Hotel.modify_hotel")
     def modify_hotel(self, name=None, location=None, rooms_available=None):
-        """Modifica los atributos de un hotel."""
+        """Modifica los atributos de un hotel.
+
+        Para un hotel de un ``ReservationStore`` use
+        ``ReservationStore.modify_hotel``, que además actualiza sus índices
+        y el registro de cambios."""
         if name:
             self.name = name
         if location:
@@ -82,6 +449,8 @@ class Hotel:
 class Customer:
     """Clase que representa un cliente."""
 
+    __slots__ = ("customer_id", "name", "email")
+
     def __init__(self, customer_id, name, email):
         self.customer_id = customer_id
         self.name = name
@@ -96,43 +465,60 @@ class Customer:
         }
 
     @staticmethod
+    @instrumented("Customer.save_customers")
     def save_customers(customers, filename="customers.json"):
-        """Guarda los datos de clientes en un archivo JSON."""
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(
-                [customer.to_dict() for customer in customers],
-                file,
-                indent=4
-            )
+        """Guarda los datos de clientes en un archivo JSON.
+
+        La escritura es atómica (archivo temporal y renombrado). Si se
+        configuró otro backend con ``set_backend``, se guarda en él."""
+        get_backend().save("customer", customers, filename)
 
     @staticmethod
+    @instrumented("Customer.load_customers")
     def load_customers(filename="customers.json"):
         """Carga los datos de clientes desde un
         archivo JSON con manejo de errores."""
-        if not os.path.exists(filename):
-            return []
-        try:
-            with open(filename, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                if not isinstance(data, list):
-                    raise ValueError(
-                        "El contenido del JSON debe ser una lista de clientes."
-                        )
-                return [Customer(**customer) for customer in data]
-        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
-            print(f"Error al cargar clientes desde {filename}: {e}")
-            return []
+        return get_backend().load("customer", filename)
+
+    @staticmethod
+    def iter_customers(filename="customers.json", where=None, **match):
+        """Genera los clientes del archivo uno a uno (lista JSON o JSON
+        lines), filtrando por campos exactos (``match``) o con ``where``."""
+        return _iter_entities(Customer, filename, where, match)
 
     @staticmethod
+    @instrumented("Customer.find_customer")
     def find_customer(customer_id, customers):
-        """Busca un cliente por su ID."""
+        """Busca un cliente por su ID.
+
+        Acepta una lista o un ``ReservationStore``; con el repositorio la
+        búsqueda es O(1)."""
+        if isinstance(customers, ReservationStore):
+            return customers.get_customer(customer_id)
         return next(
             (customer for customer in customers if customer.customer_id == customer_id), None
         )
 
     @staticmethod
-    def delete_customer(customer_id, customers):
-        """Elimina un cliente de la lista."""
+    @instrumented("Customer.delete_customer")
+    def delete_customer(customer_id, customers, cascade=False):
+        """Elimina un cliente de la lista o del repositorio.
+
+        Con un repositorio se respetan sus reservas (ver
+        ``ReservationStore.delete_customers``): sin ``cascade`` lanza
+        ``ValueError`` si el cliente tiene reservas; con ``cascade`` las
+        cancela. Un repositorio sin archivos propios se guarda en los
+        archivos por defecto de clientes y, si hubo cascada, de reservas y
+        hoteles."""
+        if isinstance(customers, ReservationStore):
+            removed = []
+            if customers.get_customer(customer_id) is not None:
+                removed = customers.delete_customers([customer_id], cascade)
+            _save_default_files(
+                customers, ["customer"]
+                + (["reservation", "hotel"] if removed else [])
+            )
+            return customers
         updated_customers = [c for c in customers if c.customer_id != customer_id]
         Customer.save_customers(updated_customers)
         return updated_customers
@@ -141,89 +527,1436 @@ class Customer:
 class Reservation:
     """Clase que representa una reserva."""
 
-    def __init__(self, reservation_id, customer_id, hotel_id):
+    __slots__ = ("reservation_id", "customer_id", "hotel_id",
+                 "check_in", "check_out")
+
+    def __init__(self, reservation_id, customer_id, hotel_id,
+                 check_in=None, check_out=None):
+        """``check_in`` y ``check_out`` son fechas ISO (``"2025-03-07"``)
+        opcionales; la noche de ``check_out`` no se ocupa."""
+        if (check_in is None) != (check_out is None):
+            raise ValueError("Se requieren ambas fechas o ninguna.")
+        if check_in is not None and _nights(check_in, check_out)[0] is None:
+            raise ValueError("check_out debe ser posterior a check_in.")
         self.reservation_id = reservation_id
         self.customer_id = customer_id
         self.hotel_id = hotel_id
+        self.check_in = check_in
+        self.check_out = check_out
 
     def to_dict(self):
         """Convierte los datos de la reserva a un diccionario."""
-        return {
+        data = {
             "reservation_id": self.reservation_id,
             "customer_id": self.customer_id,
             "hotel_id": self.hotel_id,
         }
+        if self.check_in is not None:
+            data["check_in"] = self.check_in
+            data["check_out"] = self.check_out
+        return data
 
     @staticmethod
+    @instrumented("Reservation.save_reservations")
     def save_reservations(reservations, filename="reservations.json"):
-        """Guarda los datos de reservas en un archivo JSON."""
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(
-                [r.to_dict() for r in reservations],
-                file,
-                indent=4
-            )
+        """Guarda los datos de reservas en un archivo JSON.
+
+        La escritura es atómica (archivo temporal y renombrado). Si se
+        configuró otro backend con ``set_backend``, se guarda en él."""
+        get_backend().save("reservation", reservations, filename)
 
     @staticmethod
+    @instrumented("Reservation.load_reservations")
     def load_reservations(filename="reservations.json"):
         """Carga los datos de reservas desde
         un archivo JSON con manejo de errores."""
-        if not os.path.exists(filename):
+        return get_backend().load("reservation", filename)
+
+    @staticmethod
+    def iter_reservations(filename="reservations.json", where=None, **match):
+        """Genera las reservas del archivo una a una (lista JSON o JSON
+        lines), filtrando por campos exactos (``match``) o con ``where``.
+
+        Por ejemplo ``iter_reservations(hotel_id="H1")`` recorre solo las
+        reservas de un hotel sin mantener el archivo en memoria."""
+        return _iter_entities(Reservation, filename, where, match)
+
+    @staticmethod
+    @instrumented("Reservation.cancel_reservation")
+    def cancel_reservation(reservation_id, reservations, hotels):
+        """Cancela una reserva y
+        devuelve la habitación al hotel.
+
+        ``reservations`` puede ser una lista o un ``ReservationStore``. Con
+        listas se construye un repositorio temporal, se guardan los archivos
+        por defecto y se devuelve la lista actualizada; con un repositorio
+        la cancelación se confirma como una transacción sobre sus propios
+        archivos y se devuelve el mismo repositorio."""
+        if isinstance(reservations, ReservationStore):
+            store = reservations
+            reservation = store.get_reservation(reservation_id)
+            if reservation is not None and \
+                    store.get_hotel(reservation.hotel_id) is not None:
+                with store.transaction() as txn:
+                    txn.cancel_reservation(reservation_id)
+                _save_default_files(store, ["hotel", "reservation"])
+            return store
+        store = ReservationStore(hotels=hotels, reservations=reservations)
+        cancelled = store.cancel_reservation(reservation_id)
+        if cancelled is None:
+            return reservations
+        hotel = store.get_hotel(cancelled.hotel_id)
+        get_backend().apply({
+            "hotel": (DEFAULT_FILES["hotel"],
+                      {hotel.hotel_id: hotel.to_dict()}, ()),
+            "reservation": (DEFAULT_FILES["reservation"], {},
+                            {reservation_id}),
+        }, store)
+        return store.reservation_list()
+
+
+class ReservationTable:
+    """Tabla columnar de reservas con IDs codificados como enteros.
+
+    Cada ID se guarda una sola vez en una tabla de cadenas y las columnas
+    son ``array("I")`` con los códigos, lo que reduce mucho la memoria por
+    reserva frente a un objeto por fila. Las consultas devuelven
+    ``ReservationView``, compatibles con ``Reservation`` en lectura."""
+
+    def __init__(self, reservations=()):
+        self._strings = []
+        self._codes = {}
+        self._reservation_ids = array("I")
+        self._customer_ids = array("I")
+        self._hotel_ids = array("I")
+        self._check_ins = array("I")  # ordinal de la fecha, 0 si no hay
+        self._check_outs = array("I")
+        self._rows = array("i")  # código -> fila, -1 si no es una reserva
+        for reservation in reservations:
+            self.add(reservation)
+
+    def __len__(self):
+        return len(self._reservation_ids)
+
+    def __iter__(self):
+        for code in self._reservation_ids:
+            yield ReservationView(self, code)
+
+    def __contains__(self, reservation_id):
+        return self._row_of(self._codes.get(reservation_id)) >= 0
+
+    def add(self, reservation):
+        """Agrega o reemplaza una reserva."""
+        code = self._encode(reservation.reservation_id)
+        values = (
+            code,
+            self._encode(reservation.customer_id),
+            self._encode(reservation.hotel_id),
+            _ordinal(reservation.check_in),
+            _ordinal(reservation.check_out),
+        )
+        row = self._rows[code]
+        if row < 0:
+            self._rows[code] = len(self._reservation_ids)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns(), values):
+                column[row] = value
+
+    def get(self, reservation_id):
+        """Devuelve la vista de una reserva, o ``None`` si no existe."""
+        code = self._codes.get(reservation_id)
+        if self._row_of(code) < 0:
+            return None
+        return ReservationView(self, code)
+
+    def remove(self, reservation_id):
+        """Elimina una reserva; devuelve ``True`` si existía.
+
+        La última fila ocupa el lugar de la eliminada, por lo que el orden
+        de iteración no se conserva tras una baja."""
+        code = self._codes.get(reservation_id)
+        row = self._row_of(code)
+        if row < 0:
+            return False
+        self._rows[code] = -1
+        last = len(self._reservation_ids) - 1
+        if row != last:
+            moved = self._reservation_ids[last]
+            for column in self._columns():
+                column[row] = column[last]
+            self._rows[moved] = row
+        for column in self._columns():
+            column.pop()
+        return True
+
+    def field(self, code, name):
+        """Devuelve el valor de un campo de la fila con el código dado."""
+        row = self._rows[code]
+        if name == "check_in":
+            return _iso_date(self._check_ins[row])
+        if name == "check_out":
+            return _iso_date(self._check_outs[row])
+        column = {
+            "reservation_id": self._reservation_ids,
+            "customer_id": self._customer_ids,
+            "hotel_id": self._hotel_ids,
+        }[name]
+        return self._strings[column[row]]
+
+    def _columns(self):
+        """Devuelve las columnas en el orden de ``add``."""
+        return (self._reservation_ids, self._customer_ids, self._hotel_ids,
+                self._check_ins, self._check_outs)
+
+    def _row_of(self, code):
+        """Devuelve la fila de un código, o -1 si no es una reserva."""
+        if code is None:
+            return -1
+        return self._rows[code]
+
+    def _encode(self, value):
+        """Devuelve el código entero de una cadena, registrándola si es
+        nueva."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._codes[value] = code
+            self._rows.append(-1)
+        return code
+
+
+class ReservationView:
+    """Vista de solo lectura de una fila de ``ReservationTable``."""
+
+    __slots__ = ("_table", "_code")
+
+    def __init__(self, table, code):
+        self._table = table
+        self._code = code
+
+    @property
+    def reservation_id(self):
+        """ID de la reserva."""
+        return self._table.field(self._code, "reservation_id")
+
+    @property
+    def customer_id(self):
+        """ID del cliente."""
+        return self._table.field(self._code, "customer_id")
+
+    @property
+    def hotel_id(self):
+        """ID del hotel."""
+        return self._table.field(self._code, "hotel_id")
+
+    @property
+    def check_in(self):
+        """Fecha de entrada (ISO) o ``None``."""
+        return self._table.field(self._code, "check_in")
+
+    @property
+    def check_out(self):
+        """Fecha de salida (ISO) o ``None``."""
+        return self._table.field(self._code, "check_out")
+
+    def to_dict(self):
+        """Convierte los datos de la reserva a un diccionario."""
+        return Reservation.to_dict(self)
+
+    def to_reservation(self):
+        """Crea un ``Reservation`` independiente con los mismos datos."""
+        return Reservation(**self.to_dict())
+
+
+class OccupancyTree:
+    """Árbol de segmentos sobre noches con suma por rango y máximo por
+    rango, ambos en O(log n).
+
+    ``_max[nodo]`` es el máximo del subárbol incluyendo el incremento
+    pendiente ``_add[nodo]``, que nunca se propaga a los hijos."""
+
+    def __init__(self, size):
+        self.size = size
+        self._max = [0] * (2 * size)
+        self._add = [0] * (2 * size)
+
+    def add(self, low, high, delta):
+        """Suma ``delta`` a las posiciones de ``[low, high)``."""
+        self._update(1, 0, self.size, low, high, delta)
+
+    def max(self, low, high):
+        """Devuelve el máximo de las posiciones de ``[low, high)``."""
+        return self._query(1, 0, self.size, low, high)
+
+    def _update(self, node, left, right, low, high, delta):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        if high <= left or right <= low:
+            return
+        if low <= left and right <= high:
+            self._max[node] += delta
+            self._add[node] += delta
+            return
+        middle = (left + right) // 2
+        self._update(2 * node, left, middle, low, high, delta)
+        self._update(2 * node + 1, middle, right, low, high, delta)
+        self._max[node] = self._add[node] + max(
+            self._max[2 * node], self._max[2 * node + 1]
+        )
+
+    def _query(self, node, left, right, low, high):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        if high <= left or right <= low:
+            return 0
+        if low <= left and right <= high:
+            return self._max[node]
+        middle = (left + right) // 2
+        return self._add[node] + max(
+            self._query(2 * node, left, middle, low, high),
+            self._query(2 * node + 1, middle, right, low, high),
+        )
+
+
+class RoomInventory:
+    """Ocupación por noche de un hotel.
+
+    Guarda los intervalos de las reservas con fechas en un
+    ``OccupancyTree`` indexado por días, de modo que consultar la máxima
+    ocupación de un rango de noches y registrar una reserva cuestan
+    O(log días) sin recorrer las reservas. El árbol crece (duplicando su
+    tamaño) cuando aparece una fecha fuera del rango cubierto."""
+
+    def __init__(self):
+        self._tree = None
+        self._base = 0
+        self._intervals = {}
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def occupancy(self, check_in, check_out):
+        """Devuelve la mayor cantidad de habitaciones ocupadas en alguna
+        noche entre ``check_in`` (incluida) y ``check_out`` (excluida)."""
+        first, last = _nights(check_in, check_out)
+        if first is None:
+            raise ValueError("check_out debe ser posterior a check_in.")
+        if self._tree is None:
+            return 0
+        low = max(first - self._base, 0)
+        high = min(last - self._base, self._tree.size)
+        return self._tree.max(low, high) if low < high else 0
+
+    def add(self, reservation_id, check_in, check_out):
+        """Ocupa una habitación en las noches de la reserva."""
+        first, last = _nights(check_in, check_out)
+        self.remove(reservation_id)
+        self._cover(first, last)
+        self._intervals[reservation_id] = (first, last)
+        self._tree.add(first - self._base, last - self._base, 1)
+
+    def remove(self, reservation_id):
+        """Libera las noches de una reserva, si estaba registrada."""
+        interval = self._intervals.pop(reservation_id, None)
+        if interval is not None:
+            self._tree.add(interval[0] - self._base,
+                           interval[1] - self._base, -1)
+
+    def _cover(self, first, last):
+        """Amplía el árbol para que cubra los días ``[first, last)``."""
+        if self._tree is not None and self._base <= first \
+                and last <= self._base + self._tree.size:
+            return
+        if self._tree is None:
+            base, end = first, last
+        else:
+            base = min(self._base, first)
+            end = max(self._base + self._tree.size, last)
+        size = 512
+        while size < end - base:
+            size *= 2
+        self._tree, self._base = OccupancyTree(size), base
+        for low, high in self._intervals.values():
+            self._tree.add(low - base, high - base, 1)
+
+
+class HotelSearchIndex:
+    """Índice de búsqueda de hoteles por ubicación y prefijo de nombre.
+
+    Para cada ubicación (y para el total de hoteles) guarda una lista
+    ordenada de ``(nombre normalizado, hotel_id)``; un prefijo se resuelve
+    con ``bisect`` en O(log n + k). Las comparaciones no distinguen
+    mayúsculas ni espacios repetidos.
+
+    El índice no observa los objetos: un hotel cambiado directamente con
+    ``Hotel.modify_hotel`` sigue indexado con sus datos anteriores hasta
+    que se vuelve a agregar (``ReservationStore.modify_hotel``,
+    ``add_hotel`` o ``WriteBackCache.mark_dirty`` lo hacen)."""
+
+    def __init__(self, hotels=()):
+        self._keys = {}
+        self._names = {None: []}
+        for hotel in hotels:
+            self.add(hotel)
+
+    def add(self, hotel):
+        """Indexa un hotel (reemplazando sus claves anteriores)."""
+        self.remove(hotel.hotel_id)
+        location, name = _normalize(hotel.location), _normalize(hotel.name)
+        self._keys[hotel.hotel_id] = (location, name)
+        for key in (None, location):
+            insort(self._names.setdefault(key, []), (name, hotel.hotel_id))
+
+    def remove(self, hotel_id):
+        """Quita un hotel del índice, si estaba indexado."""
+        keys = self._keys.pop(hotel_id, None)
+        if keys is None:
+            return
+        location, name = keys
+        for key in (None, location):
+            names = self._names[key]
+            del names[bisect_left(names, (name, hotel_id))]
+            if key is not None and not names:
+                del self._names[key]
+
+    def query(self, location=None, prefix="", limit=None):
+        """Devuelve los IDs de los hoteles de ``location`` (o de todos)
+        cuyo nombre empieza por ``prefix``, ordenados por nombre."""
+        names = self._names.get(
+            None if location is None else _normalize(location), []
+        )
+        prefix = _normalize(prefix)
+        start = bisect_left(names, (prefix,))
+        result = []
+        for name, hotel_id in names[start:]:
+            if not name.startswith(prefix) or len(result) == limit:
+                break
+            result.append(hotel_id)
+        return result
+
+    def query_many(self, queries):
+        """Resuelve varias consultas (diccionarios con los argumentos de
+        ``query``) en una sola llamada."""
+        return [self.query(**query) for query in queries]
+
+
+class ReservationLog:
+    """Registro de cambios de solo anexado en formato JSON lines.
+
+    Cada alta, modificación, baja o cancelación se escribe como una línea,
+    de modo que el costo de escritura es proporcional al cambio y no al
+    tamaño de los datos. Los registros son idempotentes: reaplicarlos sobre
+    una instantánea que ya los contiene no altera el resultado.
+
+    ``sync`` agrupa las confirmaciones (group commit): los hilos que esperan
+    mientras otro ejecuta ``fsync`` quedan cubiertos por el siguiente
+    ``fsync`` en lugar de ejecutar uno cada uno. ``commit_delay`` (en
+    segundos) permite esperar un poco más para agrupar más escrituras.
+
+    Cada escritura toma un ``fcntl.flock`` compartido sobre el archivo y
+    ``exclusive`` uno exclusivo, de modo que ningún proceso anexa mientras
+    otro compacta. Sin ``fcntl`` la compactación solo es segura con un
+    único proceso escritor."""
+
+    def __init__(self, filename="journal.jsonl", commit_delay=0.0):
+        self.filename = filename
+        self.commit_delay = commit_delay
+        self.fsync_count = 0
+        self.read_offset = 0
+        # Posiciones de los registros propios anexados después de bytes
+        # de otros procesos aún no leídos; ``read_new`` los salta.
+        self._own = set()
+        self._file = None
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+
+    @instrumented("ReservationLog.append")
+    def append(self, record, sync=False):
+        """Anexa un registro al final del archivo.
+
+        Devuelve el número de secuencia de la escritura; con ``sync`` no
+        retorna hasta que el registro está en disco."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        data = line.encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                # Sin búfer: cada registro es una sola escritura con
+                # O_APPEND, así otros procesos no intercalan bytes.
+                # pylint: disable=consider-using-with
+                self._file = open(self.filename, "ab", buffering=0)
+            if fcntl is None:
+                self._file.write(data)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_SH)
+                try:
+                    self._file.write(data)
+                finally:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            METRICS.add_bytes("written", "journal", len(data))
+            end = self._file.tell()
+            if end - len(data) == self.read_offset:
+                self.read_offset = end
+            else:
+                self._own.add(end - len(data))
+            self._written += 1
+            sequence = self._written
+        if sync:
+            self.sync(sequence)
+        return sequence
+
+    @instrumented("ReservationLog.sync")
+    def sync(self, sequence=None):
+        """Garantiza que las escrituras hasta ``sequence`` están en disco."""
+        if sequence is None:
+            sequence = self._written
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            with self._lock:
+                target = self._written
+                if self._file is None:
+                    self._synced = target
+                    return
+                fileno = self._file.fileno()
+                os.fsync(fileno)
+            self.fsync_count += 1
+            self._synced = target
+
+    @instrumented("ReservationLog.records")
+    def records(self):
+        """Lee los registros del archivo en orden.
+
+        Una última línea incompleta (escritura interrumpida) se ignora; una
+        línea inválida en medio del archivo provoca ``ValueError``."""
+        if not os.path.exists(self.filename):
             return []
+        with open(self.filename, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+        METRICS.add_bytes("read", "journal", sum(map(len, lines)))
+        records = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                if number == len(lines) and not line.endswith("\n"):
+                    break
+                raise ValueError(
+                    f"Registro inválido en {self.filename}:{number}: {e}"
+                ) from e
+        return records
+
+    @instrumented("ReservationLog.read_new")
+    def read_new(self):
+        """Lee los registros completos anexados desde ``read_offset``.
+
+        Sirve para incorporar los cambios escritos por otros procesos: los
+        registros que anexó este mismo objeto no se devuelven. Devuelve
+        ``None`` si el archivo se acortó (otro proceso lo compactó) y hay
+        que recargar la instantánea."""
+        with self._lock:
+            if not os.path.exists(self.filename):
+                self._own.clear()
+                return None if self.read_offset else []
+            with open(self.filename, "rb") as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() < self.read_offset:
+                    self._own.clear()
+                    return None
+                file.seek(self.read_offset)
+                data = file.read()
+            METRICS.add_bytes("read", "journal", len(data))
+            end = data.rfind(b"\n") + 1
+            records = []
+            position = self.read_offset
+            for line in data[:end].splitlines(keepends=True):
+                if position in self._own:
+                    self._own.discard(position)
+                elif line.strip():
+                    records.append(json.loads(line))
+                position += len(line)
+            self.read_offset += end
+            return records
+
+    @instrumented("ReservationLog.repair")
+    def repair(self):
+        """Descarta una última línea incompleta y fija ``read_offset`` al
+        final del archivo."""
+        if not os.path.exists(self.filename):
+            self.read_offset = 0
+            return
+        with open(self.filename, "rb+") as file:
+            data = file.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                file.truncate(end)
+        self.read_offset = end
+        self._own.clear()
+
+    @contextmanager
+    def exclusive(self):
+        """Impide que este y otros procesos anexen registros mientras dura
+        el bloque ``with``."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.filename, "ab") as file:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                yield
+
+    @instrumented("ReservationLog.truncate")
+    def truncate(self):
+        """Vacía el registro (después de compactar)."""
+        self.close()
+        with open(self.filename, "w", encoding="utf-8"):
+            pass
+        self.read_offset = 0
+        self._own.clear()
+
+    def close(self):
+        """Cierra el archivo si está abierto."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ReservationStore:
+    """Repositorio en memoria indexado por ID.
+
+    Mantiene diccionarios por ``hotel_id``, ``customer_id`` y
+    ``reservation_id``, además de índices secundarios de reservas por hotel
+    y por cliente, de modo que las búsquedas, altas y bajas son O(1).
+
+    Si se abre con ``ReservationStore.open`` cada cambio se anexa a un
+    ``ReservationLog`` en lugar de reescribir los archivos JSON completos;
+    con un ``WriteBackCache`` los cambios se acumulan y se escriben juntos
+    más tarde."""
+
+    def __init__(self, hotels=(), customers=(), reservations=()):
+        self.log = None
+        self.write_back = None
+        self.snapshot_files = None
+        self.compact_every = None
+        self._pending_records = 0
+        self._capture = None
+        self._deferred = None
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.hotels = {}
+        self.customers = {}
+        self.reservations = {}
+        self.reservations_by_hotel = {}
+        self.reservations_by_customer = {}
+        self.inventory = {}
+        self.search_index = HotelSearchIndex()
+        for hotel in hotels:
+            self.add_hotel(hotel)
+        for customer in customers:
+            self.add_customer(customer)
+        for reservation in reservations:
+            self.add_reservation(reservation)
+
+    @classmethod
+    @instrumented("ReservationStore.load")
+    def load(cls, hotels_file="hotels.json",
+             customers_file="customers.json",
+             reservations_file="reservations.json"):
+        """Crea un repositorio a partir de los archivos JSON (o del backend
+        configurado).
+
+        Antes de leer se completa cualquier ``commit_files`` interrumpido en
+        el directorio de los archivos."""
+        get_backend().recover(hotels_file)
+        store = cls(
+            Hotel.load_hotels(hotels_file),
+            Customer.load_customers(customers_file),
+            Reservation.load_reservations(reservations_file),
+        )
+        store.snapshot_files = (hotels_file, customers_file,
+                                reservations_file)
+        return store
+
+    @classmethod
+    @instrumented("ReservationStore.open")
+    def open(cls, hotels_file="hotels.json",
+             customers_file="customers.json",
+             reservations_file="reservations.json",
+             log_file="journal.jsonl", compact_every=None):
+        """Abre el repositorio en modo registro de cambios.
+
+        Carga la instantánea de los archivos JSON, reaplica el registro y
+        deja el registro conectado para las siguientes mutaciones. Si
+        ``compact_every`` se indica, el registro se compacta
+        automáticamente tras ese número de registros."""
+        store = cls.load(hotels_file, customers_file, reservations_file)
+        log = ReservationLog(log_file)
+        log.repair()
+        # Se leen desde el inicio solo las líneas completas para que
+        # ``read_offset`` quede justo tras lo aplicado, aunque otro proceso
+        # anexe registros mientras tanto.
+        log.read_offset = 0
+        records = log.read_new()
+        for record in records:
+            store.apply_record(record)
+        store.log = log
+        store.compact_every = compact_every
+        store._pending_records = len(records)
+        return store
+
+    @instrumented("ReservationStore.compact")
+    def compact(self):
+        """Escribe una instantánea completa y vacía el registro.
+
+        Mientras tanto el registro queda bloqueado para los demás procesos
+        (ver ``ReservationLog.exclusive``) y antes de escribir se
+        incorporan sus registros con ``refresh``, así la instantánea no
+        pierde cambios ajenos."""
+        if self.log is None:
+            raise ValueError("El repositorio no tiene registro de cambios.")
+        with self._lock, self.log.exclusive():
+            self.refresh()
+            self.write_snapshot(("hotel", "customer", "reservation"))
+            self.log.truncate()
+            self._pending_records = 0
+
+    def close(self):
+        """Cierra el registro de cambios, si existe."""
+        if self.log is not None:
+            self.log.close()
+
+    @instrumented("ReservationStore.refresh")
+    def refresh(self):
+        """Incorpora los cambios escritos por otros procesos; devuelve
+        cuántos registros del registro de cambios se aplicaron.
+
+        Si otro proceso compactó el registro, recarga la instantánea. En
+        modo instantánea (``load``) recarga los archivos completos y
+        devuelve 0, salvo con un ``WriteBackCache`` conectado, cuyos
+        cambios pendientes se perderían."""
+        if self.log is None:
+            if self.snapshot_files is not None and self.write_back is None:
+                with self._lock:
+                    self._reload()
+            return 0
+        with self._lock:
+            records = self.log.read_new()
+            if records is None:
+                self._reload()
+                self.log.read_offset = 0
+                records = self.log.read_new()
+            for record in records:
+                self.apply_record(record)
+            return len(records)
+
+    def _reload(self):
+        """Reemplaza los datos en memoria por los de la instantánea."""
+        fresh = ReservationStore.load(*self.snapshot_files)
+        for name in ("hotels", "customers", "reservations",
+                     "reservations_by_hotel", "reservations_by_customer",
+                     "inventory", "search_index"):
+            setattr(self, name, getattr(fresh, name))
+        self._notify({"op": "reload"}, None)
+
+    @instrumented("ReservationStore.apply_record")
+    def apply_record(self, record):
+        """Aplica un registro del ``ReservationLog`` sin volver a anotarlo."""
+        log, self.log = self.log, None
         try:
-            with open(filename, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                if not isinstance(data, list):
+            op, entity = record["op"], record.get("entity")
+            if op == "put":
+                model = ENTITY_CLASSES[entity]
+                getattr(self, f"add_{entity}")(model(**record["data"]))
+            elif op == "delete":
+                getattr(self, f"remove_{entity}")(record["id"])
+            elif op == "cancel":
+                reservation = self._drop_reservation(record["id"])
+                if reservation is not None:
+                    self._notify(record, reservation)
+                self.add_hotel(Hotel(**record["hotel"]))
+            elif op == "txn":
+                for sub_record in record["records"]:
+                    self.apply_record(sub_record)
+            else:
+                raise ValueError(f"Operación desconocida: {op}")
+        finally:
+            self.log = log
+
+    @instrumented("ReservationStore.write_snapshot")
+    def write_snapshot(self, entities):
+        """Reescribe atómicamente los archivos de las entidades indicadas
+        (``"hotel"``, ``"customer"``, ``"reservation"``)."""
+        self.persist_changes({entity: (None, None) for entity in entities})
+
+    @instrumented("ReservationStore.persist_changes")
+    def persist_changes(self, changes):
+        """Envía al backend los cambios ``{entidad: (upserts, deletes)}``
+        (ver ``StorageBackend.apply``) sobre los archivos de la
+        instantánea. Sin archivos de instantánea no hace nada."""
+        if self.snapshot_files is None or not changes:
+            return
+        names = dict(zip(("hotel", "customer", "reservation"),
+                         self.snapshot_files))
+        get_backend().apply({
+            entity: (names[entity], upserts, deletes)
+            for entity, (upserts, deletes) in changes.items()
+        }, self)
+
+    def transaction(self):
+        """Crea una ``Transaction`` sobre este repositorio."""
+        return Transaction(self)
+
+    def capture_state(self, keys, state=None):
+        """Guarda el estado actual de las entidades ``(entidad, ID)`` para
+        deshacer después sus cambios con ``restore_state``.
+
+        Si se pasa ``state``, se completa ese mismo diccionario y las
+        claves que ya contiene conservan el estado guardado primero."""
+        state = {} if state is None else state
+        for key in keys:
+            if key not in state:
+                instance = getattr(self, f"{key[0]}s").get(key[1])
+                state[key] = (instance, None if instance is None
+                              else instance.to_dict())
+        return state
+
+    def restore_state(self, state, notify=False):
+        """Devuelve a su estado guardado las entidades de ``state``.
+
+        Cada entidad recupera sus valores en el mismo objeto y se vuelve a
+        indexar (o se quita si no existía). Los cambios no se anotan en el
+        registro ni se persisten, y solo se avisan a los suscriptores con
+        ``notify`` (cuando ya recibieron los cambios que se deshacen)."""
+        with self._lock:
+            capture, self._capture = self._capture, []
+            deferred, self._deferred = self._deferred, \
+                ([] if notify else None)
+            try:
+                for (entity, identifier), (instance, data) in \
+                        reversed(list(state.items())):
+                    if instance is None:
+                        getattr(self, f"remove_{entity}")(identifier)
+                        continue
+                    for name in type(instance).__slots__:
+                        setattr(instance, name, data.get(name))
+                    getattr(self, f"add_{entity}")(instance)
+                notices = self._deferred
+            finally:
+                self._capture = capture
+                self._deferred = deferred
+            if notices:
+                self._publish(notices)
+
+    @instrumented("ReservationStore.save")
+    def save(self, hotels_file="hotels.json",
+             customers_file="customers.json",
+             reservations_file="reservations.json"):
+        """Guarda el contenido del repositorio en los archivos JSON."""
+        Hotel.save_hotels(self.hotel_list(), hotels_file)
+        Customer.save_customers(self.customer_list(), customers_file)
+        Reservation.save_reservations(
+            self.reservation_list(), reservations_file
+        )
+
+    def hotel_list(self):
+        """Devuelve los hoteles en orden de inserción."""
+        return list(self.hotels.values())
+
+    def customer_list(self):
+        """Devuelve los clientes en orden de inserción."""
+        return list(self.customers.values())
+
+    def reservation_list(self):
+        """Devuelve las reservas en orden de inserción."""
+        return list(self.reservations.values())
+
+    def get_hotel(self, hotel_id):
+        """Busca un hotel por su ID."""
+        return self.hotels.get(hotel_id)
+
+    def get_customer(self, customer_id):
+        """Busca un cliente por su ID."""
+        return self.customers.get(customer_id)
+
+    def get_reservation(self, reservation_id):
+        """Busca una reserva por su ID."""
+        return self.reservations.get(reservation_id)
+
+    def reservations_for_hotel(self, hotel_id):
+        """Devuelve las reservas de un hotel."""
+        return list(self.reservations_by_hotel.get(hotel_id, {}).values())
+
+    def reservations_for_customer(self, customer_id):
+        """Devuelve las reservas de un cliente."""
+        return list(
+            self.reservations_by_customer.get(customer_id, {}).values()
+        )
+
+    def add_hotel(self, hotel):
+        """Agrega un hotel o reemplaza el que tenga el mismo ID."""
+        previous = self.hotels.get(hotel.hotel_id)
+        if previous is hotel:
+            # Modificado en su lugar: ya no se conoce el estado anterior.
+            previous = None
+        self.hotels[hotel.hotel_id] = hotel
+        self.search_index.add(hotel)
+        self._record({"op": "put", "entity": "hotel",
+                      "data": hotel.to_dict()}, previous)
+
+    @instrumented("ReservationStore.modify_hotel")
+    def modify_hotel(self, hotel_id, **changes):
+        """Modifica un hotel (ver ``Hotel.modify_hotel``) y anota el cambio.
+
+        Devuelve el hotel modificado, o ``None`` si no existe."""
+        hotel = self.hotels.get(hotel_id)
+        if hotel is None:
+            return None
+        hotel.modify_hotel(**changes)
+        self.search_index.add(hotel)
+        self._record({"op": "put", "entity": "hotel",
+                      "data": hotel.to_dict()})
+        return hotel
+
+    def add_customer(self, customer):
+        """Agrega un cliente o reemplaza el que tenga el mismo ID."""
+        previous = self.customers.get(customer.customer_id)
+        if previous is customer:
+            previous = None
+        self.customers[customer.customer_id] = customer
+        self._record({"op": "put", "entity": "customer",
+                      "data": customer.to_dict()}, previous)
+
+    def add_reservation(self, reservation):
+        """Agrega una reserva o reemplaza la que tenga el mismo ID."""
+        previous = self.reservations.get(reservation.reservation_id)
+        if previous is not None:
+            self._unindex_reservation(previous)
+        self.reservations[reservation.reservation_id] = reservation
+        self.reservations_by_hotel.setdefault(
+            reservation.hotel_id, {}
+        )[reservation.reservation_id] = reservation
+        self.reservations_by_customer.setdefault(
+            reservation.customer_id, {}
+        )[reservation.reservation_id] = reservation
+        if reservation.check_in is not None:
+            inventory = self.inventory.setdefault(
+                reservation.hotel_id, RoomInventory()
+            )
+            inventory.add(reservation.reservation_id, reservation.check_in,
+                          reservation.check_out)
+        self._record({"op": "put", "entity": "reservation",
+                      "data": reservation.to_dict()}, previous)
+
+    def remove_hotel(self, hotel_id):
+        """Elimina un hotel y lo devuelve, o ``None`` si no existe."""
+        hotel = self.hotels.pop(hotel_id, None)
+        if hotel is not None:
+            self.search_index.remove(hotel_id)
+            self._record({"op": "delete", "entity": "hotel", "id": hotel_id},
+                         hotel)
+        return hotel
+
+    def remove_customer(self, customer_id):
+        """Elimina un cliente y lo devuelve, o ``None`` si no existe."""
+        customer = self.customers.pop(customer_id, None)
+        if customer is not None:
+            self._record({"op": "delete", "entity": "customer",
+                          "id": customer_id}, customer)
+        return customer
+
+    def remove_reservation(self, reservation_id):
+        """Elimina una reserva y la devuelve, o ``None`` si no existe."""
+        reservation = self._drop_reservation(reservation_id)
+        if reservation is not None:
+            self._record({"op": "delete", "entity": "reservation",
+                          "id": reservation_id}, reservation)
+        return reservation
+
+    @instrumented("ReservationStore.create_hotel")
+    def create_hotel(self, hotel):
+        """Agrega un hotel nuevo y lo confirma como una transacción.
+
+        Lanza ``ValueError`` si ya existe un hotel con el mismo ID; la
+        comprobación es O(1) sobre el índice por ID."""
+        with self.transaction() as txn:
+            txn.create_hotel(hotel)
+        return hotel
+
+    @instrumented("ReservationStore.create_customer")
+    def create_customer(self, customer):
+        """Agrega un cliente nuevo (ver ``create_hotel``)."""
+        with self.transaction() as txn:
+            txn.create_customer(customer)
+        return customer
+
+    @instrumented("ReservationStore.create_reservation")
+    def create_reservation(self, reservation):
+        """Agrega una reserva nueva (ver ``create_hotel``); además lanza
+        ``ValueError`` si su hotel o su cliente no existen.
+
+        No descuenta habitaciones: para reservar use
+        ``reservation_booking.BookingEngine``."""
+        with self.transaction() as txn:
+            txn.create_reservation(reservation)
+        return reservation
+
+    @instrumented("ReservationStore.delete_hotels")
+    def delete_hotels(self, hotel_ids, cascade=False):
+        """Elimina hoteles en una sola transacción sin dejar reservas
+        huérfanas.
+
+        Las reservas de cada hotel salen del índice por hotel, así que el
+        costo es proporcional a las reservas afectadas. Sin ``cascade``
+        lanza ``ValueError`` (sin eliminar nada) si algún hotel tiene
+        reservas o no existe; con ``cascade`` también elimina sus reservas.
+        Devuelve las reservas eliminadas."""
+        return self._delete_referenced("hotel", hotel_ids, cascade)
+
+    @instrumented("ReservationStore.delete_customers")
+    def delete_customers(self, customer_ids, cascade=False):
+        """Elimina clientes en una sola transacción sin dejar reservas
+        huérfanas.
+
+        Igual que ``delete_hotels``, pero con ``cascade`` las reservas del
+        cliente se cancelan y devuelven la habitación a su hotel."""
+        return self._delete_referenced("customer", customer_ids, cascade)
+
+    @instrumented("ReservationStore.cancel_reservation")
+    def cancel_reservation(self, reservation_id):
+        """Cancela una reserva y devuelve la habitación al hotel.
+
+        Las reservas con fechas liberan sus noches en el inventario en lugar
+        de sumar a ``rooms_available``. Devuelve la reserva cancelada, o
+        ``None`` si la reserva o su hotel no existen (en cuyo caso no se
+        modifica nada)."""
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return None
+        hotel = self.hotels.get(reservation.hotel_id)
+        if hotel is None:
+            return None
+        if reservation.check_in is None:
+            hotel.rooms_available += 1  # Aumentar la disponibilidad
+        self._drop_reservation(reservation_id)
+        self._record({"op": "cancel", "entity": "reservation",
+                      "id": reservation_id, "hotel": hotel.to_dict()},
+                     reservation)
+        return reservation
+
+    @instrumented("ReservationStore.rooms_free")
+    def rooms_free(self, hotel_id, check_in, check_out):
+        """Devuelve cuántas habitaciones del hotel quedan libres en todas
+        las noches del rango, en O(log días).
+
+        Para las reservas con fechas, ``rooms_available`` es la capacidad
+        del hotel por noche."""
+        hotel = self.hotels.get(hotel_id)
+        if hotel is None:
+            return 0
+        inventory = self.inventory.get(hotel_id)
+        used = inventory.occupancy(check_in, check_out) if inventory else 0
+        return max(hotel.rooms_available - used, 0)
+
+    @instrumented("ReservationStore.available_hotels")
+    def available_hotels(self, check_in, check_out, location=None):
+        """Devuelve los hoteles (opcionalmente de una ubicación) con al
+        menos una habitación libre en todas las noches del rango."""
+        return [
+            hotel for hotel in self.find_hotels(location=location)
+            if self.rooms_free(hotel.hotel_id, check_in, check_out) > 0
+        ]
+
+    @instrumented("ReservationStore.find_hotels")
+    def find_hotels(self, location=None, prefix="", limit=None):
+        """Busca hoteles por ubicación y prefijo de nombre (ver
+        ``HotelSearchIndex.query``)."""
+        return [self.hotels[hotel_id] for hotel_id in
+                self.search_index.query(location, prefix, limit)]
+
+    @instrumented("ReservationStore.find_hotels_many")
+    def find_hotels_many(self, queries):
+        """Resuelve un lote de búsquedas de ``find_hotels``."""
+        return [
+            [self.hotels[hotel_id] for hotel_id in result]
+            for result in self.search_index.query_many(queries)
+        ]
+
+    def subscribe(self, listener):
+        """Registra ``listener(registro, anterior)``, que se llama tras cada
+        cambio aplicado en memoria (incluidos los reaplicados desde el
+        registro de cambios).
+
+        ``registro`` tiene el formato del ``ReservationLog`` y ``anterior``
+        es la entidad reemplazada o eliminada (``None`` si no había o si se
+        modificó en su lugar, como en ``modify_hotel``). Si el
+        repositorio se recarga completo se recibe ``{"op": "reload"}``.
+        Los cambios de una transacción se avisan juntos solo cuando quedó
+        confirmada; si falla, no se avisa ninguno."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Quita un ``listener`` registrado con ``subscribe``."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, record, previous):
+        """Avisa de un cambio a los suscriptores."""
+        for listener in self._listeners:
+            listener(record, previous)
+
+    def _publish(self, notices):
+        """Avisa a los suscriptores de los cambios ``(registro, anterior)``
+        diferidos durante una transacción."""
+        for record, previous in notices:
+            self._notify(record, previous)
+
+    def _record(self, record, previous=None):
+        """Avisa a los suscriptores y anexa el registro al
+        ``ReservationLog`` si está conectado.
+
+        Dentro de una transacción el registro solo se acumula y el aviso
+        se difiere hasta que se confirma."""
+        if self._capture is not None:
+            self._capture.append(record)
+            if self._deferred is not None and self._listeners:
+                self._deferred.append((record, previous))
+            return
+        if self._listeners:
+            self._notify(record, previous)
+        if self.write_back is not None:
+            self.write_back.track([record])
+            return
+        if self.log is None:
+            return
+        self.log.append(record)
+        self._pending_records += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Compacta si ya se anexaron ``compact_every`` registros."""
+        if self.compact_every and self._pending_records >= self.compact_every:
+            self.compact()
+
+    def _delete_referenced(self, entity, identifiers, cascade):
+        """Elimina hoteles o clientes y, con ``cascade``, sus reservas."""
+        index = getattr(self, f"reservations_by_{entity}")
+        with self._lock:
+            identifiers = list(dict.fromkeys(identifiers))
+            dependents = []
+            for identifier in identifiers:
+                bucket = index.get(identifier, {})
+                if bucket and not cascade:
                     raise ValueError(
-                        "El contenido del JSON debe ser una lista de reservas."
+                        f"No se puede eliminar {entity} {identifier}: "
+                        f"tiene reservas ({len(bucket)})."
+                    )
+                dependents.extend(bucket.values())
+            with self.transaction() as txn:
+                for reservation in dependents:
+                    if entity == "customer" and \
+                            reservation.hotel_id in self.hotels:
+                        txn.cancel_reservation(reservation.reservation_id)
+                    else:
+                        txn.delete_reservation(reservation.reservation_id)
+                delete = getattr(txn, f"delete_{entity}")
+                for identifier in identifiers:
+                    delete(identifier)
+        return dependents
+
+    def _drop_reservation(self, reservation_id):
+        """Quita una reserva del repositorio sin anotar el cambio."""
+        reservation = self.reservations.pop(reservation_id, None)
+        if reservation is not None:
+            self._unindex_reservation(reservation)
+        return reservation
+
+    def _unindex_reservation(self, reservation):
+        """Quita una reserva de los índices secundarios."""
+        inventory = self.inventory.get(reservation.hotel_id)
+        if inventory is not None:
+            inventory.remove(reservation.reservation_id)
+            if not inventory:
+                del self.inventory[reservation.hotel_id]
+        for index, key in (
+            (self.reservations_by_hotel, reservation.hotel_id),
+            (self.reservations_by_customer, reservation.customer_id),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(reservation.reservation_id, None)
+                if not bucket:
+                    del index[key]
+
+
+class Transaction:
+    """Conjunto de cambios sobre hoteles, clientes y reservas que se
+    confirma de forma atómica.
+
+    Los cambios se acumulan y se validan en ``commit``. Si el repositorio
+    tiene registro de cambios, toda la transacción se anexa como un único
+    registro y se sincroniza con group commit; si no, los archivos JSON
+    afectados se reescriben juntos con ``commit_files``. Usada como
+    administrador de contexto confirma al salir sin excepción."""
+
+    def __init__(self, store):
+        self.store = store
+        self._operations = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self._operations = []
+        return False
+
+    def put_hotel(self, hotel):
+        """Agrega o reemplaza un hotel."""
+        self._operations.append(("put", "hotel", hotel))
+
+    def create_hotel(self, hotel):
+        """Agrega un hotel nuevo (falla si el ID ya existe)."""
+        self._operations.append(("create", "hotel", hotel))
+
+    def create_customer(self, customer):
+        """Agrega un cliente nuevo (falla si el ID ya existe)."""
+        self._operations.append(("create", "customer", customer))
+
+    def create_reservation(self, reservation):
+        """Agrega una reserva nueva (falla si el ID ya existe o si su hotel
+        o su cliente no existen)."""
+        self._operations.append(("create", "reservation", reservation))
+
+    def put_customer(self, customer):
+        """Agrega o reemplaza un cliente."""
+        self._operations.append(("put", "customer", customer))
+
+    def put_reservation(self, reservation):
+        """Agrega o reemplaza una reserva."""
+        self._operations.append(("put", "reservation", reservation))
+
+    def delete_hotel(self, hotel_id):
+        """Elimina un hotel."""
+        self._operations.append(("delete", "hotel", hotel_id))
+
+    def delete_customer(self, customer_id):
+        """Elimina un cliente."""
+        self._operations.append(("delete", "customer", customer_id))
+
+    def delete_reservation(self, reservation_id):
+        """Elimina una reserva."""
+        self._operations.append(("delete", "reservation", reservation_id))
+
+    def cancel_reservation(self, reservation_id):
+        """Cancela una reserva y devuelve la habitación al hotel."""
+        self._operations.append(("cancel", "reservation", reservation_id))
+
+    @instrumented("Transaction.commit")
+    def commit(self):
+        """Valida y confirma los cambios; devuelve los registros aplicados.
+
+        Lanza ``ValueError`` (sin aplicar nada) si una baja o cancelación
+        se refiere a una entidad inexistente o si un ``create_*`` repite un
+        ID. Si falla la escritura, los cambios se deshacen en memoria antes
+        de relanzar la excepción."""
+        store = self.store
+        operations, self._operations = self._operations, []
+        with store._lock:
+            self._validate(operations)
+            state = {}
+            store._deferred = notices = []
+            try:
+                store._capture = records = []
+                try:
+                    for op, entity, target in operations:
+                        store.capture_state(
+                            self._targets(op, entity, target), state
                         )
-                return [Reservation(**reservation) for reservation in data]
-        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
-            print(f"Error al cargar reservas desde {filename}: {e}")
-            return []
+                        if op in ("put", "create"):
+                            getattr(store, f"add_{entity}")(target)
+                        elif op == "delete":
+                            getattr(store, f"remove_{entity}")(target)
+                        else:
+                            store.cancel_reservation(target)
+                finally:
+                    store._capture = None
+                    store._deferred = None
+                if not records:
+                    return records
+                if store.write_back is not None:
+                    store.write_back.track(records)
+                elif store.log is None:
+                    store.persist_changes(changes_from_records(records))
+                else:
+                    sequence = store.log.append({"op": "txn",
+                                                 "records": records})
+                    store._pending_records += 1
+            except BaseException:
+                store.restore_state(state)
+                raise
+            if store.log is None:
+                store._publish(notices)
+                return records
+        store.log.sync(sequence)
+        store._publish(notices)
+        # Se compacta solo después de sincronizar el registro anexado.
+        store._maybe_compact()
+        return records
 
-    @staticmethod
-    def cancel_reservation(reservation_id, reservations, hotels):
-        """Cancela una reserva y
-        devuelve la habitación al hotel."""
-        reservation = next((r for r in reservations if r.reservation_id == reservation_id), None)
-        if reservation:
-            hotel = next((h for h in hotels if h.hotel_id == reservation.hotel_id), None)
-            if hotel:
-                hotel.rooms_available += 1  # Aumentar la disponibilidad
-                updated_reservations = [r for r in reservations if r.reservation_id != reservation_id]
-                Hotel.save_hotels(hotels)
-                Reservation.save_reservations(updated_reservations)
-                return updated_reservations
-        return reservations
+    def _targets(self, op, entity, target):
+        """Devuelve las entidades ``(entidad, ID)`` que modifica una
+        operación; una cancelación también modifica el hotel."""
+        if op in ("put", "create"):
+            return [(entity, getattr(target, f"{entity}_id"))]
+        keys = [(entity, target)]
+        if op == "cancel":
+            keys.append(("hotel", self.store.reservations[target].hotel_id))
+        return keys
+
+    def _validate(self, operations):
+        """Comprueba que las bajas y cancelaciones tienen objetivo y que
+        las altas con ``create_*`` no repiten IDs; cada comprobación es una
+        búsqueda O(1) en los índices por ID."""
+        store = self.store
+        present = {
+            "hotel": lambda key: key in store.hotels,
+            "customer": lambda key: key in store.customers,
+            "reservation": lambda key: key in store.reservations,
+        }
+        staged = {}
+        reservation_hotels = {}
+        for op, entity, target in operations:
+            if op == "create":
+                key = getattr(target, f"{entity}_id")
+                if staged.get((entity, key), present[entity](key)):
+                    raise ValueError(f"Ya existe {entity} con ID {key}.")
+                if entity == "reservation":
+                    for parent in ("hotel", "customer"):
+                        parent_id = getattr(target, f"{parent}_id")
+                        if not staged.get((parent, parent_id),
+                                          present[parent](parent_id)):
+                            raise ValueError(
+                                f"No existe {parent} con ID {parent_id}."
+                            )
+            if op in ("put", "create"):
+                key = getattr(target, f"{entity}_id")
+                staged[(entity, key)] = True
+                if entity == "reservation":
+                    reservation_hotels[key] = target.hotel_id
+                continue
+            exists = staged.get((entity, target), present[entity](target))
+            if not exists:
+                raise ValueError(f"No existe {entity} con ID {target}.")
+            staged[(entity, target)] = False
+            if op == "cancel":
+                hotel_id = reservation_hotels.get(target)
+                if hotel_id is None:
+                    hotel_id = store.reservations[target].hotel_id
+                if not staged.get(("hotel", hotel_id),
+                                  present["hotel"](hotel_id)):
+                    raise ValueError(f"No existe hotel con ID {hotel_id}.")
+
+
+def _ordinal(iso_date):
+    """Convierte una fecha ISO en su ordinal, o ``None`` en 0."""
+    return date.fromisoformat(iso_date).toordinal() if iso_date else 0
+
+
+def _normalize(text):
+    """Normaliza un texto para búsquedas (minúsculas y espacios simples)."""
+    return " ".join(text.casefold().split())
+
+
+def _iso_date(ordinal):
+    """Convierte un ordinal en fecha ISO, o 0 en ``None``."""
+    return date.fromordinal(ordinal).isoformat() if ordinal else None
+
+
+def _nights(check_in, check_out):
+    """Devuelve los ordinales ``(primera noche, día de salida)`` o
+    ``(None, None)`` si el rango no contiene ninguna noche."""
+    first, last = _ordinal(check_in), _ordinal(check_out)
+    if last <= first:
+        return None, None
+    return first, last
+
+
+@instrumented("changes_from_records")
+def changes_from_records(records):
+    """Resume registros del ``ReservationLog`` como cambios por entidad
+    ``{entidad: (upserts, deletes)}``; el último cambio de cada ID gana."""
+    changes = {}
+
+    def touch(entity, identifier, data):
+        upserts, deletes = changes.setdefault(entity, ({}, set()))
+        if data is None:
+            upserts.pop(identifier, None)
+            deletes.add(identifier)
+        else:
+            deletes.discard(identifier)
+            upserts[identifier] = data
+
+    for record in records:
+        if record["op"] == "txn":
+            for entity, (upserts, deletes) in \
+                    changes_from_records(record["records"]).items():
+                for identifier in deletes:
+                    touch(entity, identifier, None)
+                for identifier, data in upserts.items():
+                    touch(entity, identifier, data)
+        elif record["op"] == "put":
+            entity = record["entity"]
+            touch(entity, record["data"][f"{entity}_id"], record["data"])
+        else:
+            touch(record["entity"], record["id"], None)
+            if record["op"] == "cancel":
+                touch("hotel", record["hotel"]["hotel_id"], record["hotel"])
+    return changes
+
+
+# Clase del modelo de cada entidad.
+ENTITY_CLASSES = {
+    "hotel": Hotel,
+    "customer": Customer,
+    "reservation": Reservation,
+}
 
 
 # Ejemplo de uso
 def main():
     """Función principal para demostrar funcionalidad."""
-    hotels = Hotel.load_hotels()
-    customers = Customer.load_customers()
-    reservations = Reservation.load_reservations()
+    store = ReservationStore.load()
 
-    # Crear hotel
-    new_hotel = Hotel("H1", "Grand Hotel", "New York", 10)
-    hotels.append(new_hotel)
-    Hotel.save_hotels(hotels)
+    # Crear hotel (solo la primera vez: create_hotel rechaza IDs repetidos)
+    if store.get_hotel("H1") is None:
+        store.create_hotel(Hotel("H1", "Grand Hotel", "New York", 10))
 
     # Crear cliente
-    new_customer = Customer("C1", "Alice", "alice@example.com")
-    customers.append(new_customer)
-    Customer.save_customers(customers)
-
-    # Crear reserva
-    new_reservation = Reservation("R1", "C1", "H1")
-    reservations.append(new_reservation)
-    Reservation.save_reservations(reservations)
+    if store.get_customer("C1") is None:
+        store.create_customer(Customer("C1", "Alice", "alice@example.com"))
 
+    # Crear reserva (descuenta una habitación del hotel)
+    hotel = Hotel(**store.get_hotel("H1").to_dict())
+    hotel.rooms_available -= 1
+    with store.transaction() as txn:
+        txn.put_hotel(hotel)
+        txn.create_reservation(Reservation("R1", "C1", "H1"))
     print("Reserva creada exitosamente.")
 
-    # Cancelar reserva
-    reservations = Reservation.cancel_reservation("R1", reservations, hotels)
+    # Cancelar reserva (devuelve la habitación)
+    with store.transaction() as txn:
+        txn.cancel_reservation("R1")
     print("Reserva cancelada.")
 
 
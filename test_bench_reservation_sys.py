@@ -0,0 +1,45 @@
+import unittest
+from bench_reservation_sys import (
+    compare, generate_reservations, run_benchmarks, summarize
+)
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Pruebas para el arnés de mediciones de rendimiento."""
+
+    def test_generators(self):
+        """Prueba que las reservas generadas son reproducibles."""
+        first = generate_reservations(20, hotels=3, customers=5)
+        second = generate_reservations(20, hotels=3, customers=5)
+        self.assertEqual([r.to_dict() for r in first],
+                         [r.to_dict() for r in second])
+        self.assertTrue(all(int(r.hotel_id[1:]) < 3 for r in first))
+
+    def test_summarize(self):
+        """Prueba los percentiles y el rendimiento."""
+        stats = summarize([0.001 * n for n in range(1, 101)], peak_bytes=10)
+        self.assertAlmostEqual(stats["p50_ms"], 50.0)
+        self.assertAlmostEqual(stats["p99_ms"], 99.0)
+        self.assertAlmostEqual(stats["max_ms"], 100.0)
+        self.assertEqual(stats["operations"], 100)
+        self.assertEqual(stats["peak_bytes"], 10)
+
+    def test_run_and_compare(self):
+        """Prueba una ejecución pequeña y la detección de regresiones."""
+        results = run_benchmarks([50], repeat=2, lookups=5)
+        self.assertIn("cancel_reservation_store[50]", results["results"])
+        self.assertIsNotNone(results["results"]["load_hotels[50]"]["peak_bytes"])
+        slower = {"results": {
+            name: dict(stats, p50_ms=stats["p50_ms"] * 2)
+            for name, stats in results["results"].items()
+        }}
+        rows, regressions = compare(results, slower, threshold=0.5)
+        self.assertEqual(len(rows), len(results["results"]))
+        self.assertEqual(len(regressions), len(
+            [name for name, stats in results["results"].items() if stats["p50_ms"]]
+        ))
+        self.assertEqual(compare(results, results)[1], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
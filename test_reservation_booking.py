@@ -0,0 +1,170 @@
+import unittest
+import os
+import threading
+import multiprocessing
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_booking import BookingEngine
+from reservation_cache import WriteBackCache
+from test_support import seed_store_files
+
+
+def _book_in_process(directory, worker, attempts, hotels=("H1",),
+                     log=True):
+    """Reserva desde otro proceso compartiendo archivos y bloqueo; sin
+    ``log`` usa el modo instantánea (``ReservationStore.load``)."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    files = [os.path.join(directory, name) for name in (
+        "hotels.json", "customers.json", "reservations.json", "journal.jsonl"
+    )]
+    store = ReservationStore.open(*files) if log \
+        else ReservationStore.load(*files[:3])
+    engine = BookingEngine(store, os.path.join(directory, "bookings.lock"))
+    for attempt in range(attempts):
+        engine.reserve(f"R{worker}-{attempt}", "C1",
+                       hotels[attempt % len(hotels)])
+    engine.close()
+    store.close()
+
+
+class TestBookingEngine(unittest.TestCase):
+    """Pruebas para el motor de reservas concurrente."""
+
+    def setUp(self):
+        self.directory, self.files = seed_store_files(
+            self,
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10),
+                    Hotel("H2", "Budget Inn", "Los Angeles", 5)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        )
+
+    def test_reserve_and_cancel_update_inventory(self):
+        """Prueba que reservar descuenta y cancelar devuelve la habitación."""
+        store = ReservationStore.load(*self.files[:3])
+        engine = BookingEngine(store)
+        reservation = engine.reserve("R1", "C1", "H2")
+        self.assertEqual(reservation.hotel_id, "H2")
+        self.assertEqual(Hotel.load_hotels(self.files[0])[1].rooms_available, 4)
+        self.assertEqual(len(Reservation.load_reservations(self.files[2])), 1)
+        self.assertEqual(engine.cancel("R1").reservation_id, "R1")
+        self.assertEqual(store.get_hotel("H2").rooms_available, 5)
+        self.assertIsNone(engine.cancel("R1"))
+
+    def test_invalid_reservations(self):
+        """Prueba hoteles, clientes y reservas inválidos."""
+        engine = BookingEngine(ReservationStore.load(*self.files[:3]))
+        engine.reserve("R1", "C1", "H1")
+        for args in (("R2", "C1", "H99"), ("R2", "C99", "H1"),
+                     ("R1", "C1", "H2")):
+            with self.assertRaises(ValueError):
+                engine.reserve(*args)
+
+    def test_same_id_in_two_hotels(self):
+        """Prueba que dos hilos no crean la misma reserva en dos hoteles."""
+        barrier = threading.Barrier(2)
+
+        class SlowStore(ReservationStore):
+            """Repositorio que espera a que ambos hilos hayan comprobado
+            el ID antes de confirmar."""
+
+            def transaction(self):
+                barrier.wait(timeout=5)
+                return super().transaction()
+
+        store = SlowStore.load(*self.files[:3])
+        engine = BookingEngine(store)
+        errors = []
+
+        def worker(hotel_id):
+            try:
+                engine.reserve("R1", "C1", hotel_id)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(hotel_id,))
+                   for hotel_id in ("H1", "H2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 1)
+        hotel_id = store.get_reservation("R1").hotel_id
+        self.assertEqual(store.get_hotel("H1").rooms_available
+                         + store.get_hotel("H2").rooms_available, 14)
+        self.assertEqual(len(store.reservations_for_hotel(hotel_id)), 1)
+
+    def test_threads_never_overbook(self):
+        """Prueba que hilos concurrentes no sobrevenden un hotel."""
+        store = ReservationStore.open(*self.files)
+        engine = BookingEngine(store)
+
+        def worker(number):
+            for attempt in range(10):
+                engine.reserve(f"R{number}-{attempt}", "C1",
+                               "H1" if attempt % 2 else "H2")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(store.reservations_for_hotel("H1")), 10)
+        self.assertEqual(len(store.reservations_for_hotel("H2")), 5)
+        self.assertEqual(store.get_hotel("H1").rooms_available, 0)
+        store.close()
+        reopened = ReservationStore.open(*self.files)
+        self.assertEqual(len(reopened.reservations), 15)
+        reopened.close()
+
+    def test_processes_never_overbook(self):
+        """Prueba que varios procesos con bloqueo de archivo no sobrevenden."""
+        context = multiprocessing.get_context()
+        processes = [
+            context.Process(target=_book_in_process,
+                            args=(self.directory, worker, 8))
+            for worker in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        store = ReservationStore.open(*self.files)
+        self.assertEqual(len(store.reservations_for_hotel("H1")), 10)
+        self.assertEqual(store.get_hotel("H1").rooms_available, 0)
+        store.close()
+
+    def test_processes_share_json_files(self):
+        """Prueba que en modo instantánea los procesos no pierden
+        reservas ajenas ni sobrevenden al reescribir los archivos."""
+        context = multiprocessing.get_context()
+        processes = [
+            context.Process(target=_book_in_process,
+                            args=(self.directory, worker, 12, ("H1", "H2"),
+                                  False))
+            for worker in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        store = ReservationStore.load(*self.files[:3])
+        self.assertEqual(len(store.reservations_for_hotel("H1")), 10)
+        self.assertEqual(len(store.reservations_for_hotel("H2")), 5)
+        self.assertEqual(store.get_hotel("H1").rooms_available, 0)
+        self.assertEqual(store.get_hotel("H2").rooms_available, 0)
+
+    def test_json_lock_rejects_write_back(self):
+        """Prueba que el bloqueo entre procesos no acepta escritura
+        diferida en modo instantánea."""
+        store = ReservationStore.load(*self.files[:3])
+        engine = BookingEngine(store, os.path.join(self.directory, "b.lock"))
+        with WriteBackCache(store):
+            with self.assertRaises(ValueError):
+                engine.reserve("R1", "C1", "H1")
+        engine.close()
+        self.assertEqual(store.reservations, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import os
+import json
+import tempfile
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_bulk import (
+    export_hotels, export_reservations, import_customers, import_hotels,
+    import_reservations
+)
+
+
+class TestBulkImport(unittest.TestCase):
+    """Pruebas para la importación masiva con validación por lotes."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json"
+            )
+        )
+        self.store = ReservationStore.load(*self.files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        """Escribe un archivo de origen en el directorio temporal."""
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_import_csv_reports_row_errors(self):
+        """Prueba que las filas inválidas se reportan con su línea."""
+        path = self.write("hotels.csv", (
+            "hotel_id,name,location,rooms_available\n"
+            "H1,Grand Hotel,New York,10\n"
+            "H2,Budget Inn,Los Angeles,many\n"
+            "H3,,Paris,4\n"
+            "H1,Grand Copy,New York,1\n"
+            "H4,Sea View,Miami,3\n"
+        ))
+        result = import_hotels(path, self.store, batch_size=2)
+        self.assertEqual([h.hotel_id for h in result.imported], ["H1", "H4"])
+        self.assertEqual([line for line, _ in result.errors], [3, 4, 5])
+        self.assertFalse(result.ok)
+        saved = Hotel.load_hotels(self.files[0])
+        self.assertEqual([h.rooms_available for h in saved], [10, 3])
+
+    def test_existing_ids_and_extra_columns_are_errors(self):
+        """Prueba que no se reemplazan entidades existentes y que una
+        columna sobrante se reporta como error de la fila."""
+        self.store.add_hotel(Hotel("H9", "Old Hotel", "Rome", 2))
+        path = self.write("hotels.csv", (
+            "hotel_id,name,location,rooms_available\n"
+            "H9,New Hotel,Rome,7\n"
+            "H1,Grand Hotel,New York,10,extra\n"
+            "H2,Budget Inn,Los Angeles,5\n"
+        ))
+        result = import_hotels(path, self.store)
+        self.assertEqual([h.hotel_id for h in result.imported], ["H2"])
+        self.assertEqual(result.errors, [
+            (2, "Ya existe hotel con ID H9."),
+            (3, "La fila tiene más columnas que el encabezado."),
+        ])
+        self.assertEqual(self.store.get_hotel("H9").name, "Old Hotel")
+
+    def test_non_text_fields_are_row_errors(self):
+        """Prueba que un nombre o ID que no es texto se reporta como error
+        de la fila en lugar de fallar al confirmar."""
+        path = self.write("hotels.jsonl", "\n".join(json.dumps(h) for h in (
+            {"hotel_id": "H9", "name": 123, "location": "Rome",
+             "rooms_available": 2},
+            {"hotel_id": 7, "name": "Sea View", "location": "Miami",
+             "rooms_available": 3},
+            {"hotel_id": "H1", "name": "Grand Hotel", "location": "New York",
+             "rooms_available": 10},
+        )))
+        result = import_hotels(path, self.store)
+        self.assertEqual([h.hotel_id for h in result.imported], ["H1"])
+        self.assertEqual(result.errors, [
+            (1, "El campo name debe ser texto."),
+            (2, "El campo hotel_id debe ser texto."),
+        ])
+
+    def test_import_jsonl_with_references(self):
+        """Prueba clientes y reservas en JSON lines con referencias."""
+        self.store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 10))
+        customers = self.write("customers.jsonl", (
+            '{"customer_id": "C1", "name": "Alice", "email": "alice@example.com"}\n'
+            '{"customer_id": "C2", "name": "Bob", "email": "bob"}\n'
+            '{invalid json}\n'
+        ))
+        result = import_customers(customers, self.store)
+        self.assertEqual(len(result.imported), 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 3])
+        reservations = self.write("reservations.jsonl", "\n".join(json.dumps(r) for r in (
+            {"reservation_id": "R1", "customer_id": "C1", "hotel_id": "H1"},
+            {"reservation_id": "R2", "customer_id": "C2", "hotel_id": "H1"},
+            {"reservation_id": "R3", "customer_id": "C1", "hotel_id": "H1",
+             "check_in": "2025-03-07", "check_out": "2025-03-03"},
+            {"reservation_id": "R4", "customer_id": "C1", "hotel_id": "H1",
+             "check_in": "2025-03-03", "check_out": "2025-03-07"},
+        )))
+        result = import_reservations(reservations, self.store)
+        self.assertEqual([r.reservation_id for r in result.imported], ["R1", "R4"])
+        self.assertEqual([line for line, _ in result.errors], [2, 3])
+        self.assertEqual(len(Reservation.load_reservations(self.files[2])), 2)
+
+    def test_import_with_process_pool(self):
+        """Prueba la validación de lotes en varios procesos."""
+        rows = "".join(
+            f"C{n},Customer {n},{'invalid' if n % 50 == 0 else 'c'}"
+            f"{'' if n % 50 == 0 else '@example.com'}\n" for n in range(200)
+        )
+        path = self.write("customers.csv", "customer_id,name,email\n" + rows)
+        result = import_customers(path, self.store, batch_size=25, processes=2)
+        self.assertEqual(len(result.imported), 196)
+        self.assertEqual([line for line, _ in result.errors], [2, 52, 102, 152])
+        self.assertEqual(len(Customer.load_customers(self.files[1])), 196)
+
+
+class TestBulkExport(unittest.TestCase):
+    """Pruebas para la exportación masiva."""
+
+    def test_round_trip(self):
+        """Prueba exportar e importar de nuevo en CSV y JSON lines."""
+        with tempfile.TemporaryDirectory() as directory:
+            hotels = [Hotel(f"H{n}", f"Hotel {n}", "Paris", n) for n in range(5)]
+            reservations = [
+                Reservation("R1", "C1", "H1"),
+                Reservation("R2", "C1", "H2", "2025-03-03", "2025-03-07"),
+            ]
+            for extension in ("csv", "jsonl"):
+                hotels_file = os.path.join(directory, f"hotels.{extension}")
+                self.assertEqual(export_hotels(hotels, hotels_file), 5)
+                reservations_file = os.path.join(directory, f"res.{extension}")
+                export_reservations(reservations, reservations_file)
+                store = ReservationStore(
+                    customers=[Customer("C1", "Alice", "alice@example.com")]
+                )
+                self.assertTrue(import_hotels(hotels_file, store).ok)
+                result = import_reservations(reservations_file, store)
+                self.assertTrue(result.ok)
+                self.assertEqual(
+                    [r.to_dict() for r in result.imported],
+                    [r.to_dict() for r in reservations]
+                )
+
+    def test_failed_export_keeps_destination(self):
+        """Prueba que una exportación interrumpida no toca el destino ni
+        deja temporales."""
+        def failing():
+            yield Hotel("H2", "Budget Inn", "Los Angeles", 5)
+            raise OSError("origen interrumpido")
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "hotels.jsonl")
+            export_hotels([Hotel("H1", "Grand Hotel", "New York", 10)],
+                          filename)
+            with self.assertRaises(OSError):
+                export_hotels(failing(), filename)
+            self.assertEqual(os.listdir(directory), ["hotels.jsonl"])
+            with open(filename, encoding="utf-8") as file:
+                self.assertEqual(json.loads(file.read())["hotel_id"], "H1")
+
+
+if __name__ == '__main__':
+    unittest.main()
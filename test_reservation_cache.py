@@ -0,0 +1,136 @@
+import unittest
+import time
+from reservation_sys import (
+    Hotel, Customer, JsonBackend, Reservation, ReservationStore, set_backend
+)
+from reservation_booking import BookingEngine
+from reservation_cache import WriteBackCache
+from test_support import seed_store_files
+
+
+class _RecordingBackend(JsonBackend):
+    """Backend JSON que anota los cambios recibidos y puede fallar."""
+
+    def __init__(self):
+        self.applied = []
+        self.fail = False
+
+    def apply(self, changes, store=None):
+        if self.fail:
+            raise OSError("disco lleno")
+        self.applied.append({
+            entity: (set(upserts), set(deletes))
+            for entity, (_, upserts, deletes) in changes.items()
+        })
+        super().apply(changes, store)
+
+
+class TestWriteBackCache(unittest.TestCase):
+    """Pruebas para la escritura diferida con seguimiento de cambios."""
+
+    def setUp(self):
+        _, self.journal_files = seed_store_files(
+            self,
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10),
+                    Hotel("H2", "Beach Inn", "Miami", 5)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[Reservation("R1", "C1", "H1")],
+        )
+        self.files = self.journal_files[:3]
+        self.backend = _RecordingBackend()
+        self.previous = set_backend(self.backend)
+        self.store = ReservationStore.load(*self.files)
+
+    def tearDown(self):
+        set_backend(self.previous)
+
+    def test_coalesces_until_flush(self):
+        """Prueba que los cambios se agrupan por entidad hasta ``flush``."""
+        cache = WriteBackCache(self.store)
+        for rooms in (9, 8, 7):
+            self.store.modify_hotel("H1", rooms_available=rooms)
+        hotel = self.store.get_hotel("H2")
+        hotel.modify_hotel(name="Beach Resort")
+        cache.mark_dirty(hotel)
+        self.store.add_customer(Customer("C2", "Bob", "bob@example.com"))
+        self.store.remove_customer("C2")
+        self.assertEqual(self.backend.applied, [])
+        self.assertEqual(cache.pending, 3)
+        self.assertEqual(Hotel.load_hotels(self.files[0])[0].rooms_available,
+                         10)
+        self.assertEqual(cache.flush(), 3)
+        self.assertEqual(self.backend.applied, [{
+            "hotel": ({"H1", "H2"}, set()),
+            "customer": (set(), {"C2"}),
+        }])
+        hotels = Hotel.load_hotels(self.files[0])
+        self.assertEqual([h.rooms_available for h in hotels], [7, 5])
+        self.assertEqual(hotels[1].name, "Beach Resort")
+        self.assertEqual(self.store.find_hotels(prefix="beach r")[0].hotel_id,
+                         "H2")
+        self.assertEqual(cache.flush(), 0)
+        self.assertEqual(len(self.backend.applied), 1)
+
+    def test_transactions_and_cancellations_are_deferred(self):
+        """Prueba que las transacciones y cancelaciones esperan al vaciado."""
+        with WriteBackCache(self.store):
+            engine = BookingEngine(self.store)
+            engine.reserve("R2", "C1", "H2")
+            Reservation.cancel_reservation("R1", self.store, None)
+            engine.reserve("R3", "C1", "H1")
+            Hotel.delete_hotel("H2", self.store, cascade=True)
+            self.assertEqual(self.backend.applied, [])
+        self.assertIsNone(self.store.write_back)
+        self.assertEqual(self.backend.applied, [{
+            "hotel": ({"H1"}, {"H2"}),
+            "reservation": ({"R3"}, {"R1", "R2"}),
+        }])
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(reloaded.get_hotel("H1").rooms_available, 10)
+        self.assertIsNone(reloaded.get_hotel("H2"))
+        self.assertEqual(set(reloaded.reservations), {"R3"})
+
+    def test_flushes_at_size_threshold(self):
+        """Prueba el vaciado al alcanzar ``max_dirty``."""
+        cache = WriteBackCache(self.store, max_dirty=2)
+        self.store.modify_hotel("H1", rooms_available=1)
+        self.store.modify_hotel("H1", rooms_available=2)
+        self.assertEqual(self.backend.applied, [])
+        self.store.modify_hotel("H2", rooms_available=3)
+        self.assertEqual(len(self.backend.applied), 1)
+        self.assertEqual(cache.pending, 0)
+
+    def test_flushes_on_timer(self):
+        """Prueba el vaciado periódico con ``flush_interval``."""
+        cache = WriteBackCache(self.store, flush_interval=0.01)
+        self.store.modify_hotel("H1", rooms_available=4)
+        deadline = time.monotonic() + 5
+        while cache.flushes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cache.flushes, 1)
+        self.assertEqual(Hotel.load_hotels(self.files[0])[0].rooms_available,
+                         4)
+
+    def test_failed_flush_keeps_changes(self):
+        """Prueba que un vaciado fallido conserva los cambios pendientes."""
+        cache = WriteBackCache(self.store)
+        self.store.modify_hotel("H1", rooms_available=4)
+        self.backend.fail = True
+        with self.assertRaises(OSError):
+            cache.flush()
+        self.assertEqual(cache.pending, 1)
+        self.backend.fail = False
+        self.assertEqual(cache.flush(), 1)
+        self.assertEqual(Hotel.load_hotels(self.files[0])[0].rooms_available,
+                         4)
+
+    def test_rejects_log_mode(self):
+        """Prueba que no se admite un repositorio en modo registro."""
+        store = ReservationStore.open(*self.journal_files)
+        with self.assertRaises(ValueError):
+            WriteBackCache(store)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import os
+import tempfile
+import threading
+from unittest import mock
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_booking import BookingEngine
+from reservation_feed import ChangeFeed, FileCursor
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Pruebas para el flujo de cambios del repositorio."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "feed.jsonl")
+        self.store = ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 3)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ordered_events_and_cursor(self):
+        """Prueba la secuencia de eventos y la lectura con cursor."""
+        feed = ChangeFeed(self.store)
+        cursor = feed.cursor()
+        engine = BookingEngine(self.store)
+        engine.reserve("R1", "C1", "H1")
+        events = cursor.poll()
+        self.assertEqual([(e["seq"], e["op"], e["entity"], e["id"])
+                          for e in events],
+                         [(1, "put", "hotel", "H1"),
+                          (2, "put", "reservation", "R1")])
+        self.assertEqual(events[0]["data"]["rooms_available"], 2)
+        self.assertEqual(events[0]["previous"]["rooms_available"], 3)
+        self.assertIsNone(events[1]["previous"])
+        self.assertEqual(cursor.poll(), [])
+        engine.cancel("R1")
+        self.store.add_customer(Customer("C2", "Bob", "bob@example.com"))
+        [cancel, customer] = cursor.poll()
+        self.assertEqual(cancel["seq"], 3)
+        self.assertEqual(cancel["previous"]["customer_id"], "C1")
+        self.assertEqual(cancel["hotel"]["rooms_available"], 3)
+        self.assertEqual(customer["data"]["email"], "bob@example.com")
+        self.assertEqual(cursor.position, 4)
+        self.assertEqual([e["seq"] for e in feed.read(1, limit=2)], [2, 3])
+        feed.close()
+        self.store.remove_customer("C2")
+        self.assertEqual(feed.sequence, 4)
+
+    def test_in_place_update_has_no_previous(self):
+        """Prueba que volver a agregar un hotel modificado en su lugar no
+        publica el estado nuevo como anterior."""
+        feed = ChangeFeed(self.store)
+        hotel = self.store.get_hotel("H1")
+        hotel.modify_hotel(rooms_available=7)
+        self.store.add_hotel(hotel)
+        self.store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 4))
+        [in_place, replaced] = feed.read()
+        self.assertEqual(in_place["data"]["rooms_available"], 7)
+        self.assertIsNone(in_place["previous"])
+        self.assertEqual(replaced["previous"]["rooms_available"], 7)
+        feed.close()
+
+    def test_failed_transaction_publishes_nothing(self):
+        """Prueba que una transacción que no se pudo guardar no publica
+        eventos, ni siquiera compensatorios."""
+        feed = ChangeFeed(self.store)
+        engine = BookingEngine(self.store)
+        with mock.patch.object(self.store, "persist_changes",
+                               side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                engine.reserve("R1", "C1", "H1")
+        self.assertEqual(feed.read(), [])
+        engine.reserve("R1", "C1", "H1")
+        self.assertEqual([(e["op"], e["id"]) for e in feed.read()],
+                         [("put", "H1"), ("put", "R1")])
+        feed.close()
+
+    def test_refresh_skips_own_journal_records(self):
+        """Prueba que ``refresh`` no vuelve a publicar los registros propios
+        anexados después de los de otro proceso."""
+        names = [os.path.join(self.tmp.name, name) for name in
+                 ("hotels.json", "customers.json", "reservations.json",
+                  "journal.jsonl")]
+        self.store.save(*names[:3])
+        first = ReservationStore.open(*names)
+        second = ReservationStore.open(*names)
+        feed = ChangeFeed(first)
+        first.add_customer(Customer("C2", "Bob", "bob@example.com"))
+        second.add_customer(Customer("C3", "Carol", "carol@example.com"))
+        first.add_customer(Customer("C4", "Dave", "dave@example.com"))
+        self.assertEqual(first.refresh(), 1)
+        self.assertEqual([e["id"] for e in feed.read()], ["C2", "C4", "C3"])
+        self.assertEqual(first.refresh(), 0)
+        self.assertEqual(sorted(first.customers), ["C1", "C2", "C3", "C4"])
+        feed.close()
+        first.close()
+        second.close()
+
+    def test_subscriber_queue_and_wait(self):
+        """Prueba las colas de suscriptores y la espera de eventos."""
+        feed = ChangeFeed(self.store)
+        events = feed.subscribe()
+        full = feed.subscribe(maxsize=1)
+        cursor = feed.cursor()
+        thread = threading.Thread(target=lambda: [
+            self.store.add_reservation(Reservation(f"R{n}", "C1", "H1"))
+            for n in range(3)
+        ])
+        thread.start()
+        first = cursor.poll(timeout=5)
+        thread.join()
+        self.assertGreaterEqual(len(first), 1)
+        self.assertEqual([events.get_nowait()["id"] for _ in range(3)],
+                         ["R0", "R1", "R2"])
+        self.assertEqual(full.qsize(), 1)
+        feed.unsubscribe(events)
+        self.store.remove_reservation("R0")
+        self.assertTrue(events.empty())
+        self.assertEqual(cursor.poll()[-1]["op"], "delete")
+        feed.close()
+
+    def test_persisted_feed_and_file_cursor(self):
+        """Prueba seguir el archivo del flujo y reanudar la secuencia."""
+        feed = ChangeFeed(self.store, self.filename, capacity=2)
+        tail = FileCursor(self.filename)
+        for n in range(5):
+            self.store.add_reservation(Reservation(f"R{n}", "C1", "H1"))
+        self.assertEqual([e["id"] for e in tail.poll(limit=2)], ["R0", "R1"])
+        self.assertEqual([e["seq"] for e in tail.poll()], [3, 4, 5])
+        self.assertEqual([e["seq"] for e in feed.read(0, limit=2)], [1, 2])
+        feed.close()
+        with open(self.filename, "a", encoding="utf-8") as file:
+            file.write('{"seq": 6, "op"')
+        reopened = ChangeFeed(self.store, self.filename)
+        self.store.remove_reservation("R4")
+        self.assertEqual(reopened.sequence, 6)
+        self.assertEqual([(e["seq"], e["op"]) for e in tail.poll()],
+                         [(6, "delete")])
+        reopened.close()
+
+    def test_bounded_memory_without_file(self):
+        """Prueba que sin archivo los eventos antiguos se descartan."""
+        feed = ChangeFeed(self.store, capacity=2)
+        for n in range(6):
+            self.store.add_reservation(Reservation(f"R{n}", "C1", "H1"))
+        self.assertEqual([e["seq"] for e in feed.read(4)], [5, 6])
+        with self.assertRaises(ValueError):
+            feed.read(0)
+        feed.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
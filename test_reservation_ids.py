@@ -0,0 +1,77 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+import multiprocessing
+from reservation_ids import IdGenerator
+
+
+def _take_ids(filename, count, output):
+    """Genera IDs desde otro proceso y los escribe en ``output``."""
+    generator = IdGenerator(filename, prefix="R", block_size=7)
+    ids = [generator.next_id() for _ in range(count)]
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(ids, file)
+
+
+class TestIdGenerator(unittest.TestCase):
+    """Pruebas para el generador de IDs por bloques."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.counter = os.path.join(self.tmp.name, "ids.counter")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generator_blocks_and_threads(self):
+        """Prueba que el generador no repite IDs entre hilos ni al
+        reabrirse."""
+        generator = IdGenerator(self.counter, prefix="H", block_size=10,
+                                start=2)
+        self.assertEqual(generator.next_id(), "H2")
+        with open(self.counter, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "12")
+        results = []
+
+        def worker():
+            results.extend(generator.next_id() for _ in range(50))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(results)), 200)
+        bulk = generator.take(25)
+        self.assertEqual(len(set(bulk) | set(results) | {"H2"}), 226)
+        reopened = IdGenerator(self.counter, prefix="H", block_size=10)
+        self.assertGreater(int(reopened.next_id()[1:]),
+                           max(int(i[1:]) for i in bulk))
+
+    def test_generator_across_processes(self):
+        """Prueba que varios procesos nunca obtienen el mismo ID."""
+        context = multiprocessing.get_context()
+        outputs = [os.path.join(self.tmp.name, f"ids{n}.json")
+                   for n in range(3)]
+        processes = [
+            context.Process(target=_take_ids,
+                            args=(self.counter, 30, output))
+            for output in outputs
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        ids = []
+        for output in outputs:
+            with open(output, encoding="utf-8") as file:
+                ids.extend(json.load(file))
+        self.assertEqual(len(ids), 90)
+        self.assertEqual(len(set(ids)), 90)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_metrics import METRICS
+from test_support import seed_store_files
+
+
+class TestMetrics(unittest.TestCase):
+    """Pruebas para la instrumentación de las operaciones."""
+
+    def setUp(self):
+        _, files = seed_store_files(
+            self,
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[Reservation("R1", "C1", "H1"),
+                          Reservation("R2", "C1", "H1")],
+        )
+        self.files = files[:3]
+        METRICS.reset()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+
+    def test_disabled_by_default(self):
+        """Prueba que sin habilitar no se registra nada."""
+        ReservationStore.load(*self.files).cancel_reservation("R1")
+        self.assertEqual(METRICS.snapshot()["operations"], {})
+        self.assertEqual(METRICS.snapshot()["bytes_read"], {})
+
+    def test_counters_timings_and_bytes(self):
+        """Prueba contadores, tiempos y bytes de una cancelación."""
+        METRICS.enable()
+        store = ReservationStore.load(*self.files)
+        with store.transaction() as txn:
+            txn.cancel_reservation("R1")
+        self.assertIsNone(Customer.find_customer("C99", store))
+        snapshot = METRICS.snapshot()
+        operations = snapshot["operations"]
+        self.assertEqual(operations["ReservationStore.load"]["calls"], 1)
+        self.assertEqual(operations["Hotel.load_hotels"]["calls"], 1)
+        self.assertEqual(operations["Customer.find_customer"]["calls"], 1)
+        self.assertEqual(operations["Transaction.commit"]["calls"], 1)
+        self.assertGreaterEqual(operations["serialize_json"]["calls"], 2)
+        self.assertEqual(
+            sum(operations["Transaction.commit"]["buckets"].values()), 1
+        )
+        self.assertGreater(snapshot["bytes_read"]["json"], 0)
+        self.assertGreater(snapshot["bytes_written"]["json"], 0)
+
+    def test_errors_and_prometheus(self):
+        """Prueba el conteo de errores y la exportación a Prometheus."""
+        METRICS.enable()
+        store = ReservationStore.load(*self.files)
+        txn = store.transaction()
+        txn.delete_hotel("H99")
+        with self.assertRaises(ValueError):
+            txn.commit()
+        text = METRICS.prometheus()
+        self.assertIn(
+            'reservation_sys_operation_errors_total{operation="Transaction.commit"} 1',
+            text
+        )
+        self.assertIn(
+            'reservation_sys_operation_seconds_count{operation="ReservationStore.load"} 1',
+            text
+        )
+        self.assertIn('le="+Inf"', text)
+        self.assertIn('reservation_sys_bytes_read_total{target="json"}', text)
+
+    def test_capture_single_operation(self):
+        """Prueba perfilar solo la siguiente llamada de una operación."""
+        METRICS.enable()
+        store = ReservationStore.load(*self.files)
+        profile = METRICS.capture("ReservationStore.cancel_reservation")
+        memory = METRICS.capture("Hotel.load_hotels", mode="tracemalloc")
+        store.cancel_reservation("R1")
+        Hotel.load_hotels(self.files[0])
+        self.assertTrue(profile.done)
+        self.assertIn("cancel_reservation", profile.report)
+        self.assertTrue(memory.report.startswith("pico:"))
+        store.cancel_reservation("R2")
+        self.assertEqual(
+            METRICS.snapshot()["operations"]
+            ["ReservationStore.cancel_reservation"]["calls"], 2
+        )
+        with self.assertRaises(ValueError):
+            METRICS.capture("Hotel.load_hotels", mode="perf")
+
+
+if __name__ == '__main__':
+    unittest.main()
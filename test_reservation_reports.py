@@ -0,0 +1,97 @@
+import unittest
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_booking import BookingEngine
+from reservation_reports import ReportViews
+from test_support import seed_store_files
+
+
+class TestReportViews(unittest.TestCase):
+    """Pruebas para las vistas materializadas de reportes."""
+
+    def setUp(self):
+        _, self.files = seed_store_files(
+            self,
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 3),
+                    Hotel("H2", "Beach Inn", "Miami", 4),
+                    Hotel("H3", "Bay Hotel", "Miami", 2)],
+            customers=[Customer("C1", "Alice", "alice@example.com"),
+                       Customer("C2", "Bob", "bob@example.com")],
+            reservations=[
+                Reservation("R1", "C1", "H1"),
+                Reservation("R2", "C2", "H2", "2024-06-01", "2024-06-04"),
+            ],
+        )
+        self.store = ReservationStore.load(*self.files[:3])
+        self.views = ReportViews(self.store)
+
+    def tearDown(self):
+        self.views.close()
+
+    def test_initial_views(self):
+        """Prueba las vistas calculadas al crearse."""
+        self.assertEqual(self.views.occupancy("H1"), {
+            "hotel_id": "H1", "reservations": 1, "nights": 0,
+            "rooms_available": 3, "rate": 0.25,
+        })
+        self.assertEqual(self.views.occupancy("H2")["nights"], 3)
+        self.assertIsNone(self.views.occupancy("H99"))
+        self.assertEqual(self.views.customer_reservations("C2"), 1)
+        self.assertEqual(self.views.top_locations(),
+                         [("New York", 1), ("Miami", 1)])
+        self.assertEqual(self.views.verify(), [])
+
+    def test_incremental_updates(self):
+        """Prueba que los cambios por la API actualizan las vistas."""
+        engine = BookingEngine(self.store)
+        engine.reserve("R3", "C1", "H2")
+        engine.reserve("R4", "C1", "H3", "2024-07-01", "2024-07-08")
+        engine.cancel("R1")
+        Reservation.cancel_reservation("R2", self.store, None)
+        self.store.add_reservation(Reservation("R3", "C2", "H3"))
+        self.assertEqual(self.views.customer_reservations("C1"), 1)
+        self.assertEqual(self.views.customer_reservations("C2"), 1)
+        self.assertEqual(self.views.top_locations(1), [("Miami", 2)])
+        self.assertEqual(self.views.occupancy("H3")["nights"], 7)
+        self.store.modify_hotel("H3", location="Boston")
+        self.assertEqual(dict(self.views.top_locations()), {"Boston": 2})
+        Hotel.delete_hotel("H3", self.store, cascade=True)
+        Customer.delete_customer("C1", self.store)
+        self.assertEqual(self.views.top_locations(), [])
+        self.assertEqual(self.views.top_customers(), [])
+        self.assertEqual(self.views.verify(), [])
+
+    def test_verify_and_rebuild(self):
+        """Prueba detectar y corregir vistas desfasadas."""
+        self.views.close()
+        self.store.add_reservation(Reservation("R5", "C2", "H1"))
+        self.assertEqual(self.views.verify(), [
+            ("reservations_by_hotel", "H1", 1, 2),
+            ("reservations_by_customer", "C2", 1, 2),
+            ("reservations_by_location", "New York", 1, 2),
+        ])
+        self.views.rebuild()
+        self.assertEqual(self.views.verify(), [])
+
+    def test_follows_log_replay_and_refresh(self):
+        """Prueba las vistas sobre registros aplicados desde el journal."""
+        writer = ReservationStore.open(*self.files)
+        reader = ReservationStore.open(*self.files)
+        views = ReportViews(reader)
+        BookingEngine(writer).reserve("R6", "C2", "H1")
+        writer.cancel_reservation("R2")
+        reader.refresh()
+        self.assertEqual(views.occupancy("H1")["reservations"], 2)
+        self.assertEqual(views.customer_reservations("C2"), 1)
+        self.assertEqual(views.occupancy("H2")["nights"], 0)
+        writer.compact()
+        writer.cancel_reservation("R6")
+        reader.refresh()
+        self.assertEqual(views.verify(), [])
+        self.assertEqual(views.customer_reservations("C2"), 0)
+        views.close()
+        writer.close()
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
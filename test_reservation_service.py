@@ -0,0 +1,140 @@
+import unittest
+import json
+import asyncio
+from unittest import mock
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_service import ReservationService
+from test_support import seed_store_files
+
+
+class TestReservationService(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para el servicio asyncio con lotes de escritura."""
+
+    async def asyncSetUp(self):
+        _, files = seed_store_files(
+            self,
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10),
+                    Hotel("H2", "Beach Inn", "Miami", 5)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[Reservation("R0", "C1", "H2")],
+        )
+        self.files = files[:3]
+        self.service = ReservationService(
+            ReservationStore.load(*self.files), batch_window=0.01
+        )
+        server = await self.service.start(port=0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def request(self, *messages):
+        """Envía peticiones por una conexión y devuelve las respuestas."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        responses = []
+        for message in messages:
+            line = message if isinstance(message, bytes) \
+                else json.dumps(message).encode("utf-8") + b"\n"
+            writer.write(line)
+            await writer.drain()
+            responses.append(json.loads(
+                await asyncio.wait_for(reader.readline(), 10)
+            ))
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    async def test_concurrent_reservations_share_writes(self):
+        """Prueba que reservas concurrentes se guardan en pocos lotes y
+        sin sobreventa."""
+        responses = await asyncio.gather(*(
+            self.request({"id": n, "op": "reserve", "reservation_id": f"R{n + 1}",
+                          "customer_id": "C1", "hotel_id": "H1"})
+            for n in range(15)
+        ))
+        results = [response for [response] in responses]
+        self.assertTrue(all(response["ok"] for response in results))
+        booked = [r for r in results if r["result"] is not None]
+        self.assertEqual(len(booked), 10)
+        self.assertEqual(sorted(r["id"] for r in results), list(range(15)))
+        self.assertLess(self.service.batches, 15)
+        self.assertEqual(self.service.cache.flushes, self.service.batches)
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(len(reloaded.reservations_for_hotel("H1")), 10)
+        self.assertEqual(reloaded.get_hotel("H1").rooms_available, 0)
+
+    async def test_reads_cancel_and_errors(self):
+        """Prueba lecturas, cancelaciones y respuestas de error."""
+        responses = await self.request(
+            {"id": "a", "op": "get_hotel", "hotel_id": "H2"},
+            {"id": "b", "op": "find_hotels", "prefix": "beach"},
+            {"id": "c", "op": "cancel", "reservation_id": "R0"},
+            {"id": "d", "op": "cancel", "reservation_id": "R0"},
+            {"id": "e", "op": "reserve", "reservation_id": "R9",
+             "customer_id": "C1", "hotel_id": "H99"},
+            {"id": "f", "op": "drop_tables"},
+            {"id": "g", "op": "get_hotel"},
+            b"{no es json\n",
+        )
+        self.assertEqual(responses[0]["result"]["rooms_available"], 5)
+        self.assertEqual([h["hotel_id"] for h in responses[1]["result"]],
+                         ["H2"])
+        self.assertEqual(responses[2]["result"]["reservation_id"], "R0")
+        self.assertIsNone(responses[3]["result"])
+        for response in responses[4:]:
+            self.assertFalse(response["ok"])
+            self.assertIn("error", response)
+        self.assertEqual(responses[4]["id"], "e")
+        self.assertIn("H99", responses[4]["error"])
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(reloaded.get_hotel("H2").rooms_available, 6)
+        self.assertEqual(reloaded.reservations, {})
+
+    async def test_failed_flush_is_rolled_back(self):
+        """Prueba que un lote que no se puede guardar se deshace en
+        memoria y no se confirma a nadie."""
+        store = self.service.store
+        with mock.patch.object(store, "persist_changes",
+                               side_effect=OSError("disco lleno")):
+            responses = await asyncio.gather(
+                self.request({"id": 1, "op": "reserve", "reservation_id": "R1",
+                              "customer_id": "C1", "hotel_id": "H1"}),
+                self.request({"id": 2, "op": "cancel", "reservation_id": "R0"}),
+            )
+        for [response] in responses:
+            self.assertFalse(response["ok"])
+            self.assertIn("disco lleno", response["error"])
+        self.assertIsNone(store.get_reservation("R1"))
+        self.assertIsNotNone(store.get_reservation("R0"))
+        self.assertEqual(store.get_hotel("H1").rooms_available, 10)
+        self.assertEqual(store.get_hotel("H2").rooms_available, 5)
+        [response] = await self.request(
+            {"id": 3, "op": "reserve", "reservation_id": "R1",
+             "customer_id": "C1", "hotel_id": "H1"}
+        )
+        self.assertTrue(response["ok"])
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(sorted(reloaded.reservations), ["R0", "R1"])
+        self.assertEqual(reloaded.get_hotel("H1").rooms_available, 9)
+        self.assertEqual(reloaded.get_hotel("H2").rooms_available, 5)
+
+    async def test_unexpected_error_keeps_batching(self):
+        """Prueba que un error inesperado en un lote se responde y no
+        detiene los lotes siguientes."""
+        with mock.patch.object(self.service, "_commit",
+                               side_effect=RuntimeError("fallo")):
+            [failed] = await self.request({"id": 1, "op": "cancel",
+                                           "reservation_id": "R0"})
+        with mock.patch.object(self.service.engine, "cancel",
+                               side_effect=KeyError("R0")):
+            [broken] = await self.request({"id": 2, "op": "cancel",
+                                           "reservation_id": "R0"})
+        [response] = await self.request({"id": 3, "op": "cancel",
+                                         "reservation_id": "R0"})
+        self.assertEqual((failed["ok"], failed["error"]), (False, "fallo"))
+        self.assertFalse(broken["ok"])
+        self.assertEqual(response["result"]["reservation_id"], "R0")
+
+
+if __name__ == '__main__':
+    unittest.main()
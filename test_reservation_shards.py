@@ -0,0 +1,136 @@
+import unittest
+import os
+import tempfile
+from reservation_sys import (
+    Hotel, Customer, JsonBackend, Reservation, ReservationStore, set_backend
+)
+from reservation_booking import BookingEngine
+from reservation_shards import (
+    ShardedBackend, map_shards, merge_json, shard_of, split_json
+)
+
+
+def _cancel_first(hotels_file, customers_file, reservations_file):
+    """Cancela la primera reserva de un shard desde otro proceso."""
+    store = ReservationStore.load(hotels_file, customers_file,
+                                  reservations_file)
+    reservations = store.reservation_list()
+    if reservations:
+        with store.transaction() as txn:
+            txn.cancel_reservation(reservations[0].reservation_id)
+    return len(reservations)
+
+
+class TestShardedBackend(unittest.TestCase):
+    """Pruebas para el almacenamiento particionado por hotel."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "datos")
+        self.backend = ShardedBackend(self.directory, shards=4)
+        self.previous = set_backend(self.backend)
+        Hotel.save_hotels([Hotel(f"H{n}", f"Hotel {n}", "Lima", 5)
+                           for n in range(12)])
+        Customer.save_customers([Customer("C1", "Alice", "alice@example.com")])
+        Reservation.save_reservations([
+            Reservation(f"R{n}", "C1", f"H{n % 12}") for n in range(30)
+        ])
+
+    def tearDown(self):
+        set_backend(self.previous)
+        self.tmp.cleanup()
+
+    def read_shards(self):
+        """Devuelve el contenido de los archivos de cada shard."""
+        contents = []
+        for shard in range(self.backend.shards):
+            files = self.backend.shard_files(shard)
+            contents.append([
+                open(name, encoding="utf-8").read()
+                for name in (files[0], files[2])
+            ])
+        return contents
+
+    def test_routes_by_hotel(self):
+        """Prueba que cada reserva vive en el shard de su hotel."""
+        self.assertEqual(len(Reservation.load_reservations()), 30)
+        for shard in range(4):
+            hotels_file, _, reservations_file = self.backend.shard_files(shard)
+            for reservation in JsonBackend().load("reservation",
+                                                  reservations_file):
+                self.assertEqual(shard_of(reservation.hotel_id, 4), shard)
+            for hotel in JsonBackend().load("hotel", hotels_file):
+                self.assertEqual(shard_of(hotel.hotel_id, 4), shard)
+
+    def test_cancel_rewrites_one_shard(self):
+        """Prueba que cancelar solo reescribe el shard del hotel."""
+        store = ReservationStore.load()
+        before = self.read_shards()
+        Reservation.cancel_reservation("R3", store, None)
+        BookingEngine(store).reserve("R99", "C1", "H3")
+        BookingEngine(store).cancel("R5")
+        after = self.read_shards()
+        changed = {shard for shard in range(4) if before[shard] != after[shard]}
+        self.assertEqual(changed, {shard_of("H3", 4), shard_of("H5", 4)})
+        reloaded = ReservationStore.load()
+        self.assertEqual(reloaded.get_hotel("H3").rooms_available, 5)
+        self.assertEqual(reloaded.get_hotel("H5").rooms_available, 6)
+        self.assertEqual(len(reloaded.reservations), 29)
+
+    def test_moved_reservation_leaves_old_shard(self):
+        """Prueba que una reserva que cambia de hotel cambia de shard."""
+        hotel_id = next(f"H{n}" for n in range(12)
+                        if shard_of(f"H{n}", 4) != shard_of("H0", 4))
+        store = ReservationStore.load()
+        with store.transaction() as txn:
+            txn.put_reservation(Reservation("R0", "C1", hotel_id))
+        reservations = Reservation.load_reservations()
+        self.assertEqual(len(reservations), 30)
+        self.assertEqual(
+            [r.hotel_id for r in reservations if r.reservation_id == "R0"],
+            [hotel_id]
+        )
+        fresh = ShardedBackend(self.directory)
+        fresh.apply({"reservation": (None, {}, {"R1"})})
+        self.assertEqual(len(fresh.load("reservation")), 29)
+
+    def test_layout_is_persisted(self):
+        """Prueba reabrir el directorio y rechazar otra cantidad."""
+        self.assertEqual(ShardedBackend(self.directory).shards, 4)
+        with self.assertRaises(ValueError):
+            ShardedBackend(self.directory, shards=8)
+        with self.assertRaises(ValueError):
+            ShardedBackend(os.path.join(self.tmp.name, "nuevo"))
+
+    def test_map_shards_in_processes(self):
+        """Prueba procesar cada shard en un proceso independiente."""
+        counts = map_shards(_cancel_first, self.directory, processes=2)
+        self.assertEqual(sum(counts), 30)
+        self.assertEqual(len(Reservation.load_reservations()),
+                         30 - sum(1 for count in counts if count))
+
+    def test_split_and_merge(self):
+        """Prueba particionar y unir los archivos JSON."""
+        files = [os.path.join(self.tmp.name, name) for name in (
+            "hotels.json", "customers.json", "reservations.json"
+        )]
+        merge_json(self.directory, *files)
+        set_backend(self.previous)
+        target = os.path.join(self.tmp.name, "otros")
+        counts = split_json(target, 3, *files, shard_hotels=False)
+        self.assertEqual(counts, {"hotel": 12, "customer": 1,
+                                  "reservation": 30})
+        backend = ShardedBackend(target)
+        self.assertFalse(backend.shard_hotels)
+        self.assertEqual(len(backend.load("hotel")), 12)
+        with self.assertRaises(ValueError):
+            map_shards(_cancel_first, target)
+        self.assertTrue(os.path.exists(os.path.join(target, "hotels.json")))
+        self.assertEqual(
+            sorted(r.reservation_id for r in backend.load("reservation")),
+            sorted(f"R{n}" for n in range(30))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import json
+import tempfile
+from reservation_sys import Hotel, Customer, Reservation, ReservationStore
+from reservation_snapshot import (
+    SnapshotError, SnapshotReader, json_to_snapshot, snapshot_to_json,
+    write_snapshot
+)
+
+
+class TestSnapshot(unittest.TestCase):
+    """Pruebas para la instantánea binaria sobre mmap."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json"
+            )
+        )
+        self.snapshot = os.path.join(self.tmp.name, "snapshot.bin")
+        ReservationStore(
+            hotels=[Hotel(f"H{n}", f"Hotel {n}", "Ciudad de México", n)
+                    for n in range(50)],
+            customers=[Customer("C1", "Añil", "anil@example.com"),
+                       Customer("C2", "Bob", "bob@example.com")],
+            reservations=[
+                Reservation("R1", "C1", "H1"),
+                Reservation("R2", "C2", "H7", "2024-06-01", "2024-06-04"),
+            ],
+        ).save(*self.files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_by_id(self):
+        """Prueba las búsquedas por ID sin cargar todo el archivo."""
+        counts = json_to_snapshot(self.snapshot, *self.files)
+        self.assertEqual(counts, {"hotel": 50, "customer": 2,
+                                  "reservation": 2})
+        with SnapshotReader(self.snapshot) as snapshot:
+            for n in range(50):
+                self.assertEqual(snapshot.find_hotel(f"H{n}").to_dict(), {
+                    "hotel_id": f"H{n}", "name": f"Hotel {n}",
+                    "location": "Ciudad de México", "rooms_available": n,
+                })
+            self.assertIsNone(snapshot.find_hotel("H50"))
+            self.assertIsNone(snapshot.find_hotel(""))
+            self.assertEqual(snapshot.find_customer("C1").name, "Añil")
+            self.assertIsNone(snapshot.find_customer("C3"))
+            dated = snapshot.find_reservation("R2")
+            self.assertEqual((dated.check_in, dated.check_out),
+                             ("2024-06-01", "2024-06-04"))
+            self.assertIsNone(snapshot.find_reservation("R1").check_in)
+            store = snapshot.to_store()
+        self.assertEqual(store.rooms_free("H7", "2024-06-02", "2024-06-03"),
+                         6)
+        self.assertEqual(len(store.reservations_for_customer("C2")), 1)
+
+    def test_round_trip_and_size(self):
+        """Prueba la conversión de ida y vuelta y el tamaño del archivo."""
+        json_to_snapshot(self.snapshot, *self.files)
+        original = []
+        for name in self.files:
+            with open(name, encoding="utf-8") as file:
+                original.append(json.load(file))
+        self.assertLess(os.path.getsize(self.snapshot),
+                        sum(os.path.getsize(name) for name in self.files) / 2)
+        for name in self.files:
+            os.remove(name)
+        snapshot_to_json(self.snapshot, *self.files)
+        for name, data in zip(self.files, original):
+            with open(name, encoding="utf-8") as file:
+                self.assertEqual(json.load(file), data)
+
+    def test_duplicates_and_empty(self):
+        """Prueba IDs repetidos e instantáneas vacías."""
+        write_snapshot(self.snapshot, [Hotel("H1", "Viejo", "A", 1),
+                                       Hotel("H1", "Nuevo", "A", 2)])
+        with SnapshotReader(self.snapshot) as snapshot:
+            self.assertEqual(snapshot.count("hotel"), 1)
+            self.assertEqual(snapshot.find_hotel("H1").name, "Nuevo")
+            self.assertEqual(list(snapshot.iter_customers()), [])
+            self.assertIsNone(snapshot.find_reservation("R1"))
+
+    def test_invalid_file(self):
+        """Prueba que un archivo ajeno se rechaza."""
+        with self.assertRaises(SnapshotError):
+            SnapshotReader(self.files[0])
+        with open(self.snapshot, "wb") as file:
+            file.write(b"x")
+        with self.assertRaises(SnapshotError):
+            SnapshotReader(self.snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
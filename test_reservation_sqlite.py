@@ -0,0 +1,95 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+from reservation_sys import (
+    Hotel, Customer, Reservation, ReservationStore, set_backend
+)
+from reservation_booking import BookingEngine
+from reservation_sqlite import SQLiteBackend, migrate_json
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """Pruebas para el backend SQLite detrás de la API existente."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmp.name, "reservations.db")
+        self.backend = SQLiteBackend(self.database)
+        self.previous = set_backend(self.backend)
+
+    def tearDown(self):
+        set_backend(self.previous)
+        self.backend.close()
+        self.tmp.cleanup()
+
+    def rows(self, table):
+        """Cuenta las filas de una tabla con una conexión independiente."""
+        with sqlite3.connect(self.database) as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_static_methods_route_to_backend(self):
+        """Prueba que ``save_*``/``load_*`` usan la base de datos."""
+        Hotel.save_hotels([Hotel("H1", "Grand Hotel", "New York", 10)])
+        Customer.save_customers([Customer("C1", "Alice", "alice@example.com")])
+        Reservation.save_reservations([
+            Reservation("R1", "C1", "H1", "2025-03-03", "2025-03-07")
+        ])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "hotels.json")))
+        self.assertEqual(Hotel.load_hotels()[0].name, "Grand Hotel")
+        self.assertEqual(Reservation.load_reservations()[0].check_out, "2025-03-07")
+        self.assertEqual(self.backend.get("customer", "C1").email,
+                         "alice@example.com")
+        self.assertIsNone(self.backend.get("customer", "C2"))
+        self.assertEqual(
+            self.backend._connection.execute("PRAGMA journal_mode").fetchone()[0],
+            "wal"
+        )
+
+    def test_store_transactions_are_incremental(self):
+        """Prueba que las transacciones del repositorio escriben por fila."""
+        ReservationStore(
+            hotels=[Hotel(f"H{n}", f"Hotel {n}", "Paris", 2) for n in range(50)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        ).save()
+        store = ReservationStore.load()
+        engine = BookingEngine(store)
+        engine.reserve("R1", "C1", "H7")
+        engine.reserve("R2", "C1", "H7")
+        self.assertIsNone(engine.reserve("R3", "C1", "H7"))
+        engine.cancel("R1")
+        reloaded = ReservationStore.load()
+        self.assertEqual(reloaded.get_hotel("H7").rooms_available, 1)
+        self.assertEqual(list(reloaded.reservations), ["R2"])
+        self.assertEqual(self.rows("hotels"), 50)
+        Hotel.delete_hotel("H0", reloaded)
+        self.assertEqual(self.rows("hotels"), 49)
+        Reservation.cancel_reservation("R2", reloaded, None)
+        self.assertEqual(self.rows("reservations"), 0)
+        self.assertEqual(self.backend.get("hotel", "H7").rooms_available, 2)
+
+    def test_migrate_json(self):
+        """Prueba la migración de los archivos JSON a SQLite."""
+        set_backend(self.previous)
+        files = [os.path.join(self.tmp.name, name) for name in (
+            "hotels.json", "customers.json", "reservations.json"
+        )]
+        ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[Reservation("R1", "C1", "H1"),
+                          Reservation("R2", "C1", "H1")],
+        ).save(*files)
+        target = os.path.join(self.tmp.name, "migrated.db")
+        counts = migrate_json(target, *files)
+        self.assertEqual(counts, {"hotel": 1, "customer": 1, "reservation": 2})
+        migrated = SQLiteBackend(target)
+        self.assertEqual(
+            [r.reservation_id for r in migrated.load("reservation")],
+            ["R1", "R2"]
+        )
+        migrated.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,17 @@
 import unittest
 import os
 import json
-from reservation_sys import Hotel, Customer, Reservation
+import tempfile
+import threading
+from unittest import mock
+from reservation_sys import (
+    Hotel, Customer, Reservation,
+    ReservationLog,
+    ReservationStore,
+    ReservationTable, RoomInventory, StorageBackend,
+    commit_files, iter_json_records
+)
+from reservation_booking import BookingEngine
 
 
 class TestHotel(unittest.TestCase):
@@ -288,5 +298,713 @@ class TestAdditionalScenarios(unittest.TestCase):
         os.remove("empty_reservations.json")
 
 
+class TestReservationStore(unittest.TestCase):
+    """Pruebas unitarias para el repositorio indexado."""
+
+    def setUp(self):
+        self.store = ReservationStore(
+            hotels=[
+                Hotel("H1", "Grand Hotel", "New York", 10),
+                Hotel("H2", "Budget Inn", "Los Angeles", 5),
+            ],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[
+                Reservation("R1", "C1", "H1"),
+                Reservation("R2", "C1", "H2"),
+            ],
+        )
+
+    def test_lookups(self):
+        """Prueba las búsquedas por ID a través del repositorio."""
+        self.assertEqual(Hotel.find_hotel("H2", self.store).name, "Budget Inn")
+        self.assertEqual(Customer.find_customer("C1", self.store).name, "Alice")
+        self.assertIsNone(Hotel.find_hotel("H99", self.store))
+        self.assertEqual(self.store.get_reservation("R1").hotel_id, "H1")
+
+    def test_secondary_indexes(self):
+        """Prueba los índices de reservas por hotel y por cliente."""
+        self.assertEqual(
+            [r.reservation_id for r in self.store.reservations_for_customer("C1")],
+            ["R1", "R2"]
+        )
+        self.assertEqual(
+            [r.reservation_id for r in self.store.reservations_for_hotel("H2")],
+            ["R2"]
+        )
+        self.store.add_reservation(Reservation("R2", "C1", "H1"))
+        self.assertEqual(self.store.reservations_for_hotel("H2"), [])
+        self.assertEqual(len(self.store.reservations_for_hotel("H1")), 2)
+
+    def test_cancel_reservation(self):
+        """Prueba cancelar una reserva directamente en el repositorio."""
+        cancelled = self.store.cancel_reservation("R1")
+        self.assertEqual(cancelled.reservation_id, "R1")
+        self.assertEqual(self.store.get_hotel("H1").rooms_available, 11)
+        self.assertIsNone(self.store.get_reservation("R1"))
+        self.assertEqual(self.store.reservations_for_hotel("H1"), [])
+        self.assertIsNone(self.store.cancel_reservation("R1"))
+
+    def test_cancel_reservation_missing_hotel(self):
+        """Prueba que no se cancela una reserva cuyo hotel no existe."""
+        self.store.remove_hotel("H2")
+        self.assertIsNone(self.store.cancel_reservation("R2"))
+        self.assertIsNotNone(self.store.get_reservation("R2"))
+
+    def test_save_and_load(self):
+        """Prueba guardar y cargar el repositorio completo."""
+        files = ("test_store_hotels.json", "test_store_customers.json",
+                 "test_store_reservations.json")
+        self.store.save(*files)
+        loaded = ReservationStore.load(*files)
+        self.assertEqual(list(loaded.hotels), ["H1", "H2"])
+        self.assertEqual(list(loaded.reservations_by_customer), ["C1"])
+        for filename in files:
+            os.remove(filename)
+
+    def test_cancel_writes_store_files(self):
+        """Prueba que cancelar con la API de clases escribe en los archivos
+        del repositorio y no en los archivos por defecto."""
+        with tempfile.TemporaryDirectory() as directory:
+            files = [os.path.join(directory, name) for name in (
+                "h.json", "c.json", "r.json"
+            )]
+            self.store.save(*files)
+            workdir = os.path.join(directory, "cwd")
+            os.mkdir(workdir)
+            previous = os.getcwd()
+            os.chdir(workdir)
+            try:
+                store = ReservationStore.load(*files)
+                Reservation.cancel_reservation("R1", store, None)
+                self.assertEqual(os.listdir(workdir), [])
+            finally:
+                os.chdir(previous)
+            reloaded = ReservationStore.load(*files)
+            self.assertIsNone(reloaded.get_reservation("R1"))
+            self.assertEqual(reloaded.get_hotel("H1").rooms_available, 11)
+
+    def test_storage_backend_requires_methods(self):
+        """Prueba que un backend sin ``load``, ``save`` y ``apply`` no se
+        puede instanciar."""
+        class PartialBackend(StorageBackend):
+            """Backend que solo implementa ``load``."""
+
+            def load(self, entity, name):
+                return []
+
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+
+class TestReservationLog(unittest.TestCase):
+    """Pruebas para el modo de registro de cambios (JSON lines)."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json",
+                "journal.jsonl",
+            )
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mutations_are_appended_and_replayed(self):
+        """Prueba que los cambios se anexan y se reaplican al abrir."""
+        store = ReservationStore.open(*self.files)
+        store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 10))
+        store.add_customer(Customer("C1", "Alice", "alice@example.com"))
+        store.add_reservation(Reservation("R1", "C1", "H1"))
+        store.add_reservation(Reservation("R2", "C1", "H1"))
+        store.modify_hotel("H1", name="Updated Hotel")
+        store.cancel_reservation("R1")
+        store.remove_customer("C1")
+        store.close()
+        self.assertFalse(os.path.exists(self.files[0]))
+        with open(self.files[3], encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 7)
+
+        reopened = ReservationStore.open(*self.files)
+        hotel = reopened.get_hotel("H1")
+        self.assertEqual(hotel.name, "Updated Hotel")
+        self.assertEqual(hotel.rooms_available, 11)
+        self.assertEqual(list(reopened.reservations), ["R2"])
+        self.assertIsNone(reopened.get_customer("C1"))
+        reopened.close()
+
+    def test_compact_is_idempotent_with_log(self):
+        """Prueba que reaplicar el registro sobre la instantánea no
+        vuelve a sumar habitaciones."""
+        store = ReservationStore.open(*self.files)
+        store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 10))
+        store.add_reservation(Reservation("R1", "C1", "H1"))
+        store.cancel_reservation("R1")
+        store.save(*self.files[:3])  # Simula una compactación interrumpida
+        store.close()
+        reopened = ReservationStore.open(*self.files)
+        self.assertEqual(reopened.get_hotel("H1").rooms_available, 11)
+        reopened.compact()
+        self.assertEqual(os.path.getsize(self.files[3]), 0)
+        self.assertEqual(Hotel.load_hotels(self.files[0])[0].rooms_available, 11)
+        reopened.close()
+
+    def test_automatic_compaction(self):
+        """Prueba la compactación periódica por número de registros."""
+        store = ReservationStore.open(*self.files, compact_every=2)
+        store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 10))
+        store.add_hotel(Hotel("H2", "Budget Inn", "Los Angeles", 5))
+        store.add_hotel(Hotel("H3", "Sea View", "Miami", 3))
+        store.close()
+        self.assertEqual(len(Hotel.load_hotels(self.files[0])), 2)
+        self.assertEqual(len(ReservationLog(self.files[3]).records()), 1)
+
+    def test_transactions_count_for_compaction(self):
+        """Prueba que las transacciones también disparan la compactación."""
+        store = ReservationStore.open(*self.files, compact_every=5)
+        store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 30))
+        store.add_customer(Customer("C1", "Alice", "alice@example.com"))
+        engine = BookingEngine(store)
+        for number in range(20):
+            engine.reserve(f"R{number}", "C1", "H1")
+        store.close()
+        self.assertLess(len(ReservationLog(self.files[3]).records()), 5)
+        reopened = ReservationStore.open(*self.files)
+        self.assertEqual(len(reopened.reservations), 20)
+        self.assertEqual(reopened.get_hotel("H1").rooms_available, 10)
+        reopened.close()
+
+    def test_compact_keeps_records_of_other_writers(self):
+        """Prueba que compactar incorpora lo que otro escritor anexó."""
+        store = ReservationStore.open(*self.files)
+        store.add_hotel(Hotel("H1", "Grand Hotel", "New York", 4))
+        store.add_customer(Customer("C1", "Alice", "alice@example.com"))
+        other = ReservationStore.open(*self.files)
+        BookingEngine(other).reserve("R3", "C1", "H1")
+        other.close()
+        store.compact()
+        self.assertEqual(os.path.getsize(self.files[3]), 0)
+        store.close()
+        reopened = ReservationStore.open(*self.files)
+        self.assertEqual(list(reopened.reservations), ["R3"])
+        self.assertEqual(reopened.get_hotel("H1").rooms_available, 3)
+        reopened.close()
+
+    def test_torn_last_line_is_ignored(self):
+        """Prueba que una última línea incompleta se descarta."""
+        with open(self.files[3], "w", encoding="utf-8") as file:
+            file.write('{"op":"delete","entity":"hotel","id":"H1"}\n{"op":')
+        self.assertEqual(len(ReservationLog(self.files[3]).records()), 1)
+        with open(self.files[3], "w", encoding="utf-8") as file:
+            file.write('{"op":\n{"op":"delete","entity":"hotel","id":"H1"}\n')
+        with self.assertRaises(ValueError):
+            ReservationLog(self.files[3]).records()
+
+
+class TestTransaction(unittest.TestCase):
+    """Pruebas para las transacciones atómicas y el group commit."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json",
+                "journal.jsonl",
+            )
+        )
+        ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+            reservations=[Reservation("R1", "C1", "H1")],
+        ).save(*self.files[:3])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_commit_in_snapshot_mode(self):
+        """Prueba que una transacción reescribe los archivos afectados."""
+        store = ReservationStore.load(*self.files[:3])
+        with store.transaction() as txn:
+            txn.cancel_reservation("R1")
+            txn.put_reservation(Reservation("R2", "C1", "H1"))
+        self.assertEqual(Hotel.load_hotels(self.files[0])[0].rooms_available, 11)
+        self.assertEqual(
+            [r.reservation_id for r in Reservation.load_reservations(self.files[2])],
+            ["R2"]
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "commit.journal")))
+
+    def test_commit_in_log_mode_is_one_record(self):
+        """Prueba que la transacción se anexa como un único registro."""
+        store = ReservationStore.open(*self.files)
+        txn = store.transaction()
+        txn.cancel_reservation("R1")
+        txn.delete_customer("C1")
+        self.assertEqual(len(txn.commit()), 2)
+        store.close()
+        records = ReservationLog(self.files[3]).records()
+        self.assertEqual([r["op"] for r in records], ["txn"])
+        reopened = ReservationStore.open(*self.files)
+        self.assertEqual(reopened.get_hotel("H1").rooms_available, 11)
+        self.assertEqual(reopened.reservations, {})
+        reopened.close()
+
+    def test_invalid_transaction_changes_nothing(self):
+        """Prueba que una transacción inválida no aplica ningún cambio."""
+        store = ReservationStore.load(*self.files[:3])
+        txn = store.transaction()
+        txn.cancel_reservation("R1")
+        txn.delete_hotel("H99")
+        with self.assertRaises(ValueError):
+            txn.commit()
+        self.assertEqual(store.get_hotel("H1").rooms_available, 10)
+        self.assertIsNotNone(store.get_reservation("R1"))
+
+    def test_failed_write_is_rolled_back(self):
+        """Prueba que si falla la escritura no quedan cambios en memoria."""
+        store = ReservationStore.load(*self.files[:3])
+        with mock.patch.object(store, "persist_changes",
+                               side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                BookingEngine(store).reserve("R2", "C1", "H1")
+            with self.assertRaises(OSError):
+                with store.transaction() as txn:
+                    txn.cancel_reservation("R1")
+                    txn.delete_customer("C1")
+        self.assertEqual(store.get_hotel("H1").rooms_available, 10)
+        self.assertEqual(list(store.reservations), ["R1"])
+        self.assertEqual(
+            [r.reservation_id for r in store.reservations_for_hotel("H1")],
+            ["R1"]
+        )
+        self.assertIsNotNone(store.get_customer("C1"))
+        store.create_hotel(Hotel("H2", "Budget Inn", "Los Angeles", 5))
+        reloaded = ReservationStore.load(*self.files[:3])
+        self.assertEqual(list(reloaded.reservations), ["R1"])
+        self.assertEqual(reloaded.get_hotel("H1").rooms_available, 10)
+        self.assertEqual(list(reloaded.hotels), ["H1", "H2"])
+
+    def test_interrupted_commit_is_recovered(self):
+        """Prueba que ``load`` completa un diario de confirmación pendiente."""
+        journal = os.path.join(self.tmp.name, "commit.journal")
+        with open(journal, "w", encoding="utf-8") as file:
+            json.dump({os.path.abspath(self.files[0]): "[]"}, file)
+        store = ReservationStore.load(*self.files[:3])
+        self.assertEqual(store.hotels, {})
+        self.assertFalse(os.path.exists(journal))
+        commit_files({self.files[1]: "[]"})
+        self.assertEqual(Customer.load_customers(self.files[1]), [])
+
+    def test_concurrent_commits_in_one_directory(self):
+        """Prueba que dos repositorios confirman a la vez en el mismo
+        directorio sin compartir temporales ni diario."""
+        errors = []
+
+        def worker(number):
+            try:
+                store = ReservationStore.load(*self.files[:3])
+                for attempt in range(50):
+                    store.create_reservation(
+                        Reservation(f"R{number}-{attempt}", "C1", "H1")
+                    )
+            except (OSError, ValueError) as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), [
+            "commit.journal.lock", "customers.json", "hotels.json",
+            "reservations.json",
+        ])
+        self.assertEqual(len(Reservation.load_reservations(self.files[2])), 51)
+
+    def test_group_commit_batches_fsync(self):
+        """Prueba que confirmaciones concurrentes comparten ``fsync``."""
+        log = ReservationLog(self.files[3], commit_delay=0.02)
+
+        def worker(number):
+            log.append({"op": "delete", "entity": "hotel", "id": number},
+                       sync=True)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.close()
+        self.assertEqual(len(log.records()), 20)
+        self.assertLess(log.fsync_count, 20)
+
+
+class TestStreamingLoader(unittest.TestCase):
+    """Pruebas para la carga incremental de archivos JSON."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.array_file = os.path.join(self.tmp.name, "reservations.json")
+        self.lines_file = os.path.join(self.tmp.name, "reservations.jsonl")
+        reservations = [
+            Reservation(f"R{n}", f"C{n % 3}", f"H{n % 2}") for n in range(50)
+        ]
+        Reservation.save_reservations(reservations, self.array_file)
+        with open(self.lines_file, "w", encoding="utf-8") as file:
+            for reservation in reservations:
+                file.write(json.dumps(reservation.to_dict()) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_small_chunks_match_full_load(self):
+        """Prueba que leer en bloques pequeños equivale a ``json.load``."""
+        with open(self.array_file, encoding="utf-8") as file:
+            expected = json.load(file)
+        self.assertEqual(list(iter_json_records(self.array_file, 5)), expected)
+        self.assertEqual(list(iter_json_records(self.lines_file, 5)), expected)
+
+    def test_filter_while_streaming(self):
+        """Prueba los filtros por campo y por predicado."""
+        for filename in (self.array_file, self.lines_file):
+            stream = Reservation.iter_reservations(filename, hotel_id="H1")
+            self.assertEqual(len(list(stream)), 25)
+            stream = Reservation.iter_reservations(
+                filename, where=lambda r: r.customer_id == "C0", hotel_id="H0"
+            )
+            self.assertEqual(
+                [r.reservation_id for r in stream][:3], ["R0", "R6", "R12"]
+            )
+
+    def test_missing_and_invalid_files(self):
+        """Prueba archivos inexistentes, vacíos y corruptos."""
+        self.assertEqual(list(Hotel.iter_hotels("non_existent_hotels.json")), [])
+        empty = os.path.join(self.tmp.name, "empty.json")
+        with open(empty, "w", encoding="utf-8") as file:
+            file.write("  ")
+        self.assertEqual(list(Customer.iter_customers(empty)), [])
+        for content in ("[{invalid json}]", '[{"customer_id": "C1"'):
+            with open(empty, "w", encoding="utf-8") as file:
+                file.write(content)
+            with self.assertRaises(ValueError):
+                list(Customer.iter_customers(empty))
+
+
+class TestReservationTable(unittest.TestCase):
+    """Pruebas para la representación compacta de reservas."""
+
+    def test_models_use_slots(self):
+        """Prueba que los modelos no tienen ``__dict__`` por instancia."""
+        for entity in (Hotel("H1", "Grand Hotel", "New York", 10),
+                       Customer("C1", "Alice", "alice@example.com"),
+                       Reservation("R1", "C1", "H1")):
+            self.assertFalse(hasattr(entity, "__dict__"))
+
+    def test_views_behave_like_reservations(self):
+        """Prueba altas, reemplazos y vistas compatibles con Reservation."""
+        table = ReservationTable([
+            Reservation("R1", "C1", "H1"),
+            Reservation("R2", "C1", "H2"),
+        ])
+        table.add(Reservation("R2", "C2", "H2"))
+        self.assertEqual(len(table), 2)
+        view = table.get("R2")
+        self.assertEqual(view.customer_id, "C2")
+        self.assertEqual(view.to_dict(), Reservation("R2", "C2", "H2").to_dict())
+        self.assertIsNone(table.get("C1"))
+        self.assertNotIn("H1", table)
+
+    def test_remove_moves_last_row(self):
+        """Prueba que una baja conserva las demás reservas accesibles."""
+        table = ReservationTable(
+            Reservation(f"R{n}", "C1", "H1") for n in range(5)
+        )
+        self.assertTrue(table.remove("R1"))
+        self.assertFalse(table.remove("R1"))
+        self.assertEqual(table.get("R4").reservation_id, "R4")
+        self.assertEqual(
+            sorted(view.reservation_id for view in table),
+            ["R0", "R2", "R3", "R4"]
+        )
+        path = os.path.join(tempfile.gettempdir(), "test_table.json")
+        Reservation.save_reservations(table, path)
+        self.assertEqual(len(Reservation.load_reservations(path)), 4)
+        os.remove(path)
+
+
+class TestDatedInventory(unittest.TestCase):
+    """Pruebas para reservas con fechas e inventario por noche."""
+
+    def setUp(self):
+        self.store = ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 2),
+                    Hotel("H2", "Budget Inn", "New York", 1),
+                    Hotel("H3", "Sea View", "Miami", 1)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        )
+        self.engine = BookingEngine(self.store)
+
+    def test_reservation_dates(self):
+        """Prueba la validación y serialización de las fechas."""
+        reservation = Reservation("R1", "C1", "H1", "2025-03-03", "2025-03-07")
+        self.assertEqual(reservation.to_dict()["check_out"], "2025-03-07")
+        for dates in (("2025-03-03", None), ("2025-03-07", "2025-03-03")):
+            with self.assertRaises(ValueError):
+                Reservation("R1", "C1", "H1", *dates)
+        table = ReservationTable([reservation, Reservation("R2", "C1", "H1")])
+        self.assertEqual(table.get("R1").to_dict(), reservation.to_dict())
+        self.assertIsNone(table.get("R2").check_in)
+
+    def test_inventory_grows_and_counts_overlaps(self):
+        """Prueba la ocupación máxima en rangos que se solapan."""
+        inventory = RoomInventory()
+        inventory.add("R1", "2025-03-03", "2025-03-07")
+        inventory.add("R2", "2025-03-06", "2025-03-09")
+        inventory.add("R3", "2027-01-01", "2027-01-02")
+        self.assertEqual(inventory.occupancy("2025-03-01", "2025-03-06"), 1)
+        self.assertEqual(inventory.occupancy("2025-03-06", "2025-03-07"), 2)
+        self.assertEqual(inventory.occupancy("2025-03-07", "2025-03-10"), 1)
+        self.assertEqual(inventory.occupancy("2024-01-01", "2024-02-01"), 0)
+        self.assertEqual(inventory.occupancy("2026-12-31", "2027-01-05"), 1)
+        inventory.remove("R2")
+        self.assertEqual(inventory.occupancy("2025-03-06", "2025-03-07"), 1)
+
+    def test_dated_booking_respects_nightly_capacity(self):
+        """Prueba que las reservas con fechas no exceden la capacidad."""
+        book = self.engine.reserve
+        self.assertIsNotNone(book("R1", "C1", "H1", "2025-03-03", "2025-03-07"))
+        self.assertIsNotNone(book("R2", "C1", "H1", "2025-03-05", "2025-03-06"))
+        self.assertIsNone(book("R3", "C1", "H1", "2025-03-04", "2025-03-08"))
+        self.assertIsNotNone(book("R4", "C1", "H1", "2025-03-07", "2025-03-08"))
+        self.assertEqual(self.store.get_hotel("H1").rooms_available, 2)
+        self.assertEqual(self.store.rooms_free("H1", "2025-03-06", "2025-03-09"), 1)
+        self.engine.cancel("R2")
+        self.assertEqual(self.store.rooms_free("H1", "2025-03-03", "2025-03-07"), 1)
+        self.assertEqual(self.store.get_hotel("H1").rooms_available, 2)
+
+    def test_available_hotels_by_location(self):
+        """Prueba qué hoteles de una ciudad tienen habitación en un rango."""
+        self.engine.reserve("R1", "C1", "H2", "2025-03-05", "2025-03-06")
+        available = self.store.available_hotels(
+            "2025-03-03", "2025-03-07", location="New York"
+        )
+        self.assertEqual([hotel.hotel_id for hotel in available], ["H1"])
+        available = self.store.available_hotels("2025-03-06", "2025-03-07")
+        self.assertEqual(len(available), 3)
+
+
+class TestHotelSearchIndex(unittest.TestCase):
+    """Pruebas para la búsqueda de hoteles por ubicación y nombre."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json"
+            )
+        )
+        ReservationStore(hotels=[
+            Hotel("H1", "Grand Hotel", "New York", 10),
+            Hotel("H2", "Grand Central Inn", "New York", 5),
+            Hotel("H3", "Budget Inn", "new  york", 3),
+            Hotel("H4", "Grand Palace", "Paris", 8),
+        ]).save(*self.files)
+        self.store = ReservationStore.load(*self.files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def ids(self, hotels):
+        """Devuelve los IDs de una lista de hoteles."""
+        return [hotel.hotel_id for hotel in hotels]
+
+    def test_location_and_prefix(self):
+        """Prueba búsquedas por ubicación, por prefijo y combinadas."""
+        self.assertEqual(self.ids(self.store.find_hotels("New York")),
+                         ["H3", "H2", "H1"])
+        self.assertEqual(self.ids(self.store.find_hotels(prefix="gra")),
+                         ["H2", "H1", "H4"])
+        self.assertEqual(
+            self.ids(self.store.find_hotels("NEW YORK", "grand", limit=1)),
+            ["H2"]
+        )
+        self.assertEqual(self.store.find_hotels("Tokyo"), [])
+
+    def test_incremental_updates(self):
+        """Prueba que modificar y eliminar hoteles actualiza el índice."""
+        self.store.modify_hotel("H4", name="Budget Palace", location="Rome")
+        self.assertEqual(self.store.find_hotels("Paris"), [])
+        self.assertEqual(self.ids(self.store.find_hotels(prefix="budget")),
+                         ["H3", "H4"])
+        Hotel.delete_hotel("H3", self.store)
+        self.assertEqual(self.ids(self.store.find_hotels(prefix="budget")),
+                         ["H4"])
+        self.store.add_hotel(Hotel("H1", "Airport Hotel", "Rome", 2))
+        self.assertEqual(self.ids(self.store.find_hotels("rome")), ["H1", "H4"])
+
+    def test_batch_queries(self):
+        """Prueba resolver varias consultas en una llamada."""
+        results = self.store.find_hotels_many([
+            {"location": "Paris"},
+            {"prefix": "grand c"},
+            {"location": "New York", "prefix": "b"},
+        ])
+        self.assertEqual([self.ids(result) for result in results],
+                         [["H4"], ["H2"], ["H3"]])
+
+
+class TestReferentialDeletes(unittest.TestCase):
+    """Pruebas para las bajas que respetan las reservas."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json"
+            )
+        )
+        ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 8),
+                    Hotel("H2", "Beach Inn", "Miami", 5),
+                    Hotel("H3", "Empty Inn", "Miami", 5)],
+            customers=[Customer("C1", "Alice", "alice@example.com"),
+                       Customer("C2", "Bob", "bob@example.com")],
+            reservations=[
+                Reservation("R1", "C1", "H1"),
+                Reservation("R2", "C2", "H1"),
+                Reservation("R3", "C1", "H2", "2024-06-01", "2024-06-03"),
+            ],
+        ).save(*self.files)
+        self.store = ReservationStore.load(*self.files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rejects_hotels_with_reservations(self):
+        """Prueba que sin cascada no se elimina nada si hay reservas."""
+        with self.assertRaises(ValueError):
+            self.store.delete_hotels(["H3", "H1"])
+        with self.assertRaises(ValueError):
+            Hotel.delete_hotel("H2", self.store)
+        with self.assertRaises(ValueError):
+            self.store.delete_hotels(["H3", "H99"])
+        self.assertEqual(len(ReservationStore.load(*self.files).hotels), 3)
+        self.assertEqual(self.store.delete_hotels(["H3"]), [])
+        self.assertIsNone(ReservationStore.load(*self.files).get_hotel("H3"))
+
+    def test_cascading_hotel_delete(self):
+        """Prueba que la cascada elimina las reservas del hotel."""
+        removed = self.store.delete_hotels(["H1", "H2", "H1"], cascade=True)
+        self.assertEqual([r.reservation_id for r in removed],
+                         ["R1", "R2", "R3"])
+        self.assertEqual(self.store.reservations_for_customer("C1"), [])
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(list(reloaded.hotels), ["H3"])
+        self.assertEqual(reloaded.reservations, {})
+
+    def test_cascading_customer_delete_returns_rooms(self):
+        """Prueba que la cascada de un cliente cancela sus reservas."""
+        with self.assertRaises(ValueError):
+            Customer.delete_customer("C1", self.store)
+        Customer.delete_customer("C1", self.store, cascade=True)
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(list(reloaded.customers), ["C2"])
+        self.assertEqual(list(reloaded.reservations), ["R2"])
+        self.assertEqual(reloaded.get_hotel("H1").rooms_available, 9)
+        self.assertEqual(reloaded.get_hotel("H2").rooms_available, 5)
+        self.assertEqual(reloaded.rooms_free("H2", "2024-06-01",
+                                             "2024-06-03"), 5)
+
+    def test_cascade_on_plain_store_saves_every_file(self):
+        """Prueba que la cascada sobre un repositorio sin archivos propios
+        guarda todas las colecciones que cambiaron."""
+        previous = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            store = ReservationStore(Hotel.load_hotels(),
+                                     Customer.load_customers(),
+                                     Reservation.load_reservations())
+            Customer.delete_customer("C1", store, cascade=True)
+            reloaded = ReservationStore.load()
+            self.assertEqual(list(reloaded.customers), ["C2"])
+            self.assertEqual(list(reloaded.reservations), ["R2"])
+            self.assertEqual(reloaded.get_hotel("H1").rooms_available, 9)
+            Hotel.delete_hotel("H1", store, cascade=True)
+            reloaded = ReservationStore.load()
+            self.assertEqual(list(reloaded.hotels), ["H2", "H3"])
+            self.assertEqual(reloaded.reservations, {})
+        finally:
+            os.chdir(previous)
+
+    def test_bulk_delete_is_one_log_record(self):
+        """Prueba que la baja masiva es un único registro del journal."""
+        store = ReservationStore.open(
+            *self.files, log_file=os.path.join(self.tmp.name, "j.jsonl")
+        )
+        store.delete_customers(["C1", "C2"], cascade=True)
+        store.close()
+        self.assertEqual(len(ReservationLog(store.log.filename).records()), 1)
+        reopened = ReservationStore.open(*self.files, log_file=store.log.filename)
+        self.assertEqual(reopened.customers, {})
+        self.assertEqual(reopened.get_hotel("H1").rooms_available, 10)
+        reopened.close()
+
+
+class TestUniqueIds(unittest.TestCase):
+    """Pruebas para las altas con ID único."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = tuple(
+            os.path.join(self.tmp.name, name) for name in (
+                "hotels.json", "customers.json", "reservations.json"
+            )
+        )
+        ReservationStore(
+            hotels=[Hotel("H1", "Grand Hotel", "New York", 10)],
+            customers=[Customer("C1", "Alice", "alice@example.com")],
+        ).save(*self.files)
+        self.store = ReservationStore.load(*self.files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_create_rejects_duplicates(self):
+        """Prueba que ``create_*`` rechaza IDs repetidos sin modificar."""
+        with self.assertRaises(ValueError):
+            self.store.create_hotel(Hotel("H1", "Otro", "Lima", 1))
+        with self.assertRaises(ValueError):
+            self.store.create_customer(Customer("C1", "Bob", "b@example.com"))
+        self.store.create_reservation(Reservation("R1", "C1", "H1"))
+        for reservation in (Reservation("R1", "C1", "H1"),
+                            Reservation("R2", "C1", "H9"),
+                            Reservation("R2", "C9", "H1")):
+            with self.assertRaises(ValueError):
+                self.store.create_reservation(reservation)
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(reloaded.get_hotel("H1").name, "Grand Hotel")
+        self.assertEqual(list(reloaded.reservations), ["R1"])
+
+    def test_transaction_creates(self):
+        """Prueba altas únicas dentro de una transacción."""
+        txn = self.store.transaction()
+        txn.create_hotel(Hotel("H2", "Beach Inn", "Miami", 5))
+        txn.create_reservation(Reservation("R1", "C1", "H2"))
+        txn.create_hotel(Hotel("H2", "Beach Inn", "Miami", 5))
+        with self.assertRaises(ValueError):
+            txn.commit()
+        self.assertIsNone(self.store.get_hotel("H2"))
+        with self.store.transaction() as txn:
+            txn.delete_hotel("H1")
+            txn.create_hotel(Hotel("H1", "Nuevo", "Lima", 1))
+            txn.create_hotel(Hotel("H2", "Beach Inn", "Miami", 5))
+            txn.create_reservation(Reservation("R1", "C1", "H2"))
+        reloaded = ReservationStore.load(*self.files)
+        self.assertEqual(reloaded.get_hotel("H1").name, "Nuevo")
+        self.assertEqual(reloaded.get_reservation("R1").hotel_id, "H2")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,29 @@
+"""
+Utilidades compartidas por las pruebas del Sistema de Reservas de Hoteles.
+"""
+
+import os
+import shutil
+import tempfile
+
+from reservation_sys import ReservationStore
+
+STORE_FILES = ("hotels.json", "customers.json", "reservations.json",
+               "journal.jsonl")
+
+
+def seed_store_files(test, hotels=(), customers=(), reservations=()):
+    """Guarda las entidades indicadas en un directorio temporal que se
+    borra al terminar ``test``.
+
+    Devuelve ``(directorio, archivos)``, donde ``archivos`` son las rutas
+    de hoteles, clientes, reservas y registro de cambios (este último no se
+    crea)."""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    files = tuple(os.path.join(directory, name) for name in STORE_FILES)
+    ReservationStore(
+        hotels=list(hotels), customers=list(customers),
+        reservations=list(reservations),
+    ).save(*files[:3])
+    return directory, files